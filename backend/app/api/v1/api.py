@@ -8,7 +8,8 @@ from .endpoints import (
     appointment,
     admission,
     notification,
-    admin
+    admin,
+    medical_record,
 )
 
 # Create API router
@@ -31,6 +32,10 @@ api_router.include_router(
     appointment.router, prefix="/appointment", tags=["Appointment"]
 )
 
+api_router.include_router(
+    medical_record.router, prefix="/medical-record", tags=["Medical Record"]
+)
+
 api_router.include_router(admission.router, prefix="/admission", tags=["Admission"])
 
 api_router.include_router(
@@ -1,21 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from ....core.security import get_current_user
 from ....utils.db_utils import execute_query
-
-GET_ALL_USERS_QUERY = """
-    SELECT id, email, role, created_at
-    FROM users
-    ORDER BY id;
-"""
-
-GET_USER_BY_ID_QUERY = """
-    SELECT id, email, role, created_at
-    FROM users
-    WHERE id = %s;
-"""
+from ....utils.stream_utils import stream_query_response
+from ....utils.pagination_utils import PageParams, paginate
+from ....utils.json_utils import json_response
+from ....sql.queries.admin_queries import *
 
 class UserOut(BaseModel):
     id: int
@@ -26,14 +18,21 @@ class UserOut(BaseModel):
 router = APIRouter()
 
 @router.get("/users", response_model=List[UserOut])
-def get_all_users(current_user: dict = Depends(get_current_user)):
+async def get_all_users(
+    response: Response,
+    stream: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    page: PageParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+):
     if current_user["role"] != "ADMIN":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this endpoint"
         )
-    users = execute_query(GET_ALL_USERS_QUERY, fetch_all=True)
-    return users
+    if stream:
+        return await stream_query_response(GET_ALL_USERS_QUERY, fmt=stream)
+    users = await paginate(response, page, GET_ALL_USERS_QUERY, (), ("id",))
+    return json_response(users, response, UserOut)
 
 @router.get("/users/{user_id}", response_model=UserOut)
 def get_user_by_id(user_id: int, current_user: dict = Depends(get_current_user)):
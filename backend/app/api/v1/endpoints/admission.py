@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from typing import List, Optional
 from datetime import datetime, date
 from ....core.security import get_current_user, check_permissions
-from ....utils.db_utils import execute_query
+from ....utils.db_utils import execute_query_async
+from ....utils.filter_utils import Filters
+from ....utils.pagination_utils import PageParams, paginate
+from ....utils.json_utils import json_response
 from ....sql.queries.admission_queries import *
 
 router = APIRouter()
@@ -10,19 +13,28 @@ router = APIRouter()
 
 @router.get("/")
 async def get_all_admissions(
-    status: Optional[str] = None, current_user: dict = Depends(get_current_user)
+    response: Response,
+    status: Optional[str] = None,
+    page: PageParams = Depends(),
+    current_user: dict = Depends(get_current_user),
 ):
     """Get all admissions"""
     try:
-        query = GET_ALL_ADMISSIONS_QUERY
-        params = []
-
-        if status:
-            query = query.replace("ORDER BY", f"WHERE a.status = %s ORDER BY")
-            params.append(status)
+        query, params = (
+            Filters().equals("a.status", status).apply(GET_ALL_ADMISSIONS_QUERY)
+        )
 
-        admissions = execute_query(query, tuple(params), fetch_all=True)
-        return admissions
+        admissions = await paginate(
+            response,
+            page,
+            query,
+            params,
+            ("admission_date", "id"),
+            descending=True,
+        )
+        return json_response(admissions, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -35,11 +47,13 @@ async def create_admission(
     """Create new admission"""
     try:
         # Check bed availability
-        available_beds = execute_query(GET_AVAILABLE_BEDS_QUERY, fetch_all=True)
+        available_beds = await execute_query_async(
+            GET_AVAILABLE_BEDS_QUERY, fetch_all=True
+        )
         if not available_beds:
             raise HTTPException(status_code=400, detail="No beds available")
 
-        result = execute_query(
+        result = await execute_query_async(
             CREATE_ADMISSION_QUERY,
             (
                 admission_data["patient_id"],
@@ -70,7 +84,7 @@ async def discharge_patient(
 ):
     """Discharge patient"""
     try:
-        execute_query(
+        await execute_query_async(
             UPDATE_ADMISSION_QUERY,
             (
                 "DISCHARGED",
@@ -91,5 +105,5 @@ async def discharge_patient(
 @router.get("/beds/available")
 async def get_available_beds(current_user: dict = Depends(get_current_user)):
     """Get available beds"""
-    beds = execute_query(GET_AVAILABLE_BEDS_QUERY, fetch_all=True)
+    beds = await execute_query_async(GET_AVAILABLE_BEDS_QUERY, fetch_all=True)
     return beds
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from typing import List, Optional
 from datetime import datetime, date
 from ....core.security import get_current_user, check_permissions
-from ....utils.db_utils import execute_query
+from ....utils.db_utils import execute_query_async
 from ....utils.date_utils import validate_date_range
+from ....utils.filter_utils import Filters
+from ....utils.stream_utils import stream_query_response
+from ....utils.pagination_utils import PageParams, paginate
+from ....utils.json_utils import json_response
+from ....utils.slot_utils import find_free_slots, invalidate_doctor_calendar
+from ....config.settings import settings
 from ....sql.queries.appointment_queries import *
 
 router = APIRouter()
@@ -11,42 +17,117 @@ router = APIRouter()
 
 @router.get("/")
 async def get_all_appointments(
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     status: Optional[str] = None,
+    stream: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    page: PageParams = Depends(),
     current_user: dict = Depends(get_current_user),
 ):
-    """Get all appointments with optional filters"""
+    """
+    Get all appointments with optional filters, which combine; start_date
+    and end_date are inclusive (stream=json|ndjson to stream)
+    """
     try:
-        query = GET_ALL_APPOINTMENTS_QUERY
-        params = []
-
-        if start_date and end_date:
-            if not validate_date_range(start_date, end_date):
-                raise HTTPException(status_code=400, detail="Invalid date range")
-            query = query.replace(
-                "ORDER BY", f"WHERE a.appointment_date BETWEEN %s AND %s ORDER BY"
-            )
-            params.extend([start_date, end_date])
-
-        if status:
-            query = query.replace("ORDER BY", f"WHERE a.status = %s ORDER BY")
-            params.append(status)
-
-        appointments = execute_query(query, tuple(params), fetch_all=True)
-        return appointments
+        if start_date and end_date and not validate_date_range(start_date, end_date):
+            raise HTTPException(status_code=400, detail="Invalid date range")
+        query, params = (
+            Filters()
+            .equals("a.status", status)
+            .date_range("a.appointment_date", start_date, end_date)
+            .apply(GET_ALL_APPOINTMENTS_QUERY)
+        )
+
+        if stream:
+            return await stream_query_response(query, params, stream)
+
+        appointments = await paginate(
+            response,
+            page,
+            query,
+            params,
+            ("appointment_date", "id"),
+            descending=True,
+        )
+        return json_response(appointments, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/calendar")
+async def get_appointment_calendar(
+    start_date: date,
+    end_date: date,
+    doctor_id: Optional[int] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Appointment counts per day, doctor (user id) and status between
+    start_date and end_date inclusive, optionally for one doctor. Days,
+    doctors and statuses without appointments are omitted.
+    """
+    if not validate_date_range(start_date, end_date):
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    if (end_date - start_date).days >= settings.CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"The window may span at most {settings.CALENDAR_MAX_DAYS} days",
+        )
+    query, params = (
+        Filters()
+        .equals("c.doctor_id", doctor_id)
+        .apply(GET_APPOINTMENT_CALENDAR_QUERY, (start_date, end_date))
+    )
+    counts = await execute_query_async(query, params, fetch_all=True)
+    return json_response(counts)
+
+
+@router.get("/slots")
+async def get_free_slots(
+    doctor_id: Optional[int] = None,
+    specialization: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=settings.PAGE_SIZE_MAX),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Next free appointment slots with a doctor (doctor_id, the doctor's user
+    id) or any doctor with a specialization, earliest first, between
+    start_date and end_date inclusive (default: today up to
+    SLOT_HORIZON_DAYS ahead). Slots are APPOINTMENT_SLOT_MINUTES long and
+    respect shifts, approved leaves and booked appointments.
+    """
+    if start_date and end_date and not validate_date_range(start_date, end_date):
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    slots = await find_free_slots(
+        doctor_id, specialization, start_date, end_date, limit
+    )
+    return json_response(slots)
+
+
 @router.post("/")
 async def create_appointment(
     appointment_data: dict,
     current_user: dict = Depends(check_permissions(["ADMIN", "FINANCE", "STAFF"])),
 ):
-    """Create new appointment"""
+    """
+    Create new appointment (duration_minutes defaults to
+    APPOINTMENT_SLOT_MINUTES). Responds 409 if the doctor already has a
+    scheduled appointment overlapping it.
+    """
+    duration = appointment_data.get(
+        "duration_minutes", settings.APPOINTMENT_SLOT_MINUTES
+    )
+    if not isinstance(duration, int) or duration <= 0:
+        raise HTTPException(
+            status_code=400, detail="duration_minutes must be a positive integer"
+        )
     try:
-        result = execute_query(
+        result = await execute_query_async(
             CREATE_APPOINTMENT_QUERY,
             (
                 appointment_data["patient_id"],
@@ -54,10 +135,11 @@ async def create_appointment(
                 appointment_data["appointment_date"],
                 "SCHEDULED",
                 appointment_data["purpose"],
-                appointment_data.get("notes", ""),
+                duration,
             ),
             fetch_one=True,
         )
+        await invalidate_doctor_calendar(appointment_data["doctor_id"])
 
         # Send notification to patient and doctor
         # TODO: Implement notification system
@@ -66,6 +148,8 @@ async def create_appointment(
             "message": "Appointment created successfully",
             "appointment_id": result["id"],
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -86,8 +170,15 @@ async def update_appointment_status(
         )
 
     try:
-        execute_query(UPDATE_APPOINTMENT_QUERY, (status, notes, appointment_id))
+        result = await execute_query_async(
+            UPDATE_APPOINTMENT_QUERY, (status, appointment_id), fetch_one=True
+        )
+        if result:
+            # A cancellation frees the slot
+            await invalidate_doctor_calendar(result["doctor_id"])
         return {"message": "Appointment updated successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -97,7 +188,7 @@ async def get_doctor_appointments(
     doctor_id: int, current_user: dict = Depends(get_current_user)
 ):
     """Get all appointments for a specific doctor"""
-    appointments = execute_query(
+    appointments = await execute_query_async(
         GET_DOCTOR_APPOINTMENTS_QUERY, (doctor_id,), fetch_all=True
     )
     return appointments
@@ -10,7 +10,7 @@ from ....core.security import (
     create_access_token,
     get_current_user,
 )
-from ....utils.db_utils import execute_query
+from ....utils.db_utils import execute_query_async
 from ....utils.validators import validate_email, validate_password_strength
 from ....utils.email_utils import send_email
 from ....sql.queries.auth_queries import (
@@ -47,7 +47,7 @@ async def register(user_data: UserRegister):
     if not valid:
         raise HTTPException(status_code=400, detail=message)
     
-    existing_user = execute_query(
+    existing_user = await execute_query_async(
         GET_USER_BY_EMAIL_QUERY, (user_data.email,), fetch_one=True
     )
     
@@ -57,7 +57,7 @@ async def register(user_data: UserRegister):
     hashed_password = get_password_hash(user_data.password)
     
     try:
-        user_id = execute_query(
+        user_id = await execute_query_async(
             CREATE_USER_QUERY,
             (user_data.email, hashed_password, user_data.role),
             fetch_one=True,
@@ -83,7 +83,7 @@ async def register(user_data: UserRegister):
 
 @router.post("/login")
 async def login(user_data: UserLogin):
-    user = execute_query(
+    user = await execute_query_async(
         GET_USER_BY_EMAIL_QUERY, (user_data.email,), fetch_one=True
     )
     
@@ -107,14 +107,16 @@ async def login(user_data: UserLogin):
 
 @router.post("/forgot-password")
 async def forgot_password(email: str):
-    user = execute_query(GET_USER_BY_EMAIL_QUERY, (email,), fetch_one=True)
+    user = await execute_query_async(GET_USER_BY_EMAIL_QUERY, (email,), fetch_one=True)
     
     if not user:
         raise HTTPException(status_code=404, detail="Email not found")
     
     reset_token = secrets.token_urlsafe(32)
     
-    execute_query(CREATE_PASSWORD_RESET_TOKEN_QUERY, (user["id"], reset_token))
+    await execute_query_async(
+        CREATE_PASSWORD_RESET_TOKEN_QUERY, (user["id"], reset_token)
+    )
     
     reset_link = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
     
@@ -136,7 +138,9 @@ async def forgot_password(email: str):
 
 @router.post("/reset-password")
 async def reset_password(payload: PasswordReset):
-    result = execute_query(VERIFY_RESET_TOKEN_QUERY, (payload.token,), fetch_one=True)
+    result = await execute_query_async(
+        VERIFY_RESET_TOKEN_QUERY, (payload.token,), fetch_one=True
+    )
     
     if not result:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
@@ -148,8 +152,8 @@ async def reset_password(payload: PasswordReset):
     hashed_password = get_password_hash(payload.new_password)
     user_id = result["user_id"]
     
-    execute_query(UPDATE_PASSWORD_QUERY, (hashed_password, user_id))
-    execute_query(INVALIDATE_RESET_TOKEN_QUERY, (payload.token,))
+    await execute_query_async(UPDATE_PASSWORD_QUERY, (hashed_password, user_id))
+    await execute_query_async(INVALIDATE_RESET_TOKEN_QUERY, (payload.token,))
     
     return {"message": "Password reset successful"}
 
@@ -171,6 +175,8 @@ async def change_password(
     
     hashed_password = get_password_hash(new_password)
     
-    execute_query(UPDATE_PASSWORD_QUERY, (hashed_password, current_user["email"]))
+    await execute_query_async(
+        UPDATE_PASSWORD_QUERY, (hashed_password, current_user["email"])
+    )
     
     return {"message": "Password changed successfully"}
@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from typing import List
 from ....core.security import get_current_user, check_permissions
-from ....utils.db_utils import execute_query
+from ....utils.db_utils import execute_query_async
+from ....utils.etag_utils import not_modified, set_validators, table_version
+from ....utils.json_utils import json_response
 from ....sql.queries.department_queries import *
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[dict])
-async def get_all_departments(current_user: dict = Depends(get_current_user)):
-    """Get all departments"""
+async def get_all_departments(
+    request: Request, current_user: dict = Depends(get_current_user)
+):
+    """Get all departments (supports If-None-Match / If-Modified-Since)"""
+    version = await table_version("departments", ["departments"])
+    cached = not_modified(request, version)
+    if cached is not None:
+        return cached
     try:
-        departments = execute_query(GET_ALL_DEPARTMENTS_QUERY, fetch_all=True)
-        return departments
+        departments = await execute_query_async(
+            GET_ALL_DEPARTMENTS_QUERY, fetch_all=True
+        )
+        return set_validators(json_response(departments), version)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -20,7 +30,7 @@ async def get_all_departments(current_user: dict = Depends(get_current_user)):
 @router.get("/{dept_id}")
 async def get_department(dept_id: int, current_user: dict = Depends(get_current_user)):
     """Get specific department details"""
-    department = execute_query(
+    department = await execute_query_async(
         GET_DEPARTMENT_BY_ID_QUERY, (dept_id,), fetch_one=True
     )
     if not department:
@@ -34,7 +44,7 @@ async def create_department(
 ):
     """Create new department"""
     try:
-        result = execute_query(
+        result = await execute_query_async(
             CREATE_DEPARTMENT_QUERY,
             (department_data["name"], department_data["description"]),
             fetch_one=True,
@@ -54,11 +64,13 @@ async def update_department(
     current_user: dict = Depends(check_permissions(["ADMIN"])),
 ):
     """Update department details"""
-    if not execute_query(GET_DEPARTMENT_BY_ID_QUERY, (dept_id,), fetch_one=True):
+    if not await execute_query_async(
+        GET_DEPARTMENT_BY_ID_QUERY, (dept_id,), fetch_one=True
+    ):
         raise HTTPException(status_code=404, detail="Department not found")
 
     try:
-        execute_query(
+        await execute_query_async(
             UPDATE_DEPARTMENT_QUERY,
             (department_data["name"], department_data["description"], dept_id),
         )
@@ -72,5 +84,7 @@ async def get_department_staff(
     dept_id: int, current_user: dict = Depends(get_current_user)
 ):
     """Get all staff members in a department"""
-    staff = execute_query(GET_DEPARTMENT_STAFF_QUERY, (dept_id,), fetch_all=True)
+    staff = await execute_query_async(
+        GET_DEPARTMENT_STAFF_QUERY, (dept_id,), fetch_all=True
+    )
     return staff
@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from typing import List, Optional
 from datetime import datetime, date
 from pydantic import BaseModel
 from ....core.security import get_current_user, check_permissions
-from ....utils.db_utils import execute_query
+from ....utils.db_utils import execute_query, execute_query_async
 from ....utils.date_utils import validate_date_range
+from ....utils.stream_utils import stream_query_response
+from ....utils.pagination_utils import PageParams, paginate
+from ....utils.json_utils import json_response
+from ....utils.etag_utils import not_modified, set_validators, table_version
+from ....utils.fields_utils import FieldSet
+from ....utils.filter_utils import Filters
 from ....sql.queries.finance_queries import *
 
 router = APIRouter()
 
+BILL_FIELDSET = FieldSet(BILL_FIELDS, required=("generated_date", "id"))
+INSURANCE_CLAIM_FIELDSET = FieldSet(
+    INSURANCE_CLAIM_FIELDS, required=("submission_date", "id")
+)
+
 class FinancialOverviewOut(BaseModel):
     daily_revenue: float
     monthly_revenue: float
@@ -22,53 +33,74 @@ class FinancialReportOut(BaseModel):
     type: str
     source: str
 
-# Financial overview query
-GET_FINANCIAL_OVERVIEW_QUERY = """
-    SELECT 
-        (SELECT COALESCE(SUM(amount), 0) FROM revenue WHERE date = CURRENT_DATE AND type = 'DAILY') AS daily_revenue,
-        (SELECT COALESCE(SUM(amount), 0) FROM revenue WHERE date_trunc('month', date) = date_trunc('month', CURRENT_DATE) AND type = 'MONTHLY') AS monthly_revenue,
-        (SELECT COALESCE(SUM(amount), 0) FROM bills WHERE status IN ('PENDING', 'OVERDUE')) AS outstanding_amount
-    ;
-"""
-
 @router.get("/bills")
 async def get_all_bills(
+    response: Response,
     status: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    fields: Optional[str] = None,
+    stream: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    page: PageParams = Depends(),
     current_user: dict = Depends(check_permissions(["ADMIN", "FINANCE"])),
 ):
-    """Get all bills with optional filters"""
+    """
+    Get all bills with optional filters, which combine; start_date and
+    end_date are inclusive (stream=json|ndjson to stream). fields= limits
+    the columns returned.
+    """
     try:
-        query = GET_ALL_BILLS_QUERY
-        params = []
-
-        if status:
-            query = query.replace("ORDER BY", f"WHERE b.status = %s ORDER BY")
-            params.append(status)
-
-        if start_date and end_date:
-            if not validate_date_range(start_date, end_date):
-                raise HTTPException(status_code=400, detail="Invalid date range")
-            query = query.replace(
-                "ORDER BY", f"WHERE b.generated_date BETWEEN %s AND %s ORDER BY"
+        if start_date and end_date and not validate_date_range(start_date, end_date):
+            raise HTTPException(status_code=400, detail="Invalid date range")
+        query, params = (
+            Filters()
+            .equals("b.status", status)
+            .date_range("b.generated_date", start_date, end_date)
+            .apply(
+                BILL_FIELDSET.project(GET_ALL_BILLS_QUERY, BILL_FIELDSET.parse(fields))
             )
-            params.extend([start_date, end_date])
+        )
 
-        bills = execute_query(query, tuple(params), fetch_all=True)
-        return bills
+        if stream:
+            return await stream_query_response(query, params, stream)
+
+        bills = await paginate(
+            response,
+            page,
+            query,
+            params,
+            ("generated_date", "id"),
+            descending=True,
+            nullable=True,
+        )
+        return json_response(bills, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/overview", response_model=FinancialOverviewOut)
-def get_financial_overview(current_user: dict = Depends(get_current_user)):
+async def get_financial_overview(
+    request: Request, current_user: dict = Depends(get_current_user)
+):
     """
     Get an overview of financial metrics including daily and monthly revenue, as well as outstanding amounts.
+    Supports If-None-Match; the ETag changes with revenue, bills and the date.
     """
-    report = execute_query(GET_FINANCIAL_OVERVIEW_QUERY, fetch_one=True)
+    version = await table_version(
+        "finance-overview", ["revenue", "bills"], variant=date.today().isoformat()
+    )
+    # The totals also change at midnight, which no row version records
+    version.last_modified = None
+    cached = not_modified(request, version)
+    if cached is not None:
+        return cached
+    report = await execute_query_async(GET_FINANCIAL_OVERVIEW_QUERY, fetch_one=True)
     if not report:
         raise HTTPException(status_code=404, detail="Financial overview not available")
-    return report
+    return set_validators(
+        json_response(FinancialOverviewOut(**report).model_dump()), version
+    )
 
 @router.post("/bills")
 async def create_bill(
@@ -77,7 +109,7 @@ async def create_bill(
 ):
     """Create new bill"""
     try:
-        result = execute_query(
+        result = await execute_query_async(
             CREATE_BILL_QUERY,
             (
                 bill_data["patient_id"],
@@ -105,7 +137,9 @@ async def update_bill_status(
 ):
     """Update bill status"""
     try:
-        execute_query(UPDATE_BILL_STATUS_QUERY, (status, payment_method, bill_id))
+        await execute_query_async(
+            UPDATE_BILL_STATUS_QUERY, (status, payment_method, bill_id)
+        )
         return {"message": "Bill status updated successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -117,7 +151,7 @@ async def get_revenue_report(
 ):
     """Get revenue report"""
     try:
-        report = execute_query(GET_REVENUE_REPORT_QUERY, fetch_one=True)
+        report = await execute_query_async(GET_REVENUE_REPORT_QUERY, fetch_one=True)
         return report
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -125,20 +159,36 @@ async def get_revenue_report(
 
 @router.get("/insurance-claims")
 async def get_insurance_claims(
+    response: Response,
     status: Optional[str] = None,
+    fields: Optional[str] = None,
+    page: PageParams = Depends(),
     current_user: dict = Depends(check_permissions(["ADMIN", "FINANCE"])),
 ):
-    """Get all insurance claims"""
+    """Get all insurance claims (fields= limits the columns returned)"""
     try:
-        query = GET_INSURANCE_CLAIMS_QUERY
-        params = []
-
-        if status:
-            query = query.replace("ORDER BY", f"WHERE ic.status = %s ORDER BY")
-            params.append(status)
+        query, params = (
+            Filters()
+            .equals("ic.status", status)
+            .apply(
+                INSURANCE_CLAIM_FIELDSET.project(
+                    GET_INSURANCE_CLAIMS_QUERY, INSURANCE_CLAIM_FIELDSET.parse(fields)
+                )
+            )
+        )
 
-        claims = execute_query(query, tuple(params), fetch_all=True)
-        return claims
+        claims = await paginate(
+            response,
+            page,
+            query,
+            params,
+            ("submission_date", "id"),
+            descending=True,
+            nullable=True,
+        )
+        return json_response(claims, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -150,7 +200,7 @@ async def create_insurance_claim(
 ):
     """Create new insurance claim"""
     try:
-        result = execute_query(
+        result = await execute_query_async(
             CREATE_INSURANCE_CLAIM_QUERY,
             (
                 claim_data["patient_id"],
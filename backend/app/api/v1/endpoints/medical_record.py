@@ -0,0 +1,154 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Optional
+from datetime import date
+from ....core.security import check_permissions
+from ....utils.db_utils import execute_query_async
+from ....utils.date_utils import validate_date_range
+from ....utils.filter_utils import Filters
+from ....utils.pagination_utils import PageParams, paginate
+from ....utils.json_utils import json_response
+from ....utils.search_utils import search_medical_records
+from ....sql.queries.medical_record_queries import *
+
+router = APIRouter()
+
+CLINICAL_ROLES = ["ADMIN", "STAFF"]
+
+MEDICAL_RECORD_TEXT_FIELDS = (
+    "diagnosis",
+    "treatment",
+    "prescription",
+    "test_results",
+    "doctor_notes",
+)
+
+
+@router.get("/")
+async def get_all_medical_records(
+    response: Response,
+    patient_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    current_user: dict = Depends(check_permissions(CLINICAL_ROLES)),
+):
+    """Get medical records, newest first, optionally for one patient"""
+    query, params = (
+        Filters()
+        .equals("m.patient_id", patient_id)
+        .apply(GET_ALL_MEDICAL_RECORDS_QUERY)
+    )
+
+    records = await paginate(
+        response,
+        page,
+        query,
+        params,
+        ("record_date", "id"),
+        descending=True,
+        nullable=True,
+    )
+    return json_response(records, response)
+
+
+@router.get("/search")
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    patient_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    page: PageParams = Depends(),
+    current_user: dict = Depends(check_permissions(CLINICAL_ROLES)),
+):
+    """
+    Full-text search of diagnoses, treatments, prescriptions, test results
+    and doctor notes across patients. q takes web-search syntax ("exact
+    phrase", or, -word). Results are ranked, with matches wrapped in <mark>;
+    follow X-Next-Cursor for more.
+    """
+    if start_date and end_date and not validate_date_range(start_date, end_date):
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    records = await search_medical_records(
+        response, page, q, patient_id, start_date, end_date
+    )
+    return json_response(records, response)
+
+
+@router.get("/{record_id}")
+async def get_medical_record(
+    record_id: int,
+    current_user: dict = Depends(check_permissions(CLINICAL_ROLES)),
+):
+    """Get a medical record"""
+    record = await execute_query_async(
+        GET_MEDICAL_RECORD_BY_ID_QUERY, (record_id,), fetch_one=True
+    )
+    if not record:
+        raise HTTPException(status_code=404, detail="Medical record not found")
+    return json_response(record)
+
+
+@router.post("/")
+async def create_medical_record(
+    record_data: dict,
+    current_user: dict = Depends(check_permissions(CLINICAL_ROLES)),
+):
+    """Create a medical record (record_date defaults to now)"""
+    try:
+        result = await execute_query_async(
+            CREATE_MEDICAL_RECORD_QUERY,
+            (
+                record_data["patient_id"],
+                *(record_data.get(field) for field in MEDICAL_RECORD_TEXT_FIELDS),
+                record_data.get("record_date"),
+            ),
+            fetch_one=True,
+        )
+        return {
+            "message": "Medical record created successfully",
+            "record_id": result["id"],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/{record_id}")
+async def update_medical_record(
+    record_id: int,
+    record_data: dict,
+    current_user: dict = Depends(check_permissions(CLINICAL_ROLES)),
+):
+    """Update a medical record's text fields; omitted fields are kept"""
+    record = await execute_query_async(
+        GET_MEDICAL_RECORD_BY_ID_QUERY, (record_id,), fetch_one=True
+    )
+    if not record:
+        raise HTTPException(status_code=404, detail="Medical record not found")
+
+    try:
+        await execute_query_async(
+            UPDATE_MEDICAL_RECORD_QUERY,
+            (
+                *(
+                    record_data.get(field, record[field])
+                    for field in MEDICAL_RECORD_TEXT_FIELDS
+                ),
+                record_id,
+            ),
+        )
+        return {"message": "Medical record updated successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/{record_id}")
+async def delete_medical_record(
+    record_id: int,
+    current_user: dict = Depends(check_permissions(["ADMIN"])),
+):
+    """Delete a medical record"""
+    result = await execute_query_async(
+        DELETE_MEDICAL_RECORD_QUERY, (record_id,), fetch_one=True
+    )
+    if not result:
+        raise HTTPException(status_code=404, detail="Medical record not found")
+    return {"message": "Medical record deleted successfully"}
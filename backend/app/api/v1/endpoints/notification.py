@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from typing import List, Optional
 from datetime import datetime
 from ....core.security import get_current_user
-from ....utils.db_utils import execute_query
+from ....utils.db_utils import execute_query_async
+from ....utils.filter_utils import Filters
+from ....utils.pagination_utils import PageParams, paginate
+from ....utils.json_utils import json_response
 from ....sql.queries.notification_queries import *
 
 router = APIRouter()
@@ -10,18 +13,34 @@ router = APIRouter()
 
 @router.get("/")
 async def get_user_notifications(
-    unread_only: bool = False, current_user: dict = Depends(get_current_user)
+    response: Response,
+    unread_only: bool = False,
+    page: PageParams = Depends(),
+    current_user: dict = Depends(get_current_user),
 ):
     """Get user notifications"""
     try:
-        query = GET_USER_NOTIFICATIONS_QUERY
+        filters = Filters()
         if unread_only:
-            query = query.replace("ORDER BY", "WHERE read = FALSE ORDER BY")
+            # Literal, not a parameter, so the planner can use the partial
+            # idx_notifications_unread index
+            filters.where("read = FALSE")
+        query, params = filters.apply(
+            GET_USER_NOTIFICATIONS_QUERY, (current_user["id"],)
+        )
 
-        notifications = execute_query(
-            query, (current_user["id"],), fetch_all=True
+        notifications = await paginate(
+            response,
+            page,
+            query,
+            params,
+            ("created_at", "id"),
+            descending=True,
+            nullable=True,
         )
-        return notifications
+        return json_response(notifications, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -32,7 +51,7 @@ async def create_notification(
 ):
     """Create new notification"""
     try:
-        result = execute_query(
+        result = await execute_query_async(
             CREATE_NOTIFICATION_QUERY,
             (
                 notification_data["user_id"],
@@ -55,7 +74,7 @@ async def mark_notification_as_read(
 ):
     """Mark notification as read"""
     try:
-        result = execute_query(
+        result = await execute_query_async(
             MARK_NOTIFICATION_READ_QUERY,
             (notification_id, current_user["id"]),
             fetch_one=True,
@@ -73,7 +92,7 @@ async def delete_notification(
 ):
     """Delete notification"""
     try:
-        result = execute_query(
+        result = await execute_query_async(
             DELETE_NOTIFICATION_QUERY,
             (notification_id, current_user["id"]),
             fetch_one=True,
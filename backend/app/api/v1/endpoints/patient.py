@@ -1,74 +1,234 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import functools
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from ....core.security import get_current_user, check_permissions
-from ....utils.db_utils import execute_query
+from ....utils.db_utils import execute_query_async, execute_query_rows_async
+from ....utils.stream_utils import stream_query_response
+from ....utils.pagination_utils import (
+    NEXT_CURSOR_HEADER,
+    PageParams,
+    encode_cursor,
+    paginate,
+)
+from ....utils.json_utils import json_response
+from ....utils.etag_utils import not_modified, set_validators
+from ....utils.search_utils import search_patients, typeahead_patients
+from ....utils.timeline_utils import load_timeline
+from ....utils.match_utils import check_duplicates, find_duplicates
+from ....utils.fields_utils import FieldSet
+from ....utils.import_utils import (
+    guess_import_format,
+    read_patient_records,
+    report_chunks,
+    spool_import_report,
+)
+from ....utils.patient_utils import (
+    parse_includes,
+    attach_includes,
+    attach_includes_to_rows,
+    get_patient_record,
+    get_patient_version,
+    invalidate_patient,
+    patient_resource_version,
+)
 from ....utils.validators import validate_email, validate_phone
 from ....sql.queries.patient_queries import *
 
 router = APIRouter()
 
+PATIENT_FIELDSET = FieldSet(PATIENT_FIELDS)
+
 
 @router.get("/")
 async def get_all_patients(
-    search: Optional[str] = None, current_user: dict = Depends(get_current_user)
+    response: Response,
+    search: Optional[str] = None,
+    include: Optional[str] = None,
+    fields: Optional[str] = None,
+    page: PageParams = Depends(),
+    stream: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    current_user: dict = Depends(get_current_user),
 ):
-    """Get all patients with optional search"""
+    """
+    Get all patients (stream=json|ndjson to stream). With search, returns the
+    best `limit` matches by name or phone, ranked. include= lists the nested
+    collections to return (allergies, medical_history); all by default.
+    fields= limits the patient columns returned.
+    """
     try:
-        query = GET_ALL_PATIENTS_QUERY
-        params = []
+        includes = parse_includes(include)
+        columns = PATIENT_FIELDSET.parse(fields)
+        query = PATIENT_FIELDSET.project(GET_ALL_PATIENTS_QUERY, columns)
 
         if search:
-            query = query.replace(
-                "GROUP BY",
-                "WHERE p.full_name ILIKE %s OR p.contact_number LIKE %s GROUP BY",
+            matches = await search_patients(search, page.limit)
+            ids = matches.column("id")
+            patients = await execute_query_rows_async(
+                PATIENT_FIELDSET.project(GET_PATIENTS_BY_IDS_QUERY, columns),
+                (ids, ids),
+            )
+            return json_response(await attach_includes(patients, includes))
+
+        if stream:
+            return await stream_query_response(
+                query,
+                (),
+                stream,
+                transform=functools.partial(
+                    attach_includes_to_rows, includes=includes
+                ),
             )
-            search_term = f"%{search}%"
-            params.extend([search_term, search_term])
 
-        patients = execute_query(query, tuple(params), fetch_all=True)
-        return patients
+        patients = await paginate(response, page, query, (), ("id",))
+        return json_response(await attach_includes(patients, includes), response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{patient_id}")
-async def get_patient(patient_id: int, current_user: dict = Depends(get_current_user)):
-    """Get specific patient details"""
-    patient = execute_query(
-        GET_PATIENT_BY_ID_QUERY, (patient_id,), fetch_one=True
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user),
+):
+    """Ranked patient search by fuzzy name or (partial) phone number"""
+    return json_response(await search_patients(q, limit))
+
+
+@router.get("/typeahead")
+async def typeahead(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user),
+):
+    """Patient suggestions (id, full_name, date_of_birth) for a search box"""
+    return json_response(await typeahead_patients(q, limit))
+
+
+@router.get("/merge-suggestions")
+async def get_merge_suggestions(
+    response: Response,
+    page: PageParams = Depends(),
+    status_filter: str = Query(
+        "PENDING", alias="status", pattern="^(PENDING|MERGED|DISMISSED)$"
+    ),
+    current_user: dict = Depends(check_permissions(["ADMIN", "STAFF"])),
+):
+    """Likely duplicate patient pairs found by the batch scan, best first"""
+    suggestions = await paginate(
+        response,
+        page,
+        GET_MERGE_SUGGESTIONS_QUERY,
+        (status_filter,),
+        ("score", "patient_id", "duplicate_id"),
+        descending=True,
     )
-    if not patient:
+    return json_response(suggestions, response)
+
+
+@router.put("/merge-suggestions/{patient_id}/{duplicate_id}")
+async def update_merge_suggestion(
+    patient_id: int,
+    duplicate_id: int,
+    status_update: dict,
+    current_user: dict = Depends(check_permissions(["ADMIN", "STAFF"])),
+):
+    """Mark a merge suggestion as MERGED or DISMISSED"""
+    if status_update.get("status") not in ("MERGED", "DISMISSED"):
+        raise HTTPException(
+            status_code=400, detail="status must be MERGED or DISMISSED"
+        )
+    result = await execute_query_async(
+        UPDATE_MERGE_SUGGESTION_STATUS_QUERY,
+        (status_update["status"], patient_id, duplicate_id),
+        fetch_one=True,
+    )
+    if not result:
+        raise HTTPException(status_code=404, detail="Merge suggestion not found")
+    return {"message": "Merge suggestion updated successfully"}
+
+
+@router.get("/{patient_id}")
+async def get_patient(
+    patient_id: int,
+    request: Request,
+    include: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get specific patient details (include= as for the patient list).
+    Supports conditional requests: If-None-Match is answered with 304 from
+    the patient's row version, without loading the record.
+    """
+    includes = parse_includes(include)
+    current = await get_patient_version(patient_id)
+    if current is None:
         raise HTTPException(status_code=404, detail="Patient not found")
-    return patient
+    cached = not_modified(request, patient_resource_version(current, includes))
+    if cached is not None:
+        return cached
+
+    patient = await get_patient_record(patient_id, includes, current["row_version"])
+    if patient is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return set_validators(
+        json_response(patient), patient_resource_version(patient, includes)
+    )
 
 
 @router.post("/")
 async def create_patient(
     patient_data: dict,
+    allow_duplicate: bool = False,
     current_user: dict = Depends(check_permissions(["ADMIN", "STAFF", "FINANCE"])),
 ):
-    """Create new patient"""
+    """
+    Create new patient. Responds 409 with the likely duplicates if the patient
+    seems to be registered already, unless allow_duplicate is set.
+    """
     # Validate email and phone
-    if not validate_email(patient_data["email"]):
+    if patient_data.get("email") and not validate_email(patient_data["email"]):
         raise HTTPException(status_code=400, detail="Invalid email format")
     if not validate_phone(patient_data["contact_number"]):
         raise HTTPException(status_code=400, detail="Invalid phone number")
 
+    if not allow_duplicate:
+        duplicates = await check_duplicates(patient_data)
+        if duplicates:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "message": "Patient may already be registered",
+                    "duplicates": jsonable_encoder(duplicates),
+                },
+            )
+
     try:
-        result = execute_query(
+        result = await execute_query_async(
             CREATE_PATIENT_QUERY,
             (
+                patient_data.get("user_id"),
                 patient_data["full_name"],
                 patient_data["date_of_birth"],
-                patient_data["gender"],
-                patient_data["blood_group"],
                 patient_data["contact_number"],
-                patient_data["email"],
-                patient_data["address"],
-                patient_data["emergency_contact_name"],
-                patient_data["emergency_contact_number"],
-                patient_data.get("insurance_provider"),
-                patient_data.get("insurance_id"),
+                patient_data["emergency_contact"],
+                patient_data.get("blood_group"),
+                patient_data.get("allergies"),
+                patient_data.get("current_medications"),
             ),
             fetch_one=True,
         )
@@ -77,6 +237,27 @@ async def create_patient(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/import")
+def import_patient_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    current_user: dict = Depends(check_permissions(["ADMIN", "STAFF", "FINANCE"])),
+):
+    """
+    Bulk-create patients from a CSV or NDJSON upload. The response is an
+    NDJSON report: one line per rejected row, then a summary line. The
+    import finishes before the report is sent, so a failed import returns
+    an error status rather than a truncated report.
+    """
+    fmt = format or guess_import_format(file.filename)
+    if fmt is None:
+        raise HTTPException(
+            status_code=400, detail="Pass format=csv or format=ndjson for this file"
+        )
+    report = spool_import_report(read_patient_records(file.file, fmt))
+    return StreamingResponse(report_chunks(report), media_type="application/x-ndjson")
+
+
 @router.put("/{patient_id}")
 async def update_patient(
     patient_id: int,
@@ -85,7 +266,7 @@ async def update_patient(
 ):
     """Update patient information"""
     try:
-        result = execute_query(
+        result = await execute_query_async(
             UPDATE_PATIENT_QUERY,
             (
                 patient_data["full_name"],
@@ -102,6 +283,7 @@ async def update_patient(
         )
         if not result:
             raise HTTPException(status_code=404, detail="Patient not found")
+        await invalidate_patient(patient_id)
         return {"message": "Patient updated successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -115,7 +297,7 @@ async def add_patient_allergy(
 ):
     """Add patient allergy"""
     try:
-        result = execute_query(
+        result = await execute_query_async(
             ADD_PATIENT_ALLERGY_QUERY,
             (
                 patient_id,
@@ -126,6 +308,7 @@ async def add_patient_allergy(
             ),
             fetch_one=True,
         )
+        await invalidate_patient(patient_id)
         return {"message": "Allergy added successfully", "allergy_id": result["id"]}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -139,7 +322,7 @@ async def add_medical_history(
 ):
     """Add medical history entry"""
     try:
-        result = execute_query(
+        result = await execute_query_async(
             ADD_MEDICAL_HISTORY_QUERY,
             (
                 patient_id,
@@ -150,6 +333,7 @@ async def add_medical_history(
             ),
             fetch_one=True,
         )
+        await invalidate_patient(patient_id)
         return {
             "message": "Medical history added successfully",
             "history_id": result["id"],
@@ -164,7 +348,7 @@ async def get_patient_visits(
 ):
     """Get patient visit history"""
     try:
-        visits = execute_query(
+        visits = await execute_query_async(
             GET_PATIENT_VISITS_QUERY, (patient_id,), fetch_all=True
         )
         return visits
@@ -172,6 +356,38 @@ async def get_patient_visits(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{patient_id}/duplicates")
+async def get_patient_duplicates(
+    patient_id: int,
+    current_user: dict = Depends(check_permissions(["ADMIN", "STAFF"])),
+):
+    """Other patients likely to be the same person, best match first"""
+    patient = await execute_query_async(
+        GET_PATIENT_BY_ID_QUERY, (patient_id,), fetch_one=True
+    )
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return json_response(await find_duplicates(patient, exclude_id=patient_id))
+
+
+@router.get("/{patient_id}/timeline")
+async def get_patient_timeline(
+    patient_id: int,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Patient appointments, admissions, medical records, bills and insurance
+    claims as one event list, newest first. Follow X-Next-Cursor for older
+    events.
+    """
+    events, next_cursor = await load_timeline(patient_id, page.limit, page.cursor)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_cursor)
+    return json_response(events, response)
+
+
 @router.post("/{patient_id}/visits")
 async def record_patient_visit(
     patient_id: int,
@@ -180,16 +396,8 @@ async def record_patient_visit(
 ):
     """Record new patient visit"""
     try:
-        result = execute_query(
-            """
-            INSERT INTO patient_visits (
-                patient_id, doctor_id, visit_date,
-                symptoms, diagnosis, prescription,
-                notes
-            )
-            VALUES (%s, %s, NOW(), %s, %s, %s, %s)
-            RETURNING id;
-            """,
+        result = await execute_query_async(
+            CREATE_PATIENT_VISIT_QUERY,
             (
                 patient_id,
                 visit_data["doctor_id"],
@@ -200,6 +408,7 @@ async def record_patient_visit(
             ),
             fetch_one=True,
         )
+        await invalidate_patient(patient_id)
         return {"message": "Visit recorded successfully", "visit_id": result["id"]}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,21 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from ....core.security import get_current_user, check_permissions
-from ....utils.db_utils import execute_query
+from ....utils.db_utils import execute_query, execute_query_async, execute_query_rows
 from ....utils.validators import validate_email, validate_phone
+from ....utils.pagination_utils import PageParams, paginate, strip_order_by
+from ....utils.json_utils import json_response
+from ....utils.etag_utils import not_modified, set_validators, table_version
+from ....utils.fields_utils import FieldSet
 from ....sql.queries.staff_queries import *
   
 router = APIRouter()
 
-# Query for attendance
-GET_ATTENDANCE_QUERY = """
-    SELECT id, staff_id, date, clock_in, clock_out, status, overtime_hours
-    FROM attendance
-    WHERE staff_id = %s
-    ORDER BY date DESC;
-"""
+STAFF_FIELDSET = FieldSet(STAFF_FIELDS)
 
 # Output models
 class StaffScheduleOut(BaseModel):
@@ -39,13 +37,18 @@ class AttendanceOut(BaseModel):
 # GET / -> Get all staff members with optional filtering by department and/or role.
 @router.get("/", response_model=List[dict])
 async def get_all_staff(
+    response: Response,
     department_id: Optional[int] = None,
     role: Optional[str] = None,
+    fields: Optional[str] = None,
+    page: PageParams = Depends(),
     current_user: dict = Depends(check_permissions(["ADMIN", "STAFF", "FINANCE"]))
 ):
     try:
         # Build the query dynamically
-        query = GET_ALL_STAFF_QUERY.rstrip(";")
+        query = STAFF_FIELDSET.project(
+            strip_order_by(GET_ALL_STAFF_QUERY), STAFF_FIELDSET.parse(fields)
+        )
         params = []
         conditions = []
         if department_id:
@@ -56,10 +59,11 @@ async def get_all_staff(
             params.append(role)
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
-        query += ";"
-        
-        staff = execute_query(query, tuple(params), fetch_all=True)
-        return staff
+
+        staff = await paginate(response, page, query, tuple(params), ("id",))
+        return json_response(staff, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -73,20 +77,26 @@ def get_attendance_records(
     # If staff_id is not provided, use the id from current_user
     if staff_id is None:
         staff_id = current_user.get("id")
-    records = execute_query(GET_ATTENDANCE_QUERY, (staff_id,), fetch_all=True)
-    return records
+    records = execute_query_rows(GET_ATTENDANCE_QUERY, (staff_id,))
+    return json_response(records, model=AttendanceOut)
 
 
 
 # Staff schedule endpoint: GET /schedule returns list of staff schedules.
 @router.get("/schedule", response_model=List[StaffScheduleOut])
-def get_all_staff_schedules(
+async def get_all_staff_schedules(
+    request: Request,
     current_user: dict = Depends(get_current_user)
 ):
-    schedules = execute_query(GET_ALL_STAFF_SCHEDULES_QUERY, fetch_all=True)
+    # Conditional: answered with 304 while staff and schedules are unchanged
+    version = await table_version("staff-schedules", ["staff_schedules", "staff"])
+    cached = not_modified(request, version)
+    if cached is not None:
+        return cached
+    schedules = await execute_query_async(GET_ALL_STAFF_SCHEDULES_QUERY, fetch_all=True)
     if schedules is None:
         raise HTTPException(status_code=404, detail="No schedules found")
-    return schedules
+    return set_validators(json_response(schedules, model=StaffScheduleOut), version)
 
 
 # GET /{staff_id} returns details for a specific staff member.
@@ -95,7 +105,9 @@ async def get_staff_member(
     staff_id: int,
     current_user: dict = Depends(check_permissions(["ADMIN", "STAFF", "FINANCE"]))
 ):
-    staff = execute_query(GET_STAFF_BY_ID_QUERY, (staff_id,), fetch_one=True)
+    staff = await execute_query_async(
+        GET_STAFF_BY_ID_QUERY, (staff_id,), fetch_one=True
+    )
     if not staff:
         raise HTTPException(status_code=404, detail="Staff member not found")
     return staff
@@ -114,7 +126,7 @@ async def create_staff_member(
         raise HTTPException(status_code=400, detail="Invalid phone number")
     
     try:
-        result = execute_query(
+        result = await execute_query_async(
             CREATE_STAFF_QUERY,
             (
                 staff_data["full_name"],
@@ -143,11 +155,13 @@ async def update_staff_member(
     staff_data: dict,
     current_user: dict = Depends(check_permissions(["ADMIN", "STAFF", "FINANCE"]))
 ):
-    if not execute_query(GET_STAFF_BY_ID_QUERY, (staff_id,), fetch_one=True):
+    if not await execute_query_async(
+        GET_STAFF_BY_ID_QUERY, (staff_id,), fetch_one=True
+    ):
         raise HTTPException(status_code=404, detail="Staff member not found")
 
     try:
-        execute_query(
+        await execute_query_async(
             UPDATE_STAFF_QUERY,
             (
                 staff_data["full_name"],
@@ -171,7 +185,7 @@ async def get_department_schedule(
     department_id: int,
     current_user: dict = Depends(check_permissions(["ADMIN"]))
 ):
-    schedules = execute_query(
+    schedules = await execute_query_async(
         GET_STAFF_SCHEDULE_QUERY, (department_id,), fetch_all=True
     )
     return schedules
@@ -1,4 +1,17 @@
 from .settings import settings
-from .database import get_db_connection, get_db_cursor, initialize_database
+from .database import (
+    get_db_connection,
+    get_db_cursor,
+    initialize_database,
+    get_pool_stats,
+    close_pool,
+)
 
-__all__ = ["settings", "get_db_connection", "get_db_cursor", "initialize_database"]
+__all__ = [
+    "settings",
+    "get_db_connection",
+    "get_db_cursor",
+    "initialize_database",
+    "get_pool_stats",
+    "close_pool",
+]
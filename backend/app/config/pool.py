@@ -0,0 +1,263 @@
+# app/config/pool.py
+import threading
+import time
+import logging
+from collections import deque
+from typing import Callable, Dict, Any
+
+import psycopg2
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out before the timeout."""
+
+
+class PooledConnection(extensions.connection):
+    """
+    psycopg2 connection that remembers the statements prepared on it, since
+    prepared statements live as long as the server session.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+
+    Idle connections are reused most-recently-used first, closed once they have
+    been idle longer than idle_timeout (down to min_size) or have lived longer
+    than max_lifetime, and optionally pinged before being handed out.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        max_lifetime: float = 3600.0,
+        checkout_timeout: float = 10.0,
+        pre_ping: bool = True,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Invalid pool size configuration")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.pre_ping = pre_ping
+
+        self._cond = threading.Condition()
+        # Idle entries are (connection, created_at, last_used); the right end is
+        # the most recently returned connection.
+        self._idle = deque()
+        self._in_use: Dict[int, float] = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "failed_pings": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def fill(self) -> None:
+        """Open connections until the pool holds at least min_size."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._open()
+            with self._cond:
+                self._idle.appendleft((conn, time.monotonic(), time.monotonic()))
+                self._cond.notify()
+
+    def getconn(self):
+        """Check a connection out of the pool, waiting up to checkout_timeout."""
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+        while True:
+            entry = self._reserve(deadline)
+            if entry is None:
+                conn = self._open()
+                created_at = time.monotonic()
+            else:
+                conn, created_at, last_used = entry
+                if self._expired(created_at, last_used) or not self._usable(conn):
+                    self._discard(conn)
+                    continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._in_use[id(conn)] = created_at
+                self._stats["checkouts"] += 1
+                self._stats["total_wait_seconds"] += waited
+                if waited > self._stats["max_wait_seconds"]:
+                    self._stats["max_wait_seconds"] = waited
+            return conn
+
+    def putconn(self, conn) -> None:
+        """Return a connection to the pool, resetting any open transaction."""
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), None)
+            closed = self._closed
+        if created_at is None:
+            logger.warning("Returned a connection that was not checked out")
+            return
+
+        if closed or conn.closed:
+            self._discard(conn)
+            return
+
+        status = conn.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            self._discard(conn)
+            return
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                self._discard(conn)
+                return
+
+        if time.monotonic() - created_at >= self.max_lifetime:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+        self._prune()
+
+    def close(self) -> None:
+        """Close all idle connections; in-use ones are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool occupancy and counters."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "min_size": self.min_size,
+                    "max_size": self.max_size,
+                    "size": self._size,
+                    "idle": len(self._idle),
+                    "in_use": len(self._in_use),
+                    "waiting": self._waiting,
+                }
+            )
+        return stats
+
+    def _reserve(self, deadline: float):
+        """
+        Pop an idle entry, or reserve a slot for a new connection (returns None).
+        Raises PoolTimeoutError if neither happens before the deadline.
+        """
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                    if self._idle:
+                        return self._idle.pop()
+                    if self._size < self.max_size:
+                        self._size += 1
+                        return None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.checkout_timeout:g}s waiting for a "
+                            f"database connection ({self.max_size} in use)"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["connections_opened"] += 1
+        return conn
+
+    def _discard(self, conn) -> None:
+        self._close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self._stats["connections_closed"] += 1
+            self._cond.notify()
+
+    def _prune(self) -> None:
+        """Close the oldest idle connections past idle_timeout, keeping min_size."""
+        expired = []
+        now = time.monotonic()
+        with self._cond:
+            while self._idle and self._size - len(expired) > self.min_size:
+                conn, _, last_used = self._idle[0]
+                if now - last_used < self.idle_timeout:
+                    break
+                self._idle.popleft()
+                expired.append(conn)
+        for conn in expired:
+            self._discard(conn)
+
+    def _expired(self, created_at: float, last_used: float) -> bool:
+        now = time.monotonic()
+        return (
+            now - created_at >= self.max_lifetime
+            or now - last_used >= self.idle_timeout
+        )
+
+    def _usable(self, conn) -> bool:
+        if conn.closed:
+            return False
+        if not self.pre_ping:
+            return True
+        autocommit = conn.autocommit
+        try:
+            # Ping outside a transaction so checkout costs a single round trip.
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.autocommit = autocommit
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"Discarding stale pooled connection: {e}")
+            with self._cond:
+                self._stats["failed_pings"] += 1
+            return False
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
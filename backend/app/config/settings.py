@@ -14,6 +14,86 @@ class Settings:
     DB_PORT: str = os.getenv("DB_PORT", "5432")
     DB_NAME: str = os.getenv("DB_NAME", "hospital_db")
 
+    # Connection pool (per worker process)
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_IDLE_TIMEOUT: float = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+    DB_POOL_MAX_LIFETIME: float = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+    DB_POOL_CHECKOUT_TIMEOUT: float = float(
+        os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "10")
+    )
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+    # Threads running queries for async endpoints; defaults to the pool size
+    DB_EXECUTOR_WORKERS: int = int(
+        os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_MAX_SIZE))
+    )
+    # Prepare named queries from app/sql/queries once per pooled connection
+    DB_PREPARED_STATEMENTS: bool = (
+        os.getenv("DB_PREPARED_STATEMENTS", "True").lower() == "true"
+    )
+    # Rows fetched per round trip by streaming (server-side cursor) queries
+    DB_STREAM_ITERSIZE: int = int(os.getenv("DB_STREAM_ITERSIZE", "2000"))
+    # Log queries slower than this (0 disables), with their EXPLAIN plan
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "500"))
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "True").lower() == "true"
+    # Bulk writes: rows per INSERT ... VALUES page, row count from which
+    # bulk_write switches to COPY, and bytes read per COPY round trip
+    BULK_PAGE_SIZE: int = int(os.getenv("BULK_PAGE_SIZE", "1000"))
+    BULK_COPY_THRESHOLD: int = int(os.getenv("BULK_COPY_THRESHOLD", "5000"))
+    BULK_COPY_BUFFER_SIZE: int = int(os.getenv("BULK_COPY_BUFFER_SIZE", "65536"))
+    # Parquet exports: rows per fetch and row group, and compression codec
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "50000"))
+    EXPORT_COMPRESSION: str = os.getenv("EXPORT_COMPRESSION", "zstd")
+    # Rows validated, staged and committed together by the bulk patient import
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", "10000"))
+    # Duplicate patients: minimum match score (0-1), time budget of the check
+    # run when a patient is created, candidates read per blocking key, and
+    # the largest block the batch scan compares pairwise
+    DUPLICATE_MATCH_THRESHOLD: float = float(
+        os.getenv("DUPLICATE_MATCH_THRESHOLD", "0.8")
+    )
+    DUPLICATE_CHECK_TIMEOUT_MS: float = float(
+        os.getenv("DUPLICATE_CHECK_TIMEOUT_MS", "200")
+    )
+    DUPLICATE_CANDIDATE_LIMIT: int = int(os.getenv("DUPLICATE_CANDIDATE_LIMIT", "50"))
+    DUPLICATE_MAX_BLOCK_SIZE: int = int(os.getenv("DUPLICATE_MAX_BLOCK_SIZE", "1000"))
+    # Assembled patient records cached per worker (size 0 disables, TTL in
+    # seconds); writes broadcast invalidations to every worker on this
+    # LISTEN/NOTIFY channel
+    PATIENT_CACHE_SIZE: int = int(os.getenv("PATIENT_CACHE_SIZE", "1000"))
+    PATIENT_CACHE_TTL: float = float(os.getenv("PATIENT_CACHE_TTL", "300"))
+    CACHE_INVALIDATION_CHANNEL: str = os.getenv(
+        "CACHE_INVALIDATION_CHANNEL", "hms_cache_invalidation"
+    )
+    # Appointment slots: slot length in minutes, how many days ahead free
+    # slots are offered, and the per-worker cache of doctor calendars (size 0
+    # disables, TTL in seconds; bookings made through the API invalidate it)
+    APPOINTMENT_SLOT_MINUTES: int = int(os.getenv("APPOINTMENT_SLOT_MINUTES", "15"))
+    SLOT_HORIZON_DAYS: int = int(os.getenv("SLOT_HORIZON_DAYS", "90"))
+    SLOT_CACHE_SIZE: int = int(os.getenv("SLOT_CACHE_SIZE", "2000"))
+    SLOT_CACHE_TTL: float = float(os.getenv("SLOT_CACHE_TTL", "60"))
+    # Longest date window of the appointment calendar endpoint, in days
+    CALENDAR_MAX_DAYS: int = int(os.getenv("CALENDAR_MAX_DAYS", "366"))
+    # Appointment reminders: how far ahead they go out, appointments claimed
+    # per chunk, and how long a claim lasts before another dispatcher may
+    # take it over (seconds)
+    REMINDER_LEAD_HOURS: float = float(os.getenv("REMINDER_LEAD_HOURS", "24"))
+    REMINDER_BATCH_SIZE: int = int(os.getenv("REMINDER_BATCH_SIZE", "500"))
+    REMINDER_CLAIM_SECONDS: float = float(os.getenv("REMINDER_CLAIM_SECONDS", "600"))
+
+    # Email. SMTP connections are pooled and reused; SMTP_POOL_SIZE also
+    # bounds how many messages are sent at once
+    SMTP_HOST: str = os.getenv("SMTP_HOST", "localhost")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "25"))
+    SMTP_USERNAME: str = os.getenv("SMTP_USERNAME", "")
+    SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
+    SMTP_TLS: bool = os.getenv("SMTP_TLS", "False").lower() == "true"
+    SMTP_SENDER: str = os.getenv("SMTP_SENDER", "noreply@localhost")
+    SMTP_TIMEOUT: float = float(os.getenv("SMTP_TIMEOUT", "30"))
+    SMTP_POOL_SIZE: int = int(os.getenv("SMTP_POOL_SIZE", "4"))
+    # Base URL of the frontend, for links in emails
+    FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:3000")
+
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
@@ -31,6 +111,16 @@ class Settings:
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = eval(os.getenv("BACKEND_CORS_ORIGINS", "[]"))
 
+    # Validate query results against their response models before sending
+    # them; off by default since database output is trusted
+    VALIDATE_DB_RESPONSES: bool = (
+        os.getenv("VALIDATE_DB_RESPONSES", "False").lower() == "true"
+    )
+
+    # Pagination
+    PAGE_SIZE_DEFAULT: int = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+    PAGE_SIZE_MAX: int = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
 
@@ -9,6 +9,7 @@ from .security import (
 from .errors import (
     CustomHTTPException,
     DatabaseError,
+    DatabaseBusyError,
     AuthenticationError,
     AuthorizationError,
     ResourceNotFoundError,
@@ -24,6 +25,7 @@ __all__ = [
     "check_permissions",
     "CustomHTTPException",
     "DatabaseError",
+    "DatabaseBusyError",
     "AuthenticationError",
     "AuthorizationError",
     "ResourceNotFoundError",
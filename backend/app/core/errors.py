@@ -74,6 +74,32 @@ class DatabaseError(CustomHTTPException):
         )
 
 
+class DatabaseBusyError(CustomHTTPException):
+    def __init__(
+        self,
+        detail: str = "Database is busy, please retry",
+        internal_error: Exception = None,
+    ):
+        super().__init__(
+            status_code=503,
+            detail=detail,
+            error_code="DATABASE_BUSY",
+            internal_error=internal_error,
+        )
+
+
+class QueryTimeoutError(DatabaseBusyError):
+    """A query was cancelled for running past its statement_timeout"""
+
+    def __init__(
+        self,
+        detail: str = "Query took too long, please retry",
+        internal_error: Exception = None,
+    ):
+        super().__init__(detail=detail, internal_error=internal_error)
+        self.error_code = "QUERY_TIMEOUT"
+
+
 class AuthenticationError(CustomHTTPException):
     def __init__(self, detail: str = "Authentication failed"):
         super().__init__(
@@ -109,3 +135,29 @@ class DuplicateError(CustomHTTPException):
             detail=f"{resource} already exists",
             error_code="DUPLICATE_ERROR",
         )
+
+
+# Client-facing messages for exclusion constraint violations, by constraint
+CONFLICT_MESSAGES = {
+    "appointments_no_double_booking": "The doctor is already booked at that time",
+}
+
+
+class ConflictError(CustomHTTPException):
+    def __init__(
+        self,
+        detail: str = "Conflicts with an existing record",
+        internal_error: Exception = None,
+    ):
+        super().__init__(
+            status_code=409,
+            detail=detail,
+            error_code="CONFLICT",
+            internal_error=internal_error,
+        )
+
+    @classmethod
+    def for_constraint(cls, constraint: str, internal_error: Exception = None):
+        if constraint in CONFLICT_MESSAGES:
+            return cls(CONFLICT_MESSAGES[constraint], internal_error)
+        return cls(internal_error=internal_error)
@@ -2,11 +2,17 @@ import datetime
 import os
 import logging
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from .config.database import initialize_database
+from .config.database import initialize_database, close_pool, get_pool_stats
 from .api.v1.api import api_router
+from .utils.db_utils import shutdown_executor
+from .utils.pagination_utils import NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER
+from .utils.json_utils import FastJSONResponse
+from .utils.etag_utils import VALIDATOR_HEADERS
+from .utils.metrics_utils import METRICS_CONTENT_TYPE, render_metrics
+from .utils.cache_utils import start_invalidation_listener, stop_invalidation_listener
 
 # Load environment variables
 load_dotenv()
@@ -27,6 +33,7 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=os.getenv("PROJECT_NAME"),
         debug=os.getenv("DEBUG", "False").lower() == "true",
+        default_response_class=FastJSONResponse,
     )
 
     # Configure CORS
@@ -37,6 +44,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, TOTAL_ESTIMATE_HEADER] + VALIDATOR_HEADERS,
     )
 
     # Include API router
@@ -64,6 +72,36 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.datetime.now().isoformat()}
 
 
+# Connection pool statistics for this worker
+@app.get("/health/pool")
+async def pool_stats():
+    return {
+        "pid": os.getpid(),
+        "pool": get_pool_stats(),
+        "timestamp": datetime.datetime.now().isoformat(),
+    }
+
+
+# Prometheus metrics for this worker (query latency, errors, pool usage)
+@app.get("/metrics")
+def metrics():
+    return Response(
+        render_metrics(get_pool_stats()), media_type=METRICS_CONTENT_TYPE
+    )
+
+
+@app.on_event("startup")
+def start_cache_invalidation():
+    start_invalidation_listener()
+
+
+@app.on_event("shutdown")
+def shutdown_database():
+    stop_invalidation_listener()
+    shutdown_executor()
+    close_pool()
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
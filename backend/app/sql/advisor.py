@@ -0,0 +1,138 @@
+"""
+Index advisor: EXPLAINs every named query in app.sql.queries and reports
+sequential scans on large tables.
+
+Run it against a database seeded with realistic volumes (and ANALYZEd), since
+the planner rightly prefers sequential scans on small tables:
+
+    python -m app.sql.advisor [--min-rows 10000]
+
+Exits with status 1 if any query sequentially scans a table of at least
+--min-rows rows.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from typing import Dict, Iterator, List
+
+import psycopg2
+
+from ..config.database import get_db_connection
+from .registry import registry, PreparedStatement
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_ROWS = 10000
+
+
+def _plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _table_sizes(cursor) -> Dict[str, int]:
+    cursor.execute(
+        """
+        SELECT relname, reltuples::bigint AS rows
+        FROM pg_class
+        WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace;
+        """
+    )
+    return {row["relname"]: row["rows"] for row in cursor.fetchall()}
+
+
+def explain(cursor, statement: PreparedStatement) -> dict:
+    """
+    Return the generic plan of a statement, i.e. the plan used for any
+    parameter values, without executing it.
+    """
+    name = f"advisor_{statement.name}"
+    cursor.execute(statement.prepare_sql.replace(statement.name, name, 1))
+    args = ", ".join(["NULL"] * statement.param_count)
+    cursor.execute(
+        f"EXPLAIN (FORMAT JSON) EXECUTE {name}" + (f" ({args})" if args else "")
+    )
+    plan = cursor.fetchone()["QUERY PLAN"]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def advise(min_rows: int = DEFAULT_MIN_ROWS) -> List[dict]:
+    """
+    Return one finding per sequential scan of a table with at least min_rows
+    rows, plus one per query that could not be planned.
+    """
+    findings = []
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                sizes = _table_sizes(cursor)
+                cursor.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+                for statement in registry.statements():
+                    cursor.execute("SAVEPOINT advisor")
+                    try:
+                        plan = explain(cursor, statement)
+                    except psycopg2.Error as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT advisor")
+                        findings.append(
+                            {"query": statement.name, "error": str(e).strip()}
+                        )
+                        continue
+                    for node in _plan_nodes(plan):
+                        table = node.get("Relation Name")
+                        if node["Node Type"] != "Seq Scan" or table is None:
+                            continue
+                        rows = sizes.get(table, 0)
+                        if rows >= min_rows:
+                            findings.append(
+                                {
+                                    "query": statement.name,
+                                    "table": table,
+                                    "table_rows": rows,
+                                    "filter": node.get("Filter"),
+                                }
+                            )
+        finally:
+            # EXPLAIN never executes the statements, but the prepared
+            # statements and setting are discarded all the same.
+            conn.rollback()
+            conn.prepared_statements.clear()
+            with conn.cursor() as cursor:
+                cursor.execute("DEALLOCATE ALL")
+            conn.commit()
+    return findings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--min-rows",
+        type=int,
+        default=DEFAULT_MIN_ROWS,
+        help="only report sequential scans of tables with at least this many rows",
+    )
+    args = parser.parse_args(argv)
+
+    findings = advise(args.min_rows)
+    scans = [finding for finding in findings if "table" in finding]
+    for finding in findings:
+        if "error" in finding:
+            print(f"{finding['query']}: could not plan: {finding['error']}")
+        else:
+            line = (
+                f"{finding['query']}: sequential scan on {finding['table']} "
+                f"(~{finding['table_rows']} rows)"
+            )
+            if finding["filter"]:
+                line += f" filter: {finding['filter']}"
+            print(line)
+    print(f"{len(registry.statements())} queries checked, {len(scans)} sequential scans")
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
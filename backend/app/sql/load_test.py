@@ -0,0 +1,266 @@
+"""
+Double-booking load test: many clients book the same few slots at once.
+
+Creates a throwaway doctor and patient, starts --workers threads (each with
+its own connection) together, and has every one of them try to book every
+one of --slots adjacent slots with CREATE_APPOINTMENT_QUERY, as the API
+does. The appointments_no_double_booking constraint must let exactly one
+booking per slot through and turn the rest away as conflicts:
+
+    python -m app.sql.load_test [--workers 80] [--slots 5]
+
+Prints outcome counts, latency and throughput, and exits with status 1 if a
+slot was booked other than once or a doctor ends up with overlapping
+scheduled appointments. Everything it creates is deleted afterwards.
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import psycopg2.errors
+
+from ..config.database import open_connection
+from ..config.settings import settings
+from .queries.appointment_queries import CREATE_APPOINTMENT_QUERY
+
+DEFAULT_WORKERS = 80
+DEFAULT_SLOTS = 5
+
+OVERLAPPING_BOOKINGS_QUERY = """
+    SELECT count(*) AS overlaps
+    FROM appointments a
+    JOIN appointments b
+      ON a.doctor_id = b.doctor_id AND a.id < b.id
+    WHERE a.doctor_id = %s
+      AND a.status = 'SCHEDULED' AND NOT a.overbooked
+      AND b.status = 'SCHEDULED' AND NOT b.overbooked
+      AND a.appointment_date
+          < b.appointment_date + b.duration_minutes * interval '1 minute'
+      AND b.appointment_date
+          < a.appointment_date + a.duration_minutes * interval '1 minute';
+"""
+
+
+def _create_fixtures(cursor) -> Tuple[int, int]:
+    """A doctor user (with a staff row) and a patient to book for"""
+    tag = uuid.uuid4().hex[:12]
+    cursor.execute(
+        """
+        INSERT INTO users (email, password, role)
+        VALUES (%s, '!', 'STAFF')
+        RETURNING id
+        """,
+        (f"load-test-{tag}@example.invalid",),
+    )
+    doctor_id = cursor.fetchone()["id"]
+    cursor.execute(
+        """
+        INSERT INTO staff (user_id, full_name, role, specialization)
+        VALUES (%s, %s, 'DOCTOR', 'Load Test')
+        """,
+        (doctor_id, f"Load Test Doctor {tag}"),
+    )
+    cursor.execute(
+        """
+        INSERT INTO patients (
+            full_name, date_of_birth, contact_number, emergency_contact
+        )
+        VALUES (%s, '1970-01-01', '0000000000', '0000000000')
+        RETURNING id
+        """,
+        (f"Load Test Patient {tag}",),
+    )
+    return doctor_id, cursor.fetchone()["id"]
+
+
+def _delete_fixtures(cursor, doctor_id: int, patient_id: int) -> None:
+    cursor.execute("DELETE FROM appointments WHERE doctor_id = %s", (doctor_id,))
+    cursor.execute("DELETE FROM staff WHERE user_id = %s", (doctor_id,))
+    cursor.execute("DELETE FROM patients WHERE id = %s", (patient_id,))
+    cursor.execute("DELETE FROM users WHERE id = %s", (doctor_id,))
+
+
+def _worker(
+    conn,
+    doctor_id: int,
+    patient_id: int,
+    slots: List[datetime],
+    duration: int,
+    barrier: threading.Barrier,
+    outcomes: Counter,
+    latencies: List[float],
+    lock: threading.Lock,
+) -> None:
+    try:
+        barrier.wait()
+        for start in slots:
+            began = time.perf_counter()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        CREATE_APPOINTMENT_QUERY,
+                        (patient_id, doctor_id, start, "SCHEDULED", "Load test", duration),
+                    )
+                conn.commit()
+                outcome = "booked"
+            except psycopg2.errors.ExclusionViolation:
+                conn.rollback()
+                outcome = "conflict"
+            except psycopg2.Error:
+                conn.rollback()
+                outcome = "error"
+            elapsed = time.perf_counter() - began
+            with lock:
+                outcomes[outcome] += 1
+                latencies.append(elapsed)
+    finally:
+        conn.close()
+
+
+def run(workers: int, slots: int) -> Dict[str, object]:
+    """
+    Run the test and return its results; "ok" is False if the constraint
+    let a double booking through.
+    """
+    duration = settings.APPOINTMENT_SLOT_MINUTES
+    # Far enough ahead to clash with nothing real; the doctor is new anyway
+    first = datetime.combine(
+        datetime.now().date() + timedelta(days=365), datetime.min.time()
+    ) + timedelta(hours=9)
+    starts = [first + timedelta(minutes=duration * i) for i in range(slots)]
+
+    setup = open_connection()
+    try:
+        with setup.cursor() as cursor:
+            doctor_id, patient_id = _create_fixtures(cursor)
+        setup.commit()
+    except Exception:
+        setup.close()
+        raise
+
+    connections = []
+    try:
+        # Connect everyone before the start, so the barrier releases clients
+        # that are all ready to book (and a too-low max_connections fails
+        # here rather than mid-test)
+        for _ in range(workers):
+            connections.append(open_connection())
+
+        outcomes: Counter = Counter()
+        latencies: List[float] = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(workers)
+        threads = [
+            threading.Thread(
+                target=_worker,
+                args=(
+                    conn,
+                    doctor_id,
+                    patient_id,
+                    # Half the workers go through the slots backwards, so
+                    # bookings contend from both ends
+                    starts if i % 2 == 0 else starts[::-1],
+                    duration,
+                    barrier,
+                    outcomes,
+                    latencies,
+                    lock,
+                ),
+            )
+            for i, conn in enumerate(connections)
+        ]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        with setup.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT appointment_date, count(*) AS bookings
+                FROM appointments
+                WHERE doctor_id = %s AND status = 'SCHEDULED'
+                GROUP BY appointment_date
+                """,
+                (doctor_id,),
+            )
+            per_slot = {
+                row["appointment_date"]: row["bookings"] for row in cursor.fetchall()
+            }
+            cursor.execute(OVERLAPPING_BOOKINGS_QUERY, (doctor_id,))
+            overlaps = cursor.fetchone()["overlaps"]
+    finally:
+        for conn in connections:
+            if not conn.closed:
+                conn.close()
+        setup.rollback()
+        with setup.cursor() as cursor:
+            _delete_fixtures(cursor, doctor_id, patient_id)
+        setup.commit()
+        setup.close()
+
+    latencies.sort()
+    booked_once = all(per_slot.get(start) == 1 for start in starts)
+    return {
+        "attempts": len(latencies),
+        "outcomes": dict(outcomes),
+        "seconds": elapsed,
+        "per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": (
+            latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            if latencies
+            else 0.0
+        ),
+        "per_slot": [per_slot.get(start, 0) for start in starts],
+        "overlaps": overlaps,
+        "ok": booked_once and overlaps == 0 and not outcomes["error"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="concurrent clients, each with its own connection",
+    )
+    parser.add_argument(
+        "--slots",
+        type=int,
+        default=DEFAULT_SLOTS,
+        help="adjacent slots every client tries to book",
+    )
+    args = parser.parse_args(argv)
+
+    result = run(args.workers, args.slots)
+    outcomes = result["outcomes"]
+    print(
+        f"{result['attempts']} booking attempts in {result['seconds']:.2f}s "
+        f"({result['per_second']:.0f}/s): {outcomes.get('booked', 0)} booked, "
+        f"{outcomes.get('conflict', 0)} conflicts, {outcomes.get('error', 0)} errors"
+    )
+    print(f"latency p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+    print(f"bookings per slot: {result['per_slot']}")
+    if not result["ok"]:
+        print(
+            f"FAILED: double booking ({result['overlaps']} overlapping pairs) "
+            f"or errors"
+        )
+        return 1
+    print("OK: every slot booked exactly once")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
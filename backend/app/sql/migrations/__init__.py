@@ -0,0 +1,8 @@
+"""
+Versioned schema migrations, applied in order by app.sql.migrator.
+
+Each module is named v<NNN>_<description>.py and defines either UP, a list of
+statements, or upgrade(cursor). Migrations run in a single transaction unless
+the module sets TRANSACTIONAL = False (e.g. for CREATE INDEX CONCURRENTLY).
+Applied migrations must never be edited; change the schema in a new one.
+"""
@@ -0,0 +1,35 @@
+"""
+Tables referenced by the named queries that the initial schema never created.
+"""
+
+UP = [
+    """
+    CREATE TABLE IF NOT EXISTS password_reset_tokens (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        token VARCHAR(255) UNIQUE NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        expires_at TIMESTAMP NOT NULL,
+        used BOOLEAN DEFAULT FALSE
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS patient_visits (
+        id SERIAL PRIMARY KEY,
+        patient_id INTEGER REFERENCES patients(id),
+        doctor_id INTEGER REFERENCES users(id),
+        visit_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        symptoms TEXT,
+        diagnosis TEXT,
+        prescription TEXT,
+        notes TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS beds (
+        id SERIAL PRIMARY KEY,
+        bed_number VARCHAR(10) UNIQUE NOT NULL,
+        status VARCHAR(20) DEFAULT 'AVAILABLE' CHECK (status IN ('AVAILABLE', 'OCCUPIED', 'MAINTENANCE'))
+    );
+    """,
+]
@@ -0,0 +1,51 @@
+"""
+Secondary indexes for the queries in app.sql.queries, built CONCURRENTLY so
+they never block writes.
+"""
+
+from ..migrator import create_indexes_concurrently
+
+TRANSACTIONAL = False
+
+# Index name -> definition following "ON"
+INDEXES = {
+    # Foreign keys used in joins and per-parent lookups
+    "idx_patients_user_id": "patients (user_id)",
+    "idx_patient_allergies_patient_id": "patient_allergies (patient_id)",
+    "idx_patient_medical_history_patient_id": "patient_medical_history (patient_id)",
+    "idx_medical_records_patient_id": "medical_records (patient_id, record_date DESC)",
+    "idx_staff_user_id": "staff (user_id)",
+    "idx_staff_department_id": "staff (department_id)",
+    "idx_staff_schedules_staff_id": "staff_schedules (staff_id)",
+    "idx_attendance_staff_id_date": "attendance (staff_id, date DESC)",
+    "idx_leaves_staff_id": "leaves (staff_id)",
+    "idx_bills_patient_id": "bills (patient_id)",
+    "idx_bills_admission_id": "bills (admission_id)",
+    "idx_insurance_claims_patient_id": "insurance_claims (patient_id)",
+    "idx_insurance_claims_bill_id": "insurance_claims (bill_id)",
+    "idx_admissions_patient_id": "admissions (patient_id)",
+    "idx_revenue_department_id": "revenue (department_id)",
+    "idx_patient_visits_patient_id": "patient_visits (patient_id)",
+    # Per-patient / per-doctor appointment lists, newest or soonest first
+    "idx_appointments_patient_id_date": "appointments (patient_id, appointment_date DESC)",
+    "idx_appointments_doctor_id_date": "appointments (doctor_id, appointment_date)",
+    "idx_notifications_user_id_created": "notifications (user_id, created_at, id)",
+    # Sort keys of the keyset-paginated list endpoints
+    "idx_appointments_date_id": "appointments (appointment_date, id)",
+    "idx_bills_generated_date_id": "bills (generated_date, id)",
+    "idx_insurance_claims_submission_date_id": "insurance_claims (submission_date, id)",
+    "idx_admissions_date_id": "admissions (admission_date, id)",
+    "idx_revenue_date_type": "revenue (date, type)",
+    # Status filters, which the list endpoints combine with the same sort keys
+    "idx_appointments_status_date_id": "appointments (status, appointment_date, id)",
+    "idx_bills_status_generated_date_id": "bills (status, generated_date, id)",
+    "idx_insurance_claims_status_submission_date_id": "insurance_claims "
+    "(status, submission_date, id)",
+    "idx_admissions_status_date_id": "admissions (status, admission_date, id)",
+    "idx_notifications_unread": "notifications (user_id, created_at, id) "
+    "WHERE read = FALSE",
+}
+
+
+def upgrade(cursor) -> None:
+    create_indexes_concurrently(cursor, INDEXES)
@@ -0,0 +1,20 @@
+"""
+Indexes for patient search: trigram indexes for fuzzy name and partial phone
+matches, and a byte-ordered name index for typeahead prefix scans.
+"""
+
+from ..migrator import create_indexes_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = {
+    "idx_patients_name_trgm": "patients USING gin (lower(full_name) gin_trgm_ops)",
+    "idx_patients_name_prefix": 'patients ((lower(full_name) COLLATE "C"), id)',
+    "idx_patients_phone_trgm": "patients USING gin "
+    "((regexp_replace(contact_number, '[^0-9]', '', 'g')) gin_trgm_ops)",
+}
+
+
+def upgrade(cursor) -> None:
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    create_indexes_concurrently(cursor, INDEXES)
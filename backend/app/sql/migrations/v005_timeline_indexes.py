@@ -0,0 +1,35 @@
+"""
+Per-patient (timestamp, id) indexes for the patient timeline, which reads
+each event source newest first and seeks past a cursor. They supersede the
+plain patient_id indexes on the same tables.
+"""
+
+from ..migrator import create_indexes_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = {
+    "idx_appointments_patient_date_id": "appointments "
+    "(patient_id, appointment_date DESC, id DESC)",
+    "idx_admissions_patient_date_id": "admissions "
+    "(patient_id, admission_date DESC, id DESC)",
+    "idx_medical_records_patient_date_id": "medical_records "
+    "(patient_id, record_date DESC, id DESC)",
+    "idx_bills_patient_date_id": "bills (patient_id, generated_date DESC, id DESC)",
+    "idx_insurance_claims_patient_date_id": "insurance_claims "
+    "(patient_id, submission_date DESC, id DESC)",
+}
+
+SUPERSEDED_INDEXES = [
+    "idx_appointments_patient_id_date",
+    "idx_admissions_patient_id",
+    "idx_medical_records_patient_id",
+    "idx_bills_patient_id",
+    "idx_insurance_claims_patient_id",
+]
+
+
+def upgrade(cursor) -> None:
+    create_indexes_concurrently(cursor, INDEXES)
+    for name in SUPERSEDED_INDEXES:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,98 @@
+"""
+Blocking keys for duplicate-patient detection and the table of merge
+suggestions found by the batch scan.
+
+The keys are immutable SQL functions with expression indexes, so every write
+path maintains them and a candidate lookup is three index probes:
+hms_name_key (Soundex of the first and last name), hms_phone_key (last ten
+digits of the contact number) and date_of_birth.
+"""
+
+from ..migrator import create_indexes_concurrently
+
+TRANSACTIONAL = False
+
+FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION hms_soundex(word TEXT) RETURNS TEXT
+    LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    DECLARE
+        letters TEXT := upper(regexp_replace(word, '[^A-Za-z]', '', 'g'));
+        code TEXT;
+        previous TEXT;
+        letter TEXT;
+        digit TEXT;
+    BEGIN
+        IF letters = '' THEN
+            RETURN NULL;
+        END IF;
+        code := left(letters, 1);
+        previous := translate(code, 'AEIOUYHWBFPVCGJKQSXZDTLMNR',
+                              '00000000111122222222334556');
+        FOR i IN 2..length(letters) LOOP
+            EXIT WHEN length(code) = 4;
+            letter := substr(letters, i, 1);
+            CONTINUE WHEN letter IN ('H', 'W');
+            digit := translate(letter, 'AEIOUYHWBFPVCGJKQSXZDTLMNR',
+                               '00000000111122222222334556');
+            IF digit <> '0' AND digit <> previous THEN
+                code := code || digit;
+            END IF;
+            previous := digit;
+        END LOOP;
+        RETURN rpad(code, 4, '0');
+    END;
+    $$;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION hms_name_key(full_name TEXT) RETURNS TEXT
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        SELECT NULLIF(
+            concat(
+                hms_soundex(split_part(btrim(full_name), ' ', 1)),
+                hms_soundex(NULLIF(
+                    substring(btrim(full_name) FROM '\\s(\\S+)$'), ''
+                ))
+            ),
+            ''
+        );
+    $$;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION hms_phone_key(phone TEXT) RETURNS TEXT
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        SELECT NULLIF(right(regexp_replace(phone, '[^0-9]', '', 'g'), 10), '');
+    $$;
+    """,
+]
+
+CREATE_SUGGESTIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS patient_merge_suggestions (
+        patient_id INTEGER NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
+        duplicate_id INTEGER NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
+        score NUMERIC(4,3) NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'PENDING'
+            CHECK (status IN ('PENDING', 'MERGED', 'DISMISSED')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (patient_id, duplicate_id),
+        CHECK (patient_id < duplicate_id)
+    );
+"""
+
+INDEXES = {
+    "idx_patients_name_key": "patients (hms_name_key(full_name))",
+    "idx_patients_phone_key": "patients (hms_phone_key(contact_number))",
+    "idx_patients_date_of_birth": "patients (date_of_birth)",
+    "idx_patient_merge_suggestions_status_score": "patient_merge_suggestions "
+    "(status, score, patient_id, duplicate_id)",
+    "idx_patient_merge_suggestions_duplicate_id": "patient_merge_suggestions "
+    "(duplicate_id)",
+}
+
+
+def upgrade(cursor) -> None:
+    for statement in FUNCTIONS:
+        cursor.execute(statement)
+    cursor.execute(CREATE_SUGGESTIONS_TABLE)
+    create_indexes_concurrently(cursor, INDEXES)
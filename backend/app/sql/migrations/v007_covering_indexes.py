@@ -0,0 +1,33 @@
+"""
+Covering indexes for the common narrow fields= projections of the list
+endpoints, so they can be answered by index-only scans. The bill and claim
+indexes supersede the plain sort-key indexes from v003.
+"""
+
+from ..migrator import create_indexes_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = {
+    # Patient pickers; also covers patient_name / contact_number joined
+    # into bill and claim lists
+    "idx_patients_id_summary": "patients (id) "
+    "INCLUDE (full_name, date_of_birth, contact_number)",
+    "idx_staff_id_summary": "staff (id) INCLUDE (full_name, role, department_id)",
+    "idx_bills_generated_date_id_summary": "bills (generated_date, id) "
+    "INCLUDE (patient_id, amount, status, due_date)",
+    "idx_bills_id_amount": "bills (id) INCLUDE (amount)",
+    "idx_insurance_claims_submission_date_id_summary": "insurance_claims "
+    "(submission_date, id) INCLUDE (patient_id, bill_id, claim_amount, status)",
+}
+
+SUPERSEDED_INDEXES = [
+    "idx_bills_generated_date_id",
+    "idx_insurance_claims_submission_date_id",
+]
+
+
+def upgrade(cursor) -> None:
+    create_indexes_concurrently(cursor, INDEXES)
+    for name in SUPERSEDED_INDEXES:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
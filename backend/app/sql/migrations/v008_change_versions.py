@@ -0,0 +1,101 @@
+"""
+Row-version metadata for conditional GETs.
+
+change_versions holds a counter per table, bumped by a statement trigger on
+every write, for resources built from whole tables (department list, staff
+schedules, financial overview). Patients carry their own row_version and
+updated_at, which writes to their allergies and medical history also bump,
+so one patient's record can be revalidated with a primary key lookup.
+"""
+
+# Tables whose every write bumps their change_versions counter
+VERSIONED_TABLES = ["departments", "staff", "staff_schedules", "bills", "revenue"]
+
+# Child tables whose writes bump the owning patient's row_version
+PATIENT_CHILD_TABLES = ["patient_allergies", "patient_medical_history"]
+
+UP = (
+    [
+        """
+        CREATE TABLE IF NOT EXISTS change_versions (
+            table_name VARCHAR(63) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """,
+        """
+        CREATE OR REPLACE FUNCTION hms_bump_change_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO change_versions (table_name, version, changed_at)
+            VALUES (TG_TABLE_NAME, 1, now())
+            ON CONFLICT (table_name) DO UPDATE
+            SET version = change_versions.version + 1,
+                changed_at = now();
+            RETURN NULL;
+        END;
+        $$;
+        """,
+        """
+        ALTER TABLE patients
+            ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+        """,
+        """
+        CREATE OR REPLACE FUNCTION hms_touch_patient() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.row_version := OLD.row_version + 1;
+            NEW.updated_at := now();
+            RETURN NEW;
+        END;
+        $$;
+        """,
+        """
+        CREATE OR REPLACE FUNCTION hms_touch_parent_patient() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                UPDATE patients SET row_version = row_version + 1
+                WHERE id = OLD.patient_id;
+            END IF;
+            IF TG_OP = 'INSERT'
+               OR (TG_OP = 'UPDATE' AND NEW.patient_id IS DISTINCT FROM OLD.patient_id)
+            THEN
+                UPDATE patients SET row_version = row_version + 1
+                WHERE id = NEW.patient_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """,
+        """
+        CREATE TRIGGER patients_touch
+        BEFORE UPDATE ON patients
+        FOR EACH ROW EXECUTE FUNCTION hms_touch_patient();
+        """,
+    ]
+    + [
+        f"""
+        INSERT INTO change_versions (table_name) VALUES ('{table}')
+        ON CONFLICT (table_name) DO NOTHING;
+        """
+        for table in VERSIONED_TABLES
+    ]
+    + [
+        f"""
+        CREATE TRIGGER {table}_change_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+        FOR EACH STATEMENT EXECUTE FUNCTION hms_bump_change_version();
+        """
+        for table in VERSIONED_TABLES
+    ]
+    + [
+        f"""
+        CREATE TRIGGER {table}_touch_patient
+        AFTER INSERT OR UPDATE OR DELETE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION hms_touch_parent_patient();
+        """
+        for table in PATIENT_CHILD_TABLES
+    ]
+)
@@ -0,0 +1,78 @@
+"""
+Full-text search over medical records.
+
+search_vector is a plain column kept up to date by a trigger rather than a
+generated column, whose addition would rewrite the table under an exclusive
+lock. Existing rows are backfilled in committed batches and the GIN index
+is built concurrently, so records stay writable throughout.
+"""
+
+from ..migrator import create_indexes_concurrently
+
+TRANSACTIONAL = False
+
+BACKFILL_BATCH_SIZE = 10000
+
+STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION hms_medical_record_search_vector(
+        diagnosis TEXT, treatment TEXT, prescription TEXT,
+        test_results TEXT, doctor_notes TEXT
+    ) RETURNS tsvector
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT setweight(to_tsvector('english', coalesce(diagnosis, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(treatment, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(prescription, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(test_results, '')), 'C')
+            || setweight(to_tsvector('english', coalesce(doctor_notes, '')), 'C');
+    $$;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION hms_set_medical_record_search_vector()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := hms_medical_record_search_vector(
+            NEW.diagnosis, NEW.treatment, NEW.prescription,
+            NEW.test_results, NEW.doctor_notes
+        );
+        RETURN NEW;
+    END;
+    $$;
+    """,
+    "ALTER TABLE medical_records ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "DROP TRIGGER IF EXISTS medical_records_search_vector ON medical_records",
+    """
+    CREATE TRIGGER medical_records_search_vector
+    BEFORE INSERT OR UPDATE OF diagnosis, treatment, prescription,
+        test_results, doctor_notes
+    ON medical_records
+    FOR EACH ROW EXECUTE FUNCTION hms_set_medical_record_search_vector();
+    """,
+]
+
+BACKFILL_QUERY = """
+    UPDATE medical_records
+    SET search_vector = hms_medical_record_search_vector(
+        diagnosis, treatment, prescription, test_results, doctor_notes
+    )
+    WHERE id >= %s AND id < %s AND search_vector IS NULL;
+"""
+
+INDEXES = {
+    "idx_medical_records_search_vector": "medical_records USING gin (search_vector)",
+    # Unfiltered record list, newest first
+    "idx_medical_records_date_id": "medical_records (record_date DESC, id DESC)",
+}
+
+
+def upgrade(cursor) -> None:
+    for statement in STATEMENTS:
+        cursor.execute(statement)
+
+    # Rows written from here on are covered by the trigger
+    cursor.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM medical_records")
+    max_id = cursor.fetchone()["max_id"]
+    for start in range(1, max_id + 1, BACKFILL_BATCH_SIZE):
+        cursor.execute(BACKFILL_QUERY, (start, start + BACKFILL_BATCH_SIZE))
+
+    create_indexes_concurrently(cursor, INDEXES)
@@ -0,0 +1,65 @@
+"""
+Prevent double-booking: a doctor's scheduled appointments may not overlap.
+
+Appointments get a duration, and an exclusion constraint over (doctor,
+[start, start + duration)) makes the database reject an overlapping booking
+atomically, however many are attempted at once. The doctor id is compared
+as a one-element int4range so the constraint needs only built-in GiST
+operator classes, not the btree_gist extension.
+
+Overlaps already present are kept but flagged overbooked, and left out of
+the constraint, so the migration never changes or drops a booking. Writes
+are blocked while they are flagged and the constraint is built.
+"""
+
+UP = [
+    "LOCK TABLE appointments IN SHARE ROW EXCLUSIVE MODE",
+    """
+    ALTER TABLE appointments
+        ADD COLUMN IF NOT EXISTS duration_minutes INTEGER NOT NULL DEFAULT 15
+            CHECK (duration_minutes > 0),
+        ADD COLUMN IF NOT EXISTS overbooked BOOLEAN NOT NULL DEFAULT FALSE;
+    """,
+    # Keep each doctor's earliest non-overlapping bookings; flag the rest
+    """
+    DO $$
+    DECLARE
+        appointment RECORD;
+        current_doctor INTEGER;
+        booked_until TIMESTAMP;
+    BEGIN
+        FOR appointment IN
+            SELECT id, doctor_id, appointment_date,
+                   appointment_date + duration_minutes * interval '1 minute'
+                       AS ends_at
+            FROM appointments
+            WHERE status = 'SCHEDULED' AND doctor_id IS NOT NULL
+            ORDER BY doctor_id, appointment_date, id
+        LOOP
+            IF appointment.doctor_id IS DISTINCT FROM current_doctor THEN
+                current_doctor := appointment.doctor_id;
+                booked_until := NULL;
+            END IF;
+            IF appointment.appointment_date < booked_until THEN
+                UPDATE appointments SET overbooked = TRUE
+                WHERE id = appointment.id;
+            ELSE
+                booked_until := appointment.ends_at;
+            END IF;
+        END LOOP;
+    END;
+    $$;
+    """,
+    """
+    ALTER TABLE appointments
+        ADD CONSTRAINT appointments_no_double_booking
+        EXCLUDE USING gist (
+            int4range(doctor_id, doctor_id, '[]') WITH =,
+            tsrange(
+                appointment_date,
+                appointment_date + duration_minutes * interval '1 minute'
+            ) WITH &&
+        )
+        WHERE (status = 'SCHEDULED' AND NOT overbooked);
+    """,
+]
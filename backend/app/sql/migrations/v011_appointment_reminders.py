@@ -0,0 +1,14 @@
+"""
+Appointment reminders.
+
+reminder_claimed_until is a lease: a dispatcher claims a chunk of due
+reminders by setting it, commits, and sends outside any transaction, so a
+crashed dispatcher's claims simply expire. Due reminders are found through
+idx_appointments_status_date_id (v003); no index covers the reminder
+columns, so marking reminders sent stays a HOT update.
+"""
+
+UP = [
+    # Nullable with no default: a catalog-only change
+    "ALTER TABLE appointments ADD COLUMN IF NOT EXISTS reminder_claimed_until TIMESTAMP",
+]
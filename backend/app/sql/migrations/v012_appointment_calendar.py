@@ -0,0 +1,99 @@
+"""
+Per-day appointment counts for calendar views.
+
+appointment_daily_counts holds the number of appointments per (day, doctor,
+status), kept up to date by statement triggers that fold each statement's
+transition tables into one upsert. A calendar window is then read from the
+primary key, at a cost set by the days and doctors shown rather than the
+number of appointments. Appointments without a doctor are counted under
+doctor_id 0, and without a status under 'UNKNOWN'.
+
+Writes to appointments are blocked while the triggers are created and the
+table is counted, so no change is missed or counted twice.
+"""
+
+COUNT_DELTAS = {
+    "INSERT": "SELECT day, doctor_id, status, 1 AS delta FROM new_counts",
+    "DELETE": "SELECT day, doctor_id, status, -1 AS delta FROM old_counts",
+    "UPDATE": """
+        SELECT day, doctor_id, status, 1 AS delta FROM new_counts
+        UNION ALL
+        SELECT day, doctor_id, status, -1 AS delta FROM old_counts
+    """,
+}
+
+# Count key of an appointment row
+COUNT_KEY = """
+    appointment_date::date AS day,
+    COALESCE(doctor_id, 0) AS doctor_id,
+    COALESCE(status, 'UNKNOWN') AS status
+"""
+
+
+def _count_function(operation: str) -> str:
+    sources = []
+    if operation in ("INSERT", "UPDATE"):
+        sources.append(f"new_counts AS (SELECT {COUNT_KEY} FROM new_rows)")
+    if operation in ("DELETE", "UPDATE"):
+        sources.append(f"old_counts AS (SELECT {COUNT_KEY} FROM old_rows)")
+    # Keys are upserted in a fixed order so concurrent statements touching
+    # the same days cannot deadlock; unchanged keys net to zero and are skipped
+    return f"""
+    CREATE OR REPLACE FUNCTION hms_count_appointments_{operation.lower()}()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        WITH {", ".join(sources)}
+        INSERT INTO appointment_daily_counts AS c
+            (day, doctor_id, status, appointments)
+        SELECT day, doctor_id, status, sum(delta)
+        FROM ({COUNT_DELTAS[operation]}) AS deltas
+        GROUP BY day, doctor_id, status
+        HAVING sum(delta) <> 0
+        ORDER BY day, doctor_id, status
+        ON CONFLICT (day, doctor_id, status) DO UPDATE
+        SET appointments = c.appointments + EXCLUDED.appointments;
+        RETURN NULL;
+    END;
+    $$;
+    """
+
+
+TRANSITION_TABLES = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+}
+
+UP = (
+    [
+        """
+        CREATE TABLE IF NOT EXISTS appointment_daily_counts (
+            day DATE NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            status VARCHAR(50) NOT NULL,
+            appointments INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, doctor_id, status)
+        );
+        """,
+        "LOCK TABLE appointments IN SHARE MODE",
+    ]
+    + [_count_function(operation) for operation in TRANSITION_TABLES]
+    + [
+        f"""
+        CREATE TRIGGER appointments_count_{operation.lower()}
+        AFTER {operation} ON appointments
+        {transition}
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION hms_count_appointments_{operation.lower()}();
+        """
+        for operation, transition in TRANSITION_TABLES.items()
+    ]
+    + [
+        f"""
+        INSERT INTO appointment_daily_counts (day, doctor_id, status, appointments)
+        SELECT day, doctor_id, status, count(*)
+        FROM (SELECT {COUNT_KEY} FROM appointments) AS keys
+        GROUP BY day, doctor_id, status;
+        """,
+    ]
+)
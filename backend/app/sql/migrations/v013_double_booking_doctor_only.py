@@ -0,0 +1,23 @@
+"""
+Limit appointments_no_double_booking (v010) to appointments with a doctor.
+
+int4range(NULL, NULL) is the unbounded range, so appointments without a
+doctor all compared equal and any two of them overlapping in time were
+rejected as a double booking.
+"""
+
+UP = [
+    """
+    ALTER TABLE appointments
+        DROP CONSTRAINT IF EXISTS appointments_no_double_booking,
+        ADD CONSTRAINT appointments_no_double_booking
+        EXCLUDE USING gist (
+            int4range(doctor_id, doctor_id, '[]') WITH =,
+            tsrange(
+                appointment_date,
+                appointment_date + duration_minutes * interval '1 minute'
+            ) WITH &&
+        )
+        WHERE (status = 'SCHEDULED' AND NOT overbooked AND doctor_id IS NOT NULL);
+    """,
+]
@@ -0,0 +1,212 @@
+"""
+Applies the versioned migrations in app.sql.migrations.
+
+Applied versions are recorded in the schema_migrations table. Starting a
+worker on an up-to-date database costs a single query; otherwise workers
+serialise on an advisory lock, so exactly one of them migrates while the rest
+wait and then find the schema at head.
+
+    python -m app.sql.migrator [upgrade|status]
+"""
+
+import argparse
+import importlib
+import logging
+import pkgutil
+import re
+import sys
+from typing import Dict, List, Optional
+
+from psycopg2 import errors
+
+from ..config.database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PACKAGE = f"{__package__}.migrations"
+
+# Arbitrary application-wide key for pg_advisory_lock
+MIGRATION_LOCK_KEY = 7_251_004_113
+
+_MODULE_RE = re.compile(r"^v(\d+)_(\w+)$")
+
+CREATE_VERSION_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+GET_SCHEMA_VERSION_QUERY = """
+    SELECT COALESCE(MAX(version), 0) AS version
+    FROM schema_migrations;
+"""
+
+RECORD_MIGRATION_QUERY = """
+    INSERT INTO schema_migrations (version, name)
+    VALUES (%s, %s);
+"""
+
+
+class Migration:
+    """
+    A migration module: a list of UP statements or an upgrade(cursor) function.
+    """
+
+    def __init__(self, version: int, name: str, module):
+        self.version = version
+        self.name = name
+        self.module = module
+        self.transactional = getattr(module, "TRANSACTIONAL", True)
+
+    def apply(self, cursor) -> None:
+        upgrade = getattr(self.module, "upgrade", None)
+        if upgrade is not None:
+            upgrade(cursor)
+        else:
+            for statement in self.module.UP:
+                cursor.execute(statement)
+
+
+def create_indexes_concurrently(cursor, indexes: Dict[str, str]) -> None:
+    """
+    Build indexes (name -> definition following "ON") with CREATE INDEX
+    CONCURRENTLY, for use in TRANSACTIONAL = False migrations. An interrupted
+    concurrent build leaves an invalid index behind, which IF NOT EXISTS would
+    keep; those are dropped and rebuilt.
+    """
+    cursor.execute(
+        """
+        SELECT c.relname AS name, i.indisvalid AS valid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = ANY(%s);
+        """,
+        (list(indexes),),
+    )
+    existing = {row["name"]: row["valid"] for row in cursor.fetchall()}
+    for name, definition in indexes.items():
+        if existing.get(name):
+            continue
+        if name in existing:
+            logger.warning(f"Rebuilding invalid index {name}")
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def load_migrations(package_name: str = MIGRATIONS_PACKAGE) -> List[Migration]:
+    """
+    Return the migrations of a package ordered by version.
+    """
+    package = importlib.import_module(package_name)
+    migrations = {}
+    for module_info in pkgutil.iter_modules(package.__path__):
+        match = _MODULE_RE.match(module_info.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}")
+        module = importlib.import_module(f"{package_name}.{module_info.name}")
+        migrations[version] = Migration(version, match.group(2), module)
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def _schema_version(cursor) -> int:
+    try:
+        cursor.execute(GET_SCHEMA_VERSION_QUERY)
+    except errors.UndefinedTable:
+        cursor.connection.rollback()
+        return 0
+    return cursor.fetchone()["version"]
+
+
+def get_schema_version() -> int:
+    """
+    Return the latest applied migration version (0 for a fresh database).
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            version = _schema_version(cursor)
+        conn.rollback()
+    return version
+
+
+def _apply(cursor, migration: Migration) -> None:
+    logger.info(f"Applying migration {migration.version:03d} {migration.name}")
+    if not migration.transactional:
+        migration.apply(cursor)
+        cursor.execute(RECORD_MIGRATION_QUERY, (migration.version, migration.name))
+        return
+    cursor.execute("BEGIN")
+    try:
+        migration.apply(cursor)
+        cursor.execute(RECORD_MIGRATION_QUERY, (migration.version, migration.name))
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    cursor.execute("COMMIT")
+
+
+def migrate(target: Optional[int] = None) -> int:
+    """
+    Apply pending migrations up to target (default: all) and return the
+    resulting schema version.
+    """
+    migrations = load_migrations()
+    head = target if target is not None else migrations[-1].version
+
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            version = _schema_version(cursor)
+            conn.rollback()
+            if version >= head:
+                return version
+
+            # Session-level state (the advisory lock, non-transactional
+            # migrations) needs autocommit; transactions are explicit.
+            conn.autocommit = True
+            try:
+                cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+                try:
+                    cursor.execute(CREATE_VERSION_TABLE_QUERY)
+                    # Another worker may have migrated while we waited.
+                    version = _schema_version(cursor)
+                    for migration in migrations:
+                        if version < migration.version <= head:
+                            _apply(cursor, migration)
+                            version = migration.version
+                finally:
+                    cursor.execute(
+                        "SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,)
+                    )
+            finally:
+                conn.autocommit = False
+
+    logger.info(f"Database schema at version {version}")
+    return version
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument(
+        "command", nargs="?", default="upgrade", choices=["upgrade", "status"]
+    )
+    parser.add_argument("--target", type=int, help="migrate up to this version")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "status":
+        version = get_schema_version()
+        for migration in load_migrations():
+            state = "applied" if migration.version <= version else "pending"
+            print(f"{migration.version:03d} {migration.name}: {state}")
+        return 0
+
+    migrate(args.target)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
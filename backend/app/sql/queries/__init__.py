@@ -10,6 +10,9 @@ from .department_queries import *
 from .appointment_queries import *
 from .admission_queries import *
 from .notification_queries import *
+from .admin_queries import *
+from .change_queries import *
+from .medical_record_queries import *
 
 __all__ = [
     "auth_queries",
@@ -20,4 +23,7 @@ __all__ = [
     "appointment_queries",
     "admission_queries",
     "notification_queries",
+    "admin_queries",
+    "change_queries",
+    "medical_record_queries",
 ]
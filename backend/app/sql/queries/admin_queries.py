@@ -0,0 +1,11 @@
+GET_ALL_USERS_QUERY = """
+    SELECT id, email, role, created_at
+    FROM users
+    ORDER BY id;
+"""
+
+GET_USER_BY_ID_QUERY = """
+    SELECT id, email, role, created_at
+    FROM users
+    WHERE id = %s;
+"""
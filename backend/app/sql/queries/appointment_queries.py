@@ -18,12 +18,14 @@ GET_APPOINTMENT_BY_ID_QUERY = """
     WHERE a.id = %s;
 """
 
+# Overlapping scheduled bookings of a doctor are rejected by the
+# appointments_no_double_booking exclusion constraint (migration v010)
 CREATE_APPOINTMENT_QUERY = """
     INSERT INTO appointments (
         patient_id, doctor_id, appointment_date, 
-        status, purpose
+        status, purpose, duration_minutes
     )
-    VALUES (%s, %s, %s, %s, %s)
+    VALUES (%s, %s, %s, %s, %s, %s)
     RETURNING id;
 """
 
@@ -31,7 +33,18 @@ UPDATE_APPOINTMENT_QUERY = """
     UPDATE appointments
     SET status = %s
     WHERE id = %s
-    RETURNING id;
+    RETURNING id, doctor_id;
+"""
+
+# Calendar aggregates, read from the trigger-maintained
+# appointment_daily_counts (migration v012) rather than appointments
+GET_APPOINTMENT_CALENDAR_QUERY = """
+    SELECT c.day, NULLIF(c.doctor_id, 0) AS doctor_id,
+           s.full_name AS doctor_name, c.status, c.appointments
+    FROM appointment_daily_counts c
+    LEFT JOIN staff s ON s.user_id = c.doctor_id
+    WHERE c.day BETWEEN %s AND %s AND c.appointments > 0
+    ORDER BY c.day, c.doctor_id, c.status;
 """
 
 GET_DOCTOR_APPOINTMENTS_QUERY = """
@@ -41,3 +54,84 @@ GET_DOCTOR_APPOINTMENTS_QUERY = """
     WHERE a.doctor_id = %s AND a.appointment_date >= CURRENT_DATE
     ORDER BY a.appointment_date;
 """
+
+# Slot engine (app/utils/slot_utils.py). Doctors are identified by their
+# user id, as in appointments.doctor_id.
+GET_SLOT_DOCTORS_QUERY = """
+    SELECT s.user_id AS doctor_id, s.id AS staff_id, s.full_name AS doctor_name,
+           s.specialization
+    FROM staff s
+    WHERE s.role = 'DOCTOR' AND s.user_id IS NOT NULL
+    ORDER BY s.user_id;
+"""
+
+GET_DOCTOR_SHIFTS_QUERY = """
+    SELECT s.user_id AS doctor_id, ss.shift_start, ss.shift_end, ss.work_days
+    FROM staff_schedules ss
+    JOIN staff s ON ss.staff_id = s.id
+    WHERE s.user_id = ANY(%s);
+"""
+
+GET_DOCTOR_APPROVED_LEAVES_QUERY = """
+    SELECT s.user_id AS doctor_id, l.start_date, l.end_date
+    FROM leaves l
+    JOIN staff s ON l.staff_id = s.id
+    WHERE s.user_id = ANY(%s)
+      AND l.status = 'APPROVED'
+      AND l.end_date >= %s
+      AND l.start_date < %s;
+"""
+
+GET_DOCTOR_BOOKINGS_QUERY = """
+    SELECT doctor_id, appointment_date, duration_minutes
+    FROM appointments
+    WHERE doctor_id = ANY(%s)
+      AND appointment_date >= %s
+      AND appointment_date < %s
+      AND status IN ('SCHEDULED', 'COMPLETED');
+"""
+
+# Reminder dispatcher (app/utils/reminder_utils.py). Claims the next chunk of
+# due reminders after a (appointment_date, id) keyset position by leasing
+# them through reminder_claimed_until (migration v011), skipping rows another
+# dispatcher is claiming. Only patients with a login email can be reminded.
+CLAIM_DUE_REMINDERS_QUERY = """
+    WITH due AS (
+        SELECT a.id
+        FROM appointments a
+        JOIN patients p ON a.patient_id = p.id
+        JOIN users u ON p.user_id = u.id
+        WHERE a.status = 'SCHEDULED'
+          AND a.reminder_sent IS NOT TRUE
+          AND a.appointment_date >= %s
+          AND a.appointment_date < %s
+          AND (a.appointment_date, a.id) > (%s, %s)
+          AND (a.reminder_claimed_until IS NULL
+               OR a.reminder_claimed_until < CURRENT_TIMESTAMP)
+        ORDER BY a.appointment_date, a.id
+        LIMIT %s
+        FOR UPDATE OF a SKIP LOCKED
+    )
+    UPDATE appointments a
+    SET reminder_claimed_until = CURRENT_TIMESTAMP + make_interval(secs => %s)
+    FROM due, patients p
+    JOIN users u ON p.user_id = u.id
+    WHERE a.id = due.id AND p.id = a.patient_id
+    RETURNING a.id, a.appointment_date, a.duration_minutes, a.purpose,
+              p.full_name AS patient_name, u.email,
+              (SELECT s.full_name FROM staff s
+               WHERE s.user_id = a.doctor_id
+               ORDER BY s.id LIMIT 1) AS doctor_name;
+"""
+
+MARK_REMINDERS_SENT_QUERY = """
+    UPDATE appointments
+    SET reminder_sent = TRUE, reminder_claimed_until = NULL
+    WHERE id = ANY(%s);
+"""
+
+RELEASE_REMINDER_CLAIMS_QUERY = """
+    UPDATE appointments
+    SET reminder_claimed_until = NULL
+    WHERE id = ANY(%s) AND reminder_sent IS NOT TRUE;
+"""
@@ -0,0 +1,6 @@
+GET_CHANGE_VERSIONS_QUERY = """
+    SELECT table_name, version, changed_at
+    FROM change_versions
+    WHERE table_name = ANY(%s)
+    ORDER BY table_name;
+"""
@@ -7,6 +7,20 @@ GET_ALL_BILLS_QUERY = """
     ORDER BY b.generated_date DESC;
 """
 
+# fields= names accepted by bill reads -> expression in GET_ALL_BILLS_QUERY
+BILL_FIELDS = {
+    "id": "b.id",
+    "patient_id": "b.patient_id",
+    "admission_id": "b.admission_id",
+    "amount": "b.amount",
+    "generated_date": "b.generated_date",
+    "due_date": "b.due_date",
+    "status": "b.status",
+    "payment_method": "b.payment_method",
+    "patient_name": "p.full_name",
+    "contact_number": "p.contact_number",
+}
+
 GET_FINANCE_REPORTS_QUERY = """
     SELECT id, date, department_id, amount, type, source
     FROM revenue
@@ -50,6 +64,22 @@ GET_REVENUE_REPORT_QUERY = """
     FROM bills;
 """
 
+# fields= names accepted by insurance claim reads -> expression in
+# GET_INSURANCE_CLAIMS_QUERY
+INSURANCE_CLAIM_FIELDS = {
+    "id": "ic.id",
+    "patient_id": "ic.patient_id",
+    "bill_id": "ic.bill_id",
+    "insurance_provider": "ic.insurance_provider",
+    "claim_amount": "ic.claim_amount",
+    "submission_date": "ic.submission_date",
+    "status": "ic.status",
+    "rejection_reason": "ic.rejection_reason",
+    "settlement_date": "ic.settlement_date",
+    "patient_name": "p.full_name",
+    "bill_amount": "b.amount",
+}
+
 GET_INSURANCE_CLAIMS_QUERY = """
     SELECT ic.*, 
            p.full_name as patient_name,
@@ -68,3 +98,11 @@ CREATE_INSURANCE_CLAIM_QUERY = """
     VALUES (%s, %s, %s, %s, 'SUBMITTED', NOW())
     RETURNING id;
 """
+
+GET_FINANCIAL_OVERVIEW_QUERY = """
+    SELECT 
+        (SELECT COALESCE(SUM(amount), 0) FROM revenue WHERE date = CURRENT_DATE AND type = 'DAILY') AS daily_revenue,
+        (SELECT COALESCE(SUM(amount), 0) FROM revenue WHERE date_trunc('month', date) = date_trunc('month', CURRENT_DATE) AND type = 'MONTHLY') AS monthly_revenue,
+        (SELECT COALESCE(SUM(amount), 0) FROM bills WHERE status IN ('PENDING', 'OVERDUE')) AS outstanding_amount
+    ;
+"""
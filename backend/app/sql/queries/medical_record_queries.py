@@ -0,0 +1,86 @@
+GET_ALL_MEDICAL_RECORDS_QUERY = """
+    SELECT m.id, m.patient_id, p.full_name AS patient_name, m.diagnosis,
+           m.treatment, m.prescription, m.test_results, m.doctor_notes,
+           m.record_date
+    FROM medical_records m
+    JOIN patients p ON m.patient_id = p.id
+    ORDER BY m.record_date DESC, m.id DESC;
+"""
+
+GET_MEDICAL_RECORD_BY_ID_QUERY = """
+    SELECT m.id, m.patient_id, p.full_name AS patient_name, m.diagnosis,
+           m.treatment, m.prescription, m.test_results, m.doctor_notes,
+           m.record_date
+    FROM medical_records m
+    JOIN patients p ON m.patient_id = p.id
+    WHERE m.id = %s;
+"""
+
+CREATE_MEDICAL_RECORD_QUERY = """
+    INSERT INTO medical_records (
+        patient_id, diagnosis, treatment, prescription,
+        test_results, doctor_notes, record_date
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP))
+    RETURNING id;
+"""
+
+UPDATE_MEDICAL_RECORD_QUERY = """
+    UPDATE medical_records
+    SET diagnosis = %s,
+        treatment = %s,
+        prescription = %s,
+        test_results = %s,
+        doctor_notes = %s
+    WHERE id = %s
+    RETURNING id;
+"""
+
+DELETE_MEDICAL_RECORD_QUERY = """
+    DELETE FROM medical_records
+    WHERE id = %s
+    RETURNING id;
+"""
+
+# Full-text search: matches come from the GIN index on search_vector (see
+# migration v009), ranked with ts_rank_cd normalised by document length.
+# The rank is cast to float8 so it round-trips exactly through a
+# pagination cursor.
+SEARCH_MEDICAL_RECORDS_QUERY = """
+    SELECT m.id, m.patient_id, m.record_date, m.diagnosis, m.treatment,
+           m.prescription, m.test_results, m.doctor_notes,
+           ts_rank_cd(m.search_vector, q.query, 1)::float8 AS rank
+    FROM medical_records m,
+         websearch_to_tsquery('english', %s) AS q(query)
+    WHERE m.search_vector @@ q.query
+    ORDER BY rank DESC, m.id DESC;
+"""
+
+# Wraps one page of SEARCH_MEDICAL_RECORDS_QUERY (the {page} subquery, which
+# ends in a LIMIT), so highlighting costs only the rows returned. The text is
+# HTML-escaped before ts_headline adds its <mark> tags, so the result is safe
+# to render as HTML. A template, not a named query: it is formatted before use.
+HIGHLIGHT_MEDICAL_RECORDS_TEMPLATE = """
+    SELECT page.id, page.patient_id, p.full_name AS patient_name,
+           page.record_date, page.rank,
+           ts_headline(
+               'english',
+               replace(replace(replace(
+                   page.diagnosis, '&', '&amp;'), '<', '&lt;'), '>', '&gt;'),
+               q.query,
+               %s
+           ) AS diagnosis,
+           ts_headline(
+               'english',
+               replace(replace(replace(
+                   concat_ws(' ... ', page.treatment, page.prescription,
+                             page.test_results, page.doctor_notes),
+                   '&', '&amp;'), '<', '&lt;'), '>', '&gt;'),
+               q.query,
+               %s
+           ) AS headline
+    FROM ({page}) AS page
+    JOIN patients p ON page.patient_id = p.id,
+         websearch_to_tsquery('english', %s) AS q(query)
+    ORDER BY page.rank DESC, page.id DESC;
+"""
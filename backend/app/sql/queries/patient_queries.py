@@ -1,23 +1,57 @@
+# Patient rows only; allergies and medical history are fetched for a whole
+# page of patients at once with the *_BY_PATIENT_IDS queries below.
 GET_ALL_PATIENTS_QUERY = """
-    SELECT p.*, 
-           COALESCE(json_agg(DISTINCT a) FILTER (WHERE a.id IS NOT NULL), '[]') AS allergy_details,
-           COALESCE(json_agg(DISTINCT m) FILTER (WHERE m.id IS NOT NULL), '[]') AS medical_history_details
+    SELECT p.*
     FROM patients p
-    LEFT JOIN patient_allergies a ON p.id = a.patient_id
-    LEFT JOIN patient_medical_history m ON p.id = m.patient_id
-    GROUP BY p.id
     ORDER BY p.id;
 """
 
+# fields= names accepted by patient reads -> column in the "p" alias
+PATIENT_FIELDS = {
+    "id": "p.id",
+    "user_id": "p.user_id",
+    "full_name": "p.full_name",
+    "date_of_birth": "p.date_of_birth",
+    "contact_number": "p.contact_number",
+    "emergency_contact": "p.emergency_contact",
+    "blood_group": "p.blood_group",
+    "allergies": "p.allergies",
+    "current_medications": "p.current_medications",
+    "row_version": "p.row_version",
+    "updated_at": "p.updated_at",
+}
+
 GET_PATIENT_BY_ID_QUERY = """
-    SELECT p.*, 
-           COALESCE(json_agg(DISTINCT a) FILTER (WHERE a.id IS NOT NULL), '[]') AS allergy_details,
-           COALESCE(json_agg(DISTINCT m) FILTER (WHERE m.id IS NOT NULL), '[]') AS medical_history_details
+    SELECT p.*
+    FROM patients p
+    WHERE p.id = %s;
+"""
+
+GET_PATIENT_VERSION_QUERY = """
+    SELECT p.id, p.row_version, p.updated_at
+    FROM patients p
+    WHERE p.id = %s;
+"""
+
+GET_PATIENTS_BY_IDS_QUERY = """
+    SELECT p.*
     FROM patients p
-    LEFT JOIN patient_allergies a ON p.id = a.patient_id
-    LEFT JOIN patient_medical_history m ON p.id = m.patient_id
-    WHERE p.id = %s
-    GROUP BY p.id;
+    WHERE p.id = ANY(%s)
+    ORDER BY array_position(%s, p.id);
+"""
+
+GET_ALLERGIES_BY_PATIENT_IDS_QUERY = """
+    SELECT a.*
+    FROM patient_allergies a
+    WHERE a.patient_id = ANY(%s)
+    ORDER BY a.patient_id, a.id;
+"""
+
+GET_MEDICAL_HISTORY_BY_PATIENT_IDS_QUERY = """
+    SELECT m.*
+    FROM patient_medical_history m
+    WHERE m.patient_id = ANY(%s)
+    ORDER BY m.patient_id, m.id;
 """
 
 CREATE_PATIENT_QUERY = """
@@ -68,3 +102,182 @@ GET_PATIENT_VISITS_QUERY = """
     WHERE a.patient_id = %s
     ORDER BY a.appointment_date DESC;
 """
+
+CREATE_PATIENT_VISIT_QUERY = """
+    INSERT INTO patient_visits (
+        patient_id, doctor_id, visit_date,
+        symptoms, diagnosis, prescription,
+        notes
+    )
+    VALUES (%s, %s, NOW(), %s, %s, %s, %s)
+    RETURNING id;
+"""
+
+# Patient search. Names are matched on lower(full_name) and phones on their
+# digits only, the expressions indexed by the v004_patient_search migration.
+SEARCH_PATIENTS_BY_NAME_QUERY = """
+    SELECT p.id, p.full_name, p.date_of_birth, p.contact_number, p.blood_group,
+           word_similarity(%s, lower(p.full_name)) AS score
+    FROM patients p
+    WHERE %s <%% lower(p.full_name)
+    ORDER BY score DESC, p.id
+    LIMIT %s;
+"""
+
+SEARCH_PATIENTS_BY_PHONE_QUERY = """
+    SELECT p.id, p.full_name, p.date_of_birth, p.contact_number, p.blood_group,
+           similarity(%s, regexp_replace(p.contact_number, '[^0-9]', '', 'g')) AS score
+    FROM patients p
+    WHERE regexp_replace(p.contact_number, '[^0-9]', '', 'g') LIKE %s
+    ORDER BY score DESC, p.id
+    LIMIT %s;
+"""
+
+TYPEAHEAD_PATIENTS_BY_NAME_PREFIX_QUERY = """
+    SELECT id, full_name, date_of_birth
+    FROM patients
+    WHERE lower(full_name) COLLATE "C" >= %s
+      AND lower(full_name) COLLATE "C" < %s
+    ORDER BY lower(full_name) COLLATE "C", id
+    LIMIT %s;
+"""
+
+TYPEAHEAD_PATIENTS_BY_NAME_QUERY = """
+    SELECT id, full_name, date_of_birth
+    FROM patients
+    WHERE %s <%% lower(full_name)
+    ORDER BY word_similarity(%s, lower(full_name)) DESC, id
+    LIMIT %s;
+"""
+
+TYPEAHEAD_PATIENTS_BY_PHONE_QUERY = """
+    SELECT id, full_name, date_of_birth
+    FROM patients
+    WHERE regexp_replace(contact_number, '[^0-9]', '', 'g') LIKE %s
+    ORDER BY id
+    LIMIT %s;
+"""
+
+# Timeline sources: one patient's events newest first, after a
+# (timestamp, id) bound. Each is served by a (patient_id, timestamp DESC,
+# id DESC) index.
+GET_TIMELINE_APPOINTMENTS_QUERY = """
+    SELECT 'appointment' AS type, a.id, a.appointment_date AS occurred_at,
+           a.status, a.purpose, a.doctor_id, s.full_name AS doctor_name
+    FROM appointments a
+    LEFT JOIN staff s ON s.user_id = a.doctor_id
+    WHERE a.patient_id = %s
+      AND (a.appointment_date, a.id) < (%s, %s)
+    ORDER BY a.appointment_date DESC, a.id DESC
+    LIMIT %s;
+"""
+
+GET_TIMELINE_ADMISSIONS_QUERY = """
+    SELECT 'admission' AS type, id, admission_date AS occurred_at,
+           status, bed_number, expected_discharge_date,
+           actual_discharge_date, discharge_summary
+    FROM admissions
+    WHERE patient_id = %s
+      AND (admission_date, id) < (%s, %s)
+    ORDER BY admission_date DESC, id DESC
+    LIMIT %s;
+"""
+
+GET_TIMELINE_MEDICAL_RECORDS_QUERY = """
+    SELECT 'medical_record' AS type, id, record_date AS occurred_at,
+           diagnosis, treatment, prescription, test_results, doctor_notes
+    FROM medical_records
+    WHERE patient_id = %s
+      AND (record_date, id) < (%s, %s)
+    ORDER BY record_date DESC, id DESC
+    LIMIT %s;
+"""
+
+GET_TIMELINE_BILLS_QUERY = """
+    SELECT 'bill' AS type, id, generated_date AS occurred_at,
+           status, amount, due_date, payment_method, admission_id
+    FROM bills
+    WHERE patient_id = %s
+      AND (generated_date, id) < (%s, %s)
+    ORDER BY generated_date DESC, id DESC
+    LIMIT %s;
+"""
+
+GET_TIMELINE_INSURANCE_CLAIMS_QUERY = """
+    SELECT 'insurance_claim' AS type, id, submission_date AS occurred_at,
+           status, bill_id, insurance_provider, claim_amount,
+           rejection_reason, settlement_date
+    FROM insurance_claims
+    WHERE patient_id = %s
+      AND (submission_date, id) < (%s, %s)
+    ORDER BY submission_date DESC, id DESC
+    LIMIT %s;
+"""
+
+# Duplicate detection: patients sharing a blocking key with the given name,
+# phone or date of birth, at most %s per key
+FIND_DUPLICATE_CANDIDATES_QUERY = """
+    (SELECT id, full_name, date_of_birth, contact_number
+     FROM patients
+     WHERE hms_name_key(full_name) = hms_name_key(%s)
+     LIMIT %s)
+    UNION
+    (SELECT id, full_name, date_of_birth, contact_number
+     FROM patients
+     WHERE hms_phone_key(contact_number) = hms_phone_key(%s)
+     LIMIT %s)
+    UNION
+    (SELECT id, full_name, date_of_birth, contact_number
+     FROM patients
+     WHERE date_of_birth = %s
+     LIMIT %s);
+"""
+
+# Batch scan: one shard of each blocking key's patients, grouped by key
+SCAN_NAME_BLOCKS_QUERY = """
+    SELECT hms_name_key(full_name) AS block, id, full_name, date_of_birth, contact_number
+    FROM patients
+    WHERE hms_name_key(full_name) IS NOT NULL
+      AND mod(abs(hashtext(hms_name_key(full_name))), %s) = %s
+    ORDER BY block, id;
+"""
+
+SCAN_PHONE_BLOCKS_QUERY = """
+    SELECT hms_phone_key(contact_number) AS block, id, full_name, date_of_birth, contact_number
+    FROM patients
+    WHERE hms_phone_key(contact_number) IS NOT NULL
+      AND mod(abs(hashtext(hms_phone_key(contact_number))), %s) = %s
+    ORDER BY block, id;
+"""
+
+SCAN_BIRTH_DATE_BLOCKS_QUERY = """
+    SELECT date_of_birth AS block, id, full_name, date_of_birth, contact_number
+    FROM patients
+    WHERE mod(abs(hashtext(date_of_birth::text)), %s) = %s
+    ORDER BY block, id;
+"""
+
+UPSERT_MERGE_SUGGESTION_QUERY = """
+    INSERT INTO patient_merge_suggestions (patient_id, duplicate_id, score)
+    VALUES (%s, %s, %s)
+    ON CONFLICT (patient_id, duplicate_id) DO UPDATE
+    SET score = EXCLUDED.score, updated_at = CURRENT_TIMESTAMP
+    WHERE patient_merge_suggestions.status = 'PENDING';
+"""
+
+GET_MERGE_SUGGESTIONS_QUERY = """
+    SELECT s.patient_id, s.duplicate_id, s.score, s.status, s.created_at,
+           p.full_name AS patient_name, d.full_name AS duplicate_name
+    FROM patient_merge_suggestions s
+    JOIN patients p ON p.id = s.patient_id
+    JOIN patients d ON d.id = s.duplicate_id
+    WHERE s.status = %s
+    ORDER BY s.score DESC, s.patient_id DESC, s.duplicate_id DESC;
+"""
+
+UPDATE_MERGE_SUGGESTION_STATUS_QUERY = """
+    UPDATE patient_merge_suggestions
+    SET status = %s, updated_at = CURRENT_TIMESTAMP
+    WHERE patient_id = %s AND duplicate_id = %s
+    RETURNING patient_id;
+"""
@@ -5,6 +5,18 @@ GET_ALL_STAFF_QUERY = """
     ORDER BY s.id;
 """
 
+# fields= names accepted by staff reads -> expression in GET_ALL_STAFF_QUERY
+STAFF_FIELDS = {
+    "id": "s.id",
+    "user_id": "s.user_id",
+    "department_id": "s.department_id",
+    "full_name": "s.full_name",
+    "role": "s.role",
+    "specialization": "s.specialization",
+    "contact_number": "s.contact_number",
+    "department_name": "d.name",
+}
+
 GET_STAFF_BY_ID_QUERY = """
     SELECT s.*, d.name as department_name
     FROM staff s
@@ -46,4 +58,12 @@ GET_ALL_STAFF_SCHEDULES_QUERY = """
     FROM staff_schedules ss
     JOIN staff s ON ss.staff_id = s.id
     ORDER BY ss.id;
-"""
\ No newline at end of file
+"""
+
+
+GET_ATTENDANCE_QUERY = """
+    SELECT id, staff_id, date, clock_in, clock_out, status, overtime_hours
+    FROM attendance
+    WHERE staff_id = %s
+    ORDER BY date DESC;
+"""
@@ -0,0 +1,202 @@
+"""
+Registry of the named queries in app.sql.queries, prepared once per pooled
+connection and executed by name.
+"""
+
+import importlib
+import logging
+import pkgutil
+import re
+import threading
+from typing import Dict, Optional
+
+import psycopg2
+from psycopg2 import errors
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER_RE = re.compile(r"%(.)", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+_CLAUSE_RE = re.compile(r" (WHERE|GROUP BY|ORDER BY|LIMIT) ", re.IGNORECASE)
+
+# Label for queries that match no named query
+ADHOC_QUERY_NAME = "adhoc"
+
+
+def _normalize(sql: str) -> str:
+    return _WHITESPACE_RE.sub(" ", sql).strip().rstrip(";").strip()
+
+
+class PreparedStatement:
+    """
+    A named query rewritten for PREPARE / EXECUTE.
+    """
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.param_count = 0
+        self.enabled = True
+
+        body = _PLACEHOLDER_RE.sub(self._placeholder, sql.strip().rstrip(";"))
+        self.prepare_sql = f"PREPARE {name} AS {body}"
+        # Normalised text up to the first filter/sort clause, used to
+        # recognise rewritten variants of the query
+        self.head = _CLAUSE_RE.split(_normalize(sql), maxsplit=1)[0]
+        if self.param_count:
+            args = ", ".join(["%s"] * self.param_count)
+            self.execute_sql = f"EXECUTE {name} ({args})"
+        else:
+            self.execute_sql = f"EXECUTE {name}"
+
+    def _placeholder(self, match) -> str:
+        token = match.group(1)
+        if token == "%":
+            return "%"
+        if token == "s":
+            self.param_count += 1
+            return f"${self.param_count}"
+        raise ValueError(f"Unsupported placeholder %{token} in {self.name}")
+
+
+class QueryRegistry:
+    """
+    Maps query text to its PreparedStatement. Queries are looked up by their
+    exact text, so any ad-hoc or rewritten SQL simply falls through to a
+    normal execute.
+    """
+
+    def __init__(self):
+        self._by_sql: Dict[str, PreparedStatement] = {}
+        self._by_name: Dict[str, PreparedStatement] = {}
+        self._identified: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, sql: str) -> Optional[PreparedStatement]:
+        """
+        Register a query under a name; returns None if it cannot be prepared.
+        """
+        try:
+            statement = PreparedStatement(name.lower(), sql)
+        except ValueError as e:
+            logger.debug(f"Not preparing query: {e}")
+            return None
+        with self._lock:
+            self._by_sql[sql] = statement
+            self._by_name[statement.name] = statement
+        return statement
+
+    def load_module(self, module) -> None:
+        """
+        Register every *_QUERY string constant defined in a module.
+        """
+        for attr, value in vars(module).items():
+            if attr.isupper() and attr.endswith("_QUERY") and isinstance(value, str):
+                self.register(attr, value)
+
+    def load_package(self, package_name: str) -> None:
+        """
+        Register the named queries of every module in a package.
+        """
+        package = importlib.import_module(package_name)
+        for module_info in pkgutil.iter_modules(package.__path__):
+            module = importlib.import_module(f"{package_name}.{module_info.name}")
+            self.load_module(module)
+
+    def lookup(self, sql: str) -> Optional[PreparedStatement]:
+        statement = self._by_sql.get(sql)
+        if statement is not None and statement.enabled:
+            return statement
+        return None
+
+    def identify(self, sql: str) -> str:
+        """
+        Name a query for instrumentation: the named query it is, or was
+        derived from (e.g. with filters added or wrapped for pagination),
+        otherwise ADHOC_QUERY_NAME.
+        """
+        statement = self._by_sql.get(sql)
+        if statement is not None:
+            return statement.name
+        name = self._identified.get(sql)
+        if name is None:
+            text = _normalize(sql)
+            if text.startswith("SELECT * FROM ("):
+                text = text[len("SELECT * FROM (") :]
+            best = None
+            for candidate in self._by_name.values():
+                if text.startswith(candidate.head) and (
+                    best is None or len(candidate.head) > len(best.head)
+                ):
+                    best = candidate
+            name = best.name if best is not None else ADHOC_QUERY_NAME
+            with self._lock:
+                if len(self._identified) < 4096:
+                    self._identified[sql] = name
+        return name
+
+    def get(self, name: str) -> Optional[PreparedStatement]:
+        return self._by_name.get(name.lower())
+
+    def statements(self):
+        return list(self._by_name.values())
+
+
+def set_statement_timeout(cursor, timeout_ms: Optional[float]) -> None:
+    """
+    Limit the rest of the cursor's transaction to statements of timeout_ms
+    milliseconds (SET LOCAL statement_timeout); None leaves it unchanged.
+    """
+    if timeout_ms is not None:
+        cursor.execute("SET LOCAL statement_timeout = %s", (max(1, int(timeout_ms)),))
+
+
+def execute_prepared(
+    cursor, statement: PreparedStatement, params=None, timeout_ms: Optional[float] = None
+) -> None:
+    """
+    Execute a registered statement, preparing it on this connection first if
+    needed. Must be the first statement of its transaction: recovery from a
+    failed PREPARE or a stale plan rolls the transaction back and retries.
+    timeout_ms (see set_statement_timeout) is applied to the statement,
+    including on a retry after that rollback.
+    """
+    connection = cursor.connection
+    prepared = getattr(connection, "prepared_statements", None)
+    if prepared is None:
+        set_statement_timeout(cursor, timeout_ms)
+        cursor.execute(statement.sql, params)
+        return
+
+    if statement.name not in prepared:
+        try:
+            cursor.execute(statement.prepare_sql)
+        except psycopg2.Error as e:
+            # Not preparable (e.g. parameter types cannot be inferred): stop
+            # trying and run it as plain SQL from now on.
+            connection.rollback()
+            statement.enabled = False
+            logger.warning(f"Could not prepare {statement.name}: {e}")
+            set_statement_timeout(cursor, timeout_ms)
+            cursor.execute(statement.sql, params)
+            return
+        prepared.add(statement.name)
+
+    set_statement_timeout(cursor, timeout_ms)
+    try:
+        cursor.execute(statement.execute_sql, params)
+    except (errors.InvalidSqlStatementName, errors.FeatureNotSupported) as e:
+        # The session lost the statement, or a schema change invalidated its
+        # cached plan ("cached plan must not change result type").
+        connection.rollback()
+        prepared.discard(statement.name)
+        if isinstance(e, errors.FeatureNotSupported):
+            cursor.execute(f"DEALLOCATE {statement.name}")
+        cursor.execute(statement.prepare_sql)
+        prepared.add(statement.name)
+        set_statement_timeout(cursor, timeout_ms)
+        cursor.execute(statement.execute_sql, params)
+
+
+registry = QueryRegistry()
+registry.load_package(f"{__package__}.queries")
@@ -1,4 +1,16 @@
-from .db_utils import execute_query, execute_batch
+from .db_utils import (
+    execute_query,
+    execute_batch,
+    execute_query_async,
+    execute_batch_async,
+    stream_query,
+    execute_query_rows,
+    execute_query_rows_async,
+    ResultSet,
+)
+from .json_utils import FastJSONResponse, json_response
+from .stream_utils import stream_query_response
+from .bulk_utils import bulk_write, copy_rows, insert_rows, update_rows
 from .email_utils import send_email, send_password_reset_email
 from .date_utils import (
     validate_date_range,
@@ -20,6 +32,19 @@ from .validators import (
 __all__ = [
     "execute_query",
     "execute_batch",
+    "execute_query_async",
+    "execute_batch_async",
+    "stream_query",
+    "execute_query_rows",
+    "execute_query_rows_async",
+    "ResultSet",
+    "FastJSONResponse",
+    "json_response",
+    "stream_query_response",
+    "bulk_write",
+    "copy_rows",
+    "insert_rows",
+    "update_rows",
     "send_email",
     "send_password_reset_email",
     "validate_date_range",
@@ -0,0 +1,241 @@
+import itertools
+import threading
+from collections.abc import Sized
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+from ..config.database import get_db_connection
+from ..config.pool import PoolTimeoutError
+from ..config.settings import settings
+from ..core.errors import DatabaseError, DatabaseBusyError
+
+_column_types: Dict[str, Dict[str, str]] = {}
+_column_types_lock = threading.Lock()
+
+
+def _table_identifier(table: str) -> sql.Identifier:
+    return sql.Identifier(*table.split("."))
+
+
+def _column_list(columns: Sequence[str]) -> sql.Composed:
+    return sql.SQL(", ").join(sql.Identifier(column) for column in columns)
+
+
+def _chunks(rows: Iterable[Sequence[Any]], size: int) -> Iterator[List[Sequence[Any]]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@contextmanager
+def _transaction(connection=None):
+    """
+    Use the caller's connection (and transaction) if given, otherwise a pooled
+    connection committed on success.
+    """
+    try:
+        if connection is not None:
+            yield connection
+        else:
+            with get_db_connection() as conn:
+                yield conn
+                conn.commit()
+    except PoolTimeoutError as e:
+        raise DatabaseBusyError(str(e), internal_error=e)
+    except psycopg2.Error as e:
+        raise DatabaseError(f"Bulk write failed: {str(e)}")
+
+
+def _copy_value(value: Any) -> str:
+    """
+    Render a value in COPY text format.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (list, tuple)):
+        items = ",".join(
+            "NULL"
+            if item is None
+            else '"' + str(item).replace("\\", "\\\\").replace('"', '\\"') + '"'
+            for item in value
+        )
+        value = "{" + items + "}"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class CopyStream:
+    """
+    File-like adapter that renders rows into COPY text format as psycopg2
+    reads from it, so only one buffer's worth of rows is held in memory.
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._rows = iter(rows)
+        self._buffer = bytearray()
+        self.rows_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += ("\t".join(map(_copy_value, row)) + "\n").encode()
+            self.rows_read += 1
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    readline = read
+
+
+def copy_rows(
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    connection=None,
+) -> int:
+    """
+    Load rows with COPY FROM STDIN, streaming them from any iterable.
+    Returns the number of rows copied.
+    """
+    statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        _table_identifier(table), _column_list(columns)
+    )
+    stream = CopyStream(rows)
+    with _transaction(connection) as conn:
+        with conn.cursor() as cursor:
+            cursor.copy_expert(statement, stream, size=settings.BULK_COPY_BUFFER_SIZE)
+    return stream.rows_read
+
+
+def insert_rows(
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    returning: Optional[Sequence[str]] = None,
+    page_size: int = None,
+    connection=None,
+) -> List[dict]:
+    """
+    Insert rows with multi-row INSERT ... VALUES statements of page_size rows.
+    Returns the RETURNING rows, if any were requested.
+    """
+    page_size = page_size or settings.BULK_PAGE_SIZE
+    statement = sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+        _table_identifier(table), _column_list(columns)
+    )
+    if returning:
+        statement += sql.SQL(" RETURNING {}").format(_column_list(returning))
+
+    returned = []
+    with _transaction(connection) as conn:
+        with conn.cursor() as cursor:
+            query = statement.as_string(conn)
+            for chunk in _chunks(rows, page_size):
+                result = execute_values(
+                    cursor, query, chunk, page_size=page_size, fetch=bool(returning)
+                )
+                if returning:
+                    returned.extend(dict(row) for row in result)
+    return returned
+
+
+def _get_column_types(cursor, table: str) -> Dict[str, str]:
+    with _column_types_lock:
+        types = _column_types.get(table)
+    if types is None:
+        cursor.execute(
+            """
+            SELECT attname, format_type(atttypid, atttypmod) AS type
+            FROM pg_attribute
+            WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped;
+            """,
+            (table,),
+        )
+        types = {row["attname"]: row["type"] for row in cursor.fetchall()}
+        with _column_types_lock:
+            _column_types[table] = types
+    return types
+
+
+def update_rows(
+    table: str,
+    key_column: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    page_size: int = None,
+    connection=None,
+) -> int:
+    """
+    Apply bulk updates with UPDATE ... FROM (VALUES ...). Each row is
+    (key, value1, value2, ...) matching key_column followed by columns.
+    Returns the number of rows updated.
+    """
+    page_size = page_size or settings.BULK_PAGE_SIZE
+    names = [key_column, *columns]
+    updated = 0
+    with _transaction(connection) as conn:
+        with conn.cursor() as cursor:
+            types = _get_column_types(cursor, table)
+            # VALUES literals would otherwise be typed as text.
+            template = sql.SQL("({})").format(
+                sql.SQL(", ").join(
+                    sql.SQL("%s::{}").format(sql.SQL(types[name])) for name in names
+                )
+            )
+            statement = sql.SQL(
+                "UPDATE {table} AS t SET {assignments} FROM (VALUES %s) "
+                "AS v ({names}) WHERE t.{key} = v.{key}"
+            ).format(
+                table=_table_identifier(table),
+                assignments=sql.SQL(", ").join(
+                    sql.SQL("{0} = v.{0}").format(sql.Identifier(column))
+                    for column in columns
+                ),
+                names=_column_list(names),
+                key=sql.Identifier(key_column),
+            )
+            query = statement.as_string(conn)
+            template = template.as_string(conn)
+            for chunk in _chunks(rows, page_size):
+                execute_values(
+                    cursor, query, chunk, template=template, page_size=page_size
+                )
+                updated += cursor.rowcount
+    return updated
+
+
+def bulk_write(
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    returning: Optional[Sequence[str]] = None,
+    connection=None,
+) -> Any:
+    """
+    Insert rows using the fastest suitable path:
+      - returning requested: paged INSERT ... VALUES ... RETURNING, returns rows.
+      - fewer than BULK_COPY_THRESHOLD rows: paged INSERT ... VALUES, returns count.
+      - otherwise, including generators of unknown length: COPY, returns count.
+    """
+    if returning:
+        return insert_rows(table, columns, rows, returning, connection=connection)
+    if isinstance(rows, Sized) and len(rows) < settings.BULK_COPY_THRESHOLD:
+        insert_rows(table, columns, rows, connection=connection)
+        return len(rows)
+    return copy_rows(table, columns, rows, connection=connection)
@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+from psycopg2 import sql
+from ..config.database import open_connection
+from ..config.settings import settings
+from .db_utils import execute_query, execute_query_async
+from .metrics_utils import register_collector
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_QUERY = "SELECT pg_notify(%s, %s);"
+
+# Seconds between stop checks while waiting for notifications, and the
+# longest wait before reconnecting a lost listener connection
+LISTEN_POLL_INTERVAL = 1.0
+LISTEN_MAX_BACKOFF = 30.0
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ttl seconds.
+
+    Every invalidation advances a generation counter. A caller loading a
+    missing entry reads the generation first and passes it to set(), which
+    drops the value if an invalidation happened meanwhile, so a load racing
+    a write never caches the pre-write value.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (expires_at, value); the right end is the most recently used
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._generation = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evicted": 0,
+            "expired": 0,
+            "invalidated": 0,
+        }
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> bool:
+        """
+        Store value unless the cache is disabled or, when generation is
+        given, an invalidation has happened since it was read.
+        """
+        if self.maxsize <= 0:
+            return False
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evicted"] += 1
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(key, None) is not None:
+                self._stats["invalidated"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._stats["invalidated"] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "max_size": self.maxsize}
+
+
+_caches: Dict[str, TTLCache] = {}
+
+
+def register_cache(cache: TTLCache) -> TTLCache:
+    """
+    Make a cache reachable by broadcast invalidations and /metrics.
+    """
+    if cache.name in _caches:
+        raise ValueError(f"Cache {cache.name} is already registered")
+    _caches[cache.name] = cache
+    return cache
+
+
+def _invalidation_payload(cache: TTLCache, key: Hashable) -> str:
+    return json.dumps({"cache": cache.name, "key": key})
+
+
+def _apply_invalidation(payload: str) -> None:
+    try:
+        message = json.loads(payload)
+        cache = _caches.get(message["cache"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"Ignoring malformed cache invalidation {payload!r}")
+        return
+    if cache is not None:
+        cache.invalidate(message["key"])
+
+
+def broadcast_invalidation(cache: TTLCache, key: Hashable) -> None:
+    """
+    Drop key from this worker's cache and notify every other worker. Call it
+    after the write has committed. A failed notification is logged rather
+    than raised, since the write itself succeeded; other workers then serve
+    the old value until it expires.
+    """
+    cache.invalidate(key)
+    try:
+        execute_query(
+            NOTIFY_QUERY,
+            (settings.CACHE_INVALIDATION_CHANNEL, _invalidation_payload(cache, key)),
+        )
+    except Exception as e:
+        logger.error(f"Could not broadcast {cache.name} cache invalidation: {e}")
+
+
+async def broadcast_invalidation_async(cache: TTLCache, key: Hashable) -> None:
+    """Async counterpart of broadcast_invalidation"""
+    cache.invalidate(key)
+    try:
+        await execute_query_async(
+            NOTIFY_QUERY,
+            (settings.CACHE_INVALIDATION_CHANNEL, _invalidation_payload(cache, key)),
+        )
+    except Exception as e:
+        logger.error(f"Could not broadcast {cache.name} cache invalidation: {e}")
+
+
+class InvalidationListener:
+    """
+    Background thread that LISTENs on the invalidation channel on a dedicated
+    connection and applies other workers' invalidations to the local caches.
+    Notifications sent while the connection is down are lost, so every cache
+    is cleared whenever the listener (re)connects.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-invalidation-listener", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _listen(self) -> None:
+        conn = open_connection()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+            for cache in _caches.values():
+                cache.clear()
+            while not self._stop.is_set():
+                if not select.select([conn], [], [], LISTEN_POLL_INTERVAL)[0]:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    _apply_invalidation(conn.notifies.pop(0).payload)
+        finally:
+            conn.close()
+
+    def _run(self) -> None:
+        backoff = LISTEN_POLL_INTERVAL
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"Cache invalidation listener failed: {e}")
+            if time.monotonic() - started > LISTEN_MAX_BACKOFF:
+                backoff = LISTEN_POLL_INTERVAL
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, LISTEN_MAX_BACKOFF)
+
+
+_listener: Optional[InvalidationListener] = None
+_listener_pid: Optional[int] = None
+
+
+def start_invalidation_listener() -> None:
+    """Start this worker's invalidation listener if it is not running"""
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+    _listener = InvalidationListener(settings.CACHE_INVALIDATION_CHANNEL)
+    _listener_pid = os.getpid()
+    _listener.start()
+
+
+def stop_invalidation_listener() -> None:
+    """Stop this worker's invalidation listener"""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+
+
+def render_cache_metrics() -> List[str]:
+    """
+    Render hit, miss and eviction counters of the registered caches.
+    """
+    stats = {name: cache.stats() for name, cache in sorted(_caches.items())}
+    lines = [
+        "# HELP hms_cache_requests_total Cache lookups by cache and result.",
+        "# TYPE hms_cache_requests_total counter",
+    ]
+    for name, s in stats.items():
+        lines.append(f'hms_cache_requests_total{{cache="{name}",result="hit"}} {s["hits"]}')
+        lines.append(f'hms_cache_requests_total{{cache="{name}",result="miss"}} {s["misses"]}')
+    lines += [
+        "# HELP hms_cache_removals_total Entries removed by cache and reason.",
+        "# TYPE hms_cache_removals_total counter",
+    ]
+    for name, s in stats.items():
+        for reason in ("evicted", "expired", "invalidated"):
+            lines.append(
+                f'hms_cache_removals_total{{cache="{name}",reason="{reason}"}} {s[reason]}'
+            )
+    lines += [
+        "# HELP hms_cache_entries Entries held by cache.",
+        "# TYPE hms_cache_entries gauge",
+    ]
+    for name, s in stats.items():
+        lines.append(f'hms_cache_entries{{cache="{name}"}} {s["size"]}')
+    return lines
+
+
+register_collector(render_cache_metrics)
@@ -1,15 +1,113 @@
+import asyncio
+import functools
+import itertools
+import os
+import threading
+import time
+import uuid
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import Optional, List, Dict, Any
+import psycopg2.errors
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2.extensions import cursor as TupleCursor
+from psycopg2.extras import RealDictCursor, execute_batch as _execute_batch
+from typing import Optional, List, Dict, Any, Callable, Iterator, Sequence
 from ..config.database import get_db_connection
-from ..core.errors import DatabaseError
+from ..config.settings import settings
+from ..config.pool import PoolTimeoutError
+from ..core.errors import (
+    ConflictError,
+    DatabaseError,
+    DatabaseBusyError,
+    QueryTimeoutError,
+)
+from ..sql.registry import registry, execute_prepared, set_statement_timeout
+from .metrics_utils import query_metrics, log_slow_query
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Return this worker's database executor. It is sized like the connection
+    pool so queued queries wait here instead of holding threads blocked on
+    pool checkout.
+    """
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.DB_EXECUTOR_WORKERS,
+                    thread_name_prefix="db",
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop this worker's database executor"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False)
+        _executor = None
+
+
+async def run_in_db_executor(func, *args, **kwargs):
+    """Run a blocking database call without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def _execute(
+    cursor,
+    query: str,
+    params=None,
+    prepared: bool = True,
+    timeout_ms: Optional[float] = None,
+) -> None:
+    """
+    Execute a query on a cursor, as a prepared statement when it is a named
+    query, recording its latency, row count and errors under the query name.
+    Pass prepared=False when the transaction already has work in it that
+    execute_prepared's rollback-and-retry recovery would destroy. timeout_ms
+    limits the query with SET LOCAL statement_timeout.
+    """
+    name = registry.identify(query)
+    statement = (
+        registry.lookup(query)
+        if prepared and settings.DB_PREPARED_STATEMENTS
+        else None
+    )
+    started = time.perf_counter()
+    try:
+        if statement is not None:
+            execute_prepared(cursor, statement, params, timeout_ms)
+        else:
+            set_statement_timeout(cursor, timeout_ms)
+            cursor.execute(query, params)
+    except Exception as e:
+        query_metrics.record_error(name, e)
+        raise
+    elapsed = time.perf_counter() - started
+    query_metrics.record_query(name, elapsed, cursor.rowcount)
+    if settings.SLOW_QUERY_THRESHOLD_MS and (
+        elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS
+    ):
+        log_slow_query(cursor, name, query, params, elapsed)
 
 
 def execute_query(
     query: str,
     params: tuple = None,
     fetch_all: bool = False,
-    fetch_one: bool = False
+    fetch_one: bool = False,
+    timeout_ms: Optional[float] = None,
 ) -> Optional[Any]:
     """
     Execute a database query with error handling and connection management.
@@ -17,12 +115,16 @@ def execute_query(
       - If fetch_all is True, a list of dicts.
       - If fetch_one is True, a single dict.
       - Otherwise, returns the status message.
+    If timeout_ms is given the server cancels the query after that long
+    (SET LOCAL statement_timeout) and QueryTimeoutError is raised. The limit
+    covers only the query itself, not the wait for a pooled connection
+    (bounded separately by the pool's checkout timeout).
     """
     try:
         with get_db_connection() as connection:
             with connection.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query, params)
-                
+                _execute(cursor, query, params, timeout_ms=timeout_ms)
+
                 # If you expect rows back, fetch and commit.
                 if fetch_all:
                     result = cursor.fetchall()
@@ -35,6 +137,10 @@ def execute_query(
                 else:
                     connection.commit()
                     return cursor.statusmessage
+    except psycopg2.errors.ExclusionViolation as e:
+        raise ConflictError.for_constraint(e.diag.constraint_name, internal_error=e)
+    except psycopg2.errors.QueryCanceled as e:
+        raise QueryTimeoutError(internal_error=e)
     except psycopg2.IntegrityError as e:
         if "unique constraint" in str(e).lower():
             raise DatabaseError("Duplicate entry found")
@@ -42,22 +148,186 @@ def execute_query(
             raise DatabaseError("Referenced record does not exist")
         else:
             raise DatabaseError(f"Integrity error: {str(e)}")
+    except PoolTimeoutError as e:
+        query_metrics.record_error(registry.identify(query), e)
+        raise DatabaseBusyError(str(e), internal_error=e)
     except psycopg2.Error as e:
         raise DatabaseError(f"Database error: {str(e)}")
     except Exception as e:
         raise DatabaseError(f"Unexpected error: {str(e)}")
 
+class ResultSet:
+    """
+    Query result as row tuples sharing one column descriptor. Iterating or
+    indexing yields dicts; encoders can use columns and rows directly.
+    """
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns: Sequence[str], rows: List[tuple]):
+        self.columns = tuple(columns)
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        columns = self.columns
+        return (dict(zip(columns, row)) for row in self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResultSet(self.columns, self.rows[index])
+        return dict(zip(self.columns, self.rows[index]))
+
+    def column(self, name: str) -> List[Any]:
+        i = self.columns.index(name)
+        return [row[i] for row in self.rows]
+
+    def dicts(self) -> List[Dict[str, Any]]:
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
+
+
+def execute_query_rows(query: str, params: tuple = None) -> ResultSet:
+    """
+    Execute a query and return all rows as a ResultSet of plain tuples,
+    skipping the per-row dict construction of execute_query.
+    """
+    try:
+        with get_db_connection() as connection:
+            with connection.cursor(cursor_factory=TupleCursor) as cursor:
+                _execute(cursor, query, params)
+                rows = cursor.fetchall()
+                columns = [column.name for column in cursor.description]
+                connection.commit()
+                return ResultSet(columns, rows)
+    except PoolTimeoutError as e:
+        query_metrics.record_error(registry.identify(query), e)
+        raise DatabaseBusyError(str(e), internal_error=e)
+    except psycopg2.Error as e:
+        raise DatabaseError(f"Database error: {str(e)}")
+    except Exception as e:
+        raise DatabaseError(f"Unexpected error: {str(e)}")
+
+
 def execute_batch(queries: List[tuple]) -> None:
     """
     Execute multiple queries in a single transaction.
-    Each tuple should contain (query, params)
+    Each tuple should contain (query, params). Consecutive runs of the same
+    query are sent in pages of BULK_PAGE_SIZE statements per round trip.
     """
     try:
         with get_db_connection() as connection:
             with connection.cursor() as cursor:
-                for query, params in queries:
-                    cursor.execute(query, params)
+                for query, group in itertools.groupby(queries, key=lambda q: q[0]):
+                    name = registry.identify(query)
+                    params_list = [params for _, params in group]
+                    started = time.perf_counter()
+                    try:
+                        _execute_batch(
+                            cursor,
+                            query,
+                            params_list,
+                            page_size=settings.BULK_PAGE_SIZE,
+                        )
+                    except Exception as e:
+                        query_metrics.record_error(name, e)
+                        raise
+                    query_metrics.record_query(
+                        name, time.perf_counter() - started, len(params_list)
+                    )
 
                 connection.commit()
+    except PoolTimeoutError as e:
+        raise DatabaseBusyError(str(e), internal_error=e)
     except Exception as e:
         raise DatabaseError(f"Batch execution failed: {str(e)}")
+
+
+def fetch_all_on(cursor, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+    """
+    Run a query on an open cursor (e.g. one passed to a stream_query
+    transform) and return its rows as dicts. Errors are left to the caller.
+    The query is not run as a prepared statement: recovering from a stale
+    plan rolls back the transaction, which would close the stream's cursor.
+    """
+    _execute(cursor, query, params, prepared=False)
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def stream_query(
+    query: str,
+    params: tuple = None,
+    itersize: int = None,
+    transform: Optional[Callable[[List[dict], Any], List[dict]]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield rows one at a time from a named server-side cursor.
+    Rows are fetched from the server itersize at a time, so memory use does not
+    depend on the size of the result. The pooled connection is held until the
+    generator is exhausted or closed.
+    If given, transform(batch, cursor) is applied to each batch of itersize
+    rows, with a cursor on the stream's own connection and transaction for
+    any queries it needs, so a stream never checks out a second connection.
+    """
+    size = itersize or settings.DB_STREAM_ITERSIZE
+    try:
+        with get_db_connection() as connection:
+            with connection.cursor(
+                name=f"stream_{uuid.uuid4().hex}", cursor_factory=RealDictCursor
+            ) as cursor:
+                cursor.itersize = size
+                cursor.execute(query, params)
+                if transform is None:
+                    for row in cursor:
+                        yield row
+                else:
+                    with connection.cursor(cursor_factory=RealDictCursor) as side:
+                        rows = iter(cursor)
+                        while True:
+                            batch = list(itertools.islice(rows, size))
+                            if not batch:
+                                break
+                            yield from transform(batch, side)
+            connection.commit()
+    except PoolTimeoutError as e:
+        query_metrics.record_error(registry.identify(query), e)
+        raise DatabaseBusyError(str(e), internal_error=e)
+    except psycopg2.Error as e:
+        raise DatabaseError(f"Database error: {str(e)}")
+
+
+async def execute_query_async(
+    query: str,
+    params: tuple = None,
+    fetch_all: bool = False,
+    fetch_one: bool = False,
+    timeout_ms: Optional[float] = None,
+) -> Optional[Any]:
+    """
+    Async counterpart of execute_query with the same return values and
+    DatabaseError mapping.
+    """
+    return await run_in_db_executor(
+        execute_query,
+        query,
+        params,
+        fetch_all=fetch_all,
+        fetch_one=fetch_one,
+        timeout_ms=timeout_ms,
+    )
+
+
+async def execute_query_rows_async(query: str, params: tuple = None) -> ResultSet:
+    """
+    Async counterpart of execute_query_rows.
+    """
+    return await run_in_db_executor(execute_query_rows, query, params)
+
+
+async def execute_batch_async(queries: List[tuple]) -> None:
+    """
+    Async counterpart of execute_batch.
+    """
+    await run_in_db_executor(execute_batch, queries)
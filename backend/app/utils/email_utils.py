@@ -1,10 +1,126 @@
+"""
+Outgoing email.
+
+Messages are sent from a small thread pool over SMTP connections that are
+kept open and reused, so sending never blocks the event loop and does not
+pay for a connection (and TLS handshake and login) per message. At most
+SMTP_POOL_SIZE messages are in flight at once.
+"""
+
+import asyncio
+import logging
 import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Optional
-from ..config.settings import Settings
+from typing import List, Optional, Tuple
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPPool:
+    """
+    SMTP connections reused across messages, at most size open at once.
+    A connection that fails is discarded; one the server closed while idle
+    is replaced transparently.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: List[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(
+            settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT
+        )
+        try:
+            if settings.SMTP_TLS:
+                server.starttls()
+            if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
+                server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _checkout(self) -> Tuple[smtplib.SMTP, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _checkin(self, server: smtplib.SMTP) -> None:
+        with self._lock:
+            self._idle.append(server)
+
+    def send(self, message: MIMEMultipart, recipients: List[str]) -> None:
+        """Send a message, blocking until the server has accepted it"""
+        with self._slots:
+            server, reused = self._checkout()
+            try:
+                try:
+                    server.send_message(message, settings.SMTP_SENDER, recipients)
+                except smtplib.SMTPServerDisconnected:
+                    if not reused:
+                        raise
+                    # Dropped by the server while idle
+                    server.close()
+                    server = self._connect()
+                    server.send_message(message, settings.SMTP_SENDER, recipients)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+                # The server answered, so the connection is still good
+                self._checkin(server)
+                raise
+            except Exception:
+                server.close()
+                raise
+            self._checkin(server)
+
+    def close(self) -> None:
+        """Close the idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server in idle:
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                server.close()
+
 
-settings = Settings()
+smtp_pool = SMTPPool(settings.SMTP_POOL_SIZE)
+_smtp_executor = ThreadPoolExecutor(
+    max_workers=settings.SMTP_POOL_SIZE, thread_name_prefix="smtp"
+)
+
+
+def build_message(
+    to_email: str,
+    subject: str,
+    body_text: str,
+    body_html: Optional[str] = None,
+    cc: List[str] = None,
+) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = settings.SMTP_SENDER
+    msg["To"] = to_email
+
+    if cc:
+        msg["Cc"] = ", ".join(cc)
+
+    # Add text body
+    text_part = MIMEText(body_text, "plain")
+    msg.attach(text_part)
+
+    # Add HTML body if provided
+    if body_html:
+        html_part = MIMEText(body_html, "html")
+        msg.attach(html_part)
+    return msg
 
 
 async def send_email(
@@ -16,46 +132,18 @@ async def send_email(
     bcc: List[str] = None,
 ) -> bool:
     """
-    Send email using SMTP configuration from settings.
+    Send email using SMTP configuration from settings. Bcc recipients get
+    the message without appearing in its headers.
     """
     try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = settings.SMTP_SENDER
-        msg["To"] = to_email
-
-        if cc:
-            msg["Cc"] = ", ".join(cc)
-        if bcc:
-            msg["Bcc"] = ", ".join(bcc)
-
-        # Add text body
-        text_part = MIMEText(body_text, "plain")
-        msg.attach(text_part)
-
-        # Add HTML body if provided
-        if body_html:
-            html_part = MIMEText(body_html, "html")
-            msg.attach(html_part)
-
-        # Create SMTP connection
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            if settings.SMTP_TLS:
-                server.starttls()
-            if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-
-            recipients = [to_email]
-            if cc:
-                recipients.extend(cc)
-            if bcc:
-                recipients.extend(bcc)
-
-            server.sendmail(settings.SMTP_SENDER, recipients, msg.as_string())
-
+        msg = build_message(to_email, subject, body_text, body_html, cc)
+        recipients = [to_email, *(cc or []), *(bcc or [])]
+        await asyncio.get_running_loop().run_in_executor(
+            _smtp_executor, smtp_pool.send, msg, recipients
+        )
         return True
     except Exception as e:
-        print(f"Failed to send email: {str(e)}")
+        logger.error(f"Failed to send email to {to_email}: {e}")
         return False
 
 
@@ -0,0 +1,123 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional, Sequence
+from fastapi import Request, Response
+from ..sql.queries.change_queries import GET_CHANGE_VERSIONS_QUERY
+from .db_utils import execute_query_async
+
+# Clients must revalidate before reusing a response, and shared caches must
+# not store it (responses depend on the caller's authorisation)
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+VALIDATOR_HEADERS = ["ETag", "Last-Modified"]
+
+
+class ResourceVersion:
+    """
+    Validators for a representation, derived from row-version metadata
+    instead of the response body. The ETag is weak: equal versions give
+    semantically, not necessarily byte-for-byte, equal responses.
+    """
+
+    def __init__(self, tag: str, last_modified: Optional[datetime] = None):
+        self.tag = tag
+        self.last_modified = last_modified
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self.tag}"'
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                self.last_modified.astimezone(timezone.utc), usegmt=True
+            )
+        return headers
+
+
+def resource_version(
+    resource: str,
+    versions: Iterable[Any],
+    last_modified: Optional[datetime] = None,
+    variant: str = "",
+) -> ResourceVersion:
+    """
+    Build the validators of a resource from its row versions. variant
+    distinguishes representations of the same rows, e.g. the query string.
+    """
+    tag = "-".join([resource] + [str(version) for version in versions])
+    if variant:
+        tag += "-" + hashlib.sha1(variant.encode()).hexdigest()[:12]
+    return ResourceVersion(tag, last_modified)
+
+
+async def table_version(
+    resource: str, tables: Sequence[str], variant: str = ""
+) -> ResourceVersion:
+    """
+    Validators for a resource built from whole tables, from their
+    change_versions counters (one small primary key lookup).
+    """
+    rows = await execute_query_async(
+        GET_CHANGE_VERSIONS_QUERY, (list(tables),), fetch_all=True
+    )
+    versions = {row["table_name"]: row for row in rows}
+    changed = [row["changed_at"] for row in rows]
+    return resource_version(
+        resource,
+        [versions[table]["version"] if table in versions else 0 for table in tables],
+        max(changed) if changed else None,
+        variant,
+    )
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def is_not_modified(request: Request, version: ResourceVersion) -> bool:
+    """
+    Whether the client's cached copy is current. If-None-Match takes
+    precedence; If-Modified-Since is only consulted without it.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, version.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or version.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return version.last_modified.replace(microsecond=0) <= since
+
+
+def not_modified(request: Request, version: ResourceVersion) -> Optional[Response]:
+    """
+    Return a 304 response if the client's copy is current, else None so the
+    endpoint builds the body. Call before running the resource's queries.
+    """
+    if request.method in ("GET", "HEAD") and is_not_modified(request, version):
+        return Response(status_code=304, headers=version.headers())
+    return None
+
+
+def set_validators(response: Response, version: ResourceVersion) -> Response:
+    """
+    Attach the resource's ETag, Last-Modified and Cache-Control headers.
+    """
+    response.headers.update(version.headers())
+    return response
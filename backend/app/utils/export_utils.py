@@ -0,0 +1,302 @@
+"""
+Analytics export of clinical tables to Parquet.
+
+All tables are read in parallel, each on its own connection, from one
+exported snapshot, so the files are consistent with each other. Rows stream
+from server-side cursors in EXPORT_BATCH_SIZE batches, each written as a
+Parquet row group, into one directory per month of the table's date column:
+
+    <out>/appointments/month=2024-05/part-00000.parquet
+
+    python -m app.utils.export_utils --out /data/export [--tables ...] [--workers N]
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+from psycopg2 import extensions
+from ..config.database import get_db_connection
+from ..config.settings import settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is only needed for exports
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Partition directory for rows whose date column is NULL
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+NUMERIC_OID = 1700
+
+
+class ExportTable:
+    """
+    A table to export: its query and the date column it is partitioned by.
+    """
+
+    def __init__(self, name: str, query: str, partition_column: Optional[str] = None):
+        self.name = name
+        self.query = query
+        self.partition_column = partition_column
+
+
+EXPORT_TABLES = {
+    table.name: table
+    for table in (
+        ExportTable("patients", "SELECT * FROM patients ORDER BY id"),
+        ExportTable(
+            "medical_history",
+            "SELECT * FROM patient_medical_history ORDER BY diagnosed_date, id",
+            "diagnosed_date",
+        ),
+        ExportTable(
+            "appointments",
+            "SELECT * FROM appointments ORDER BY appointment_date, id",
+            "appointment_date",
+        ),
+        ExportTable(
+            "bills",
+            "SELECT * FROM bills ORDER BY generated_date, id",
+            "generated_date",
+        ),
+    )
+}
+
+
+def _arrow_type(column) -> "pa.DataType":
+    """
+    Arrow type for a psycopg2 cursor.description column; types without a
+    direct equivalent are exported as strings.
+    """
+    types = {
+        16: pa.bool_(),
+        20: pa.int64(),
+        21: pa.int16(),
+        23: pa.int32(),
+        700: pa.float32(),
+        701: pa.float64(),
+        1082: pa.date32(),
+        1114: pa.timestamp("us"),
+        1184: pa.timestamp("us", tz="UTC"),
+    }
+    if column.type_code == NUMERIC_OID and column.precision and column.precision <= 38:
+        return pa.decimal128(column.precision, column.scale or 0)
+    return types.get(column.type_code, pa.string())
+
+
+def _arrow_values(values: Sequence[Any], arrow_type: "pa.DataType") -> "pa.Array":
+    if arrow_type == pa.string():
+        values = [
+            value if value is None or isinstance(value, str) else str(value)
+            for value in values
+        ]
+    return pa.array(values, type=arrow_type)
+
+
+def _partition(value: Any) -> str:
+    if isinstance(value, (date, datetime)):
+        return f"{value.year:04d}-{value.month:02d}"
+    return NULL_PARTITION
+
+
+class PartitionedWriter:
+    """
+    Writes batches of rows, sorted by the partition column, to one Parquet
+    file per month. Only the current partition's file is open, and a file
+    is renamed into place once it is complete.
+    """
+
+    def __init__(
+        self, directory: str, schema: "pa.Schema", partition_index: Optional[int]
+    ):
+        self.directory = directory
+        self.schema = schema
+        self.partition_index = partition_index
+        self.files: List[Dict[str, Any]] = []
+        self._writer = None
+        self._partition = None
+        self._path = None
+        self._rows = 0
+
+    def _open(self, partition: Optional[str]) -> None:
+        directory = self.directory
+        if partition is not None:
+            directory = os.path.join(directory, f"month={partition}")
+        os.makedirs(directory, exist_ok=True)
+        self._path = os.path.join(directory, "part-00000.parquet")
+        self._writer = pq.ParquetWriter(
+            self._path + ".tmp", self.schema, compression=settings.EXPORT_COMPRESSION
+        )
+        self._partition = partition
+        self._rows = 0
+
+    def _close(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        os.replace(self._path + ".tmp", self._path)
+        self.files.append({"path": self._path, "rows": self._rows})
+        self._writer = None
+
+    def write(self, rows: List[tuple]) -> None:
+        if self.partition_index is None:
+            groups = [(None, rows)]
+        else:
+            index = self.partition_index
+            groups = [
+                (partition, list(group))
+                for partition, group in itertools.groupby(
+                    rows, key=lambda row: _partition(row[index])
+                )
+            ]
+        for partition, group in groups:
+            if self._writer is None or partition != self._partition:
+                self._close()
+                self._open(partition)
+            columns = list(zip(*group))
+            self._writer.write_table(
+                pa.Table.from_arrays(
+                    [
+                        _arrow_values(values, field.type)
+                        for values, field in zip(columns, self.schema)
+                    ],
+                    schema=self.schema,
+                )
+            )
+            self._rows += len(group)
+
+    def close(self) -> None:
+        self._close()
+
+
+def _begin_snapshot(cursor, snapshot: Optional[str] = None) -> None:
+    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+    if snapshot is not None:
+        cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+
+
+def export_table(table: ExportTable, out_dir: str, snapshot: str) -> Dict[str, Any]:
+    """
+    Export one table as of the given exported snapshot. Returns its manifest
+    entry.
+    """
+    batch_size = settings.EXPORT_BATCH_SIZE
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                _begin_snapshot(cursor, snapshot)
+            # A plain (tuple) cursor: rows go straight into column arrays
+            with conn.cursor(
+                name=f"export_{table.name}_{uuid.uuid4().hex[:8]}",
+                cursor_factory=extensions.cursor,
+            ) as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(table.query)
+                rows = cursor.fetchmany(batch_size)
+                columns = [column.name for column in cursor.description]
+                schema = pa.schema(
+                    [
+                        pa.field(column.name, _arrow_type(column))
+                        for column in cursor.description
+                    ]
+                )
+                partition_index = (
+                    columns.index(table.partition_column)
+                    if table.partition_column
+                    else None
+                )
+                writer = PartitionedWriter(
+                    os.path.join(out_dir, table.name), schema, partition_index
+                )
+                total = 0
+                try:
+                    while rows:
+                        writer.write(rows)
+                        total += len(rows)
+                        rows = cursor.fetchmany(batch_size)
+                finally:
+                    writer.close()
+        finally:
+            conn.rollback()
+    logger.info(f"Exported {total} rows of {table.name} in {len(writer.files)} files")
+    return {"rows": total, "columns": columns, "files": writer.files}
+
+
+def export_tables(
+    out_dir: str,
+    tables: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Export tables (default: all of EXPORT_TABLES) in parallel from one
+    snapshot, and write <out_dir>/_manifest.json describing the files.
+    """
+    if pa is None:
+        raise RuntimeError("Exports need pyarrow: pip install pyarrow")
+    tables = list(tables or EXPORT_TABLES)
+    unknown = [name for name in tables if name not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown export table {', '.join(unknown)}")
+    workers = workers or len(tables)
+    os.makedirs(out_dir, exist_ok=True)
+
+    # The exporting transaction must stay open until every worker has
+    # imported its snapshot; it is held for the whole export.
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                _begin_snapshot(cursor)
+                cursor.execute(
+                    "SELECT pg_export_snapshot() AS snapshot, now() AS taken_at"
+                )
+                row = cursor.fetchone()
+            snapshot, taken_at = row["snapshot"], row["taken_at"]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    name: executor.submit(
+                        export_table, EXPORT_TABLES[name], out_dir, snapshot
+                    )
+                    for name in tables
+                }
+                results = {name: future.result() for name, future in futures.items()}
+        finally:
+            conn.rollback()
+
+    manifest = {
+        "snapshot_taken_at": taken_at.isoformat(),
+        "format": "parquet",
+        "compression": settings.EXPORT_COMPRESSION,
+        "tables": results,
+    }
+    with open(os.path.join(out_dir, "_manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export clinical tables to Parquet")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument(
+        "--tables", nargs="+", choices=list(EXPORT_TABLES), help="default: all"
+    )
+    parser.add_argument("--workers", type=int, help="default: one per table")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    export_tables(args.out, args.tables, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
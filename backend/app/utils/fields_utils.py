@@ -0,0 +1,49 @@
+import re
+from typing import Dict, List, Optional, Sequence
+from ..core.errors import ValidationError
+
+_SELECT_LIST_RE = re.compile(
+    r"^\s*SELECT\s+(?P<columns>.*?)\s+FROM\s", re.IGNORECASE | re.DOTALL
+)
+
+
+class FieldSet:
+    """
+    The fields a resource's reads may be narrowed to with fields=, mapping
+    each field name to its SQL expression in the resource's queries.
+    Required fields (e.g. pagination sort keys) are always selected.
+    """
+
+    def __init__(self, fields: Dict[str, str], required: Sequence[str] = ("id",)):
+        self.fields = fields
+        self.required = tuple(required)
+
+    def parse(self, fields: Optional[str]) -> Optional[List[str]]:
+        """
+        Parse a comma-separated fields= value. None (omitted) selects every
+        column; otherwise the requested fields followed by any required ones.
+        """
+        if fields is None:
+            return None
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValidationError(
+                f"Unknown field {', '.join(unknown)}; "
+                f"expected any of {', '.join(self.fields)}"
+            )
+        return list(dict.fromkeys(names + list(self.required)))
+
+    def project(self, query: str, names: Optional[List[str]]) -> str:
+        """
+        Replace the SELECT list of query with the given fields, so only those
+        columns are read and sent. The query's select list must be the only
+        one before its first FROM.
+        """
+        if names is None:
+            return query
+        match = _SELECT_LIST_RE.match(query)
+        if match is None:
+            raise ValueError("Query has no SELECT ... FROM to project")
+        columns = ", ".join(f'{self.fields[name]} AS "{name}"' for name in names)
+        return query[: match.start("columns")] + columns + query[match.end("columns") :]
@@ -0,0 +1,125 @@
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+# Clauses that can follow FROM in a SELECT; the WHERE clause ends at the next
+_CLAUSE_RE = re.compile(
+    r"\b(WHERE|GROUP\s+BY|HAVING|WINDOW|ORDER\s+BY|LIMIT|OFFSET|FETCH|FOR"
+    r"|UNION|INTERSECT|EXCEPT)\b",
+    re.IGNORECASE,
+)
+_SET_OPERATIONS = {"UNION", "INTERSECT", "EXCEPT"}
+
+
+@lru_cache(maxsize=256)
+def _top_level_clauses(query: str) -> Tuple[Tuple[str, int, int], ...]:
+    """
+    (keyword, start, end) of the clause keywords of query outside
+    parentheses and string literals, i.e. those of the outermost SELECT.
+    """
+    depth = 0
+    quoted = False
+    outside = []
+    for char in query:
+        if char == "'":
+            quoted = not quoted
+        elif not quoted:
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+        outside.append(depth == 0 and not quoted)
+    clauses = []
+    for match in _CLAUSE_RE.finditer(query):
+        if outside[match.start()]:
+            keyword = " ".join(match.group(1).upper().split())
+            clauses.append((keyword, match.start(), match.end()))
+    return tuple(clauses)
+
+
+class Filters:
+    """
+    Parameterised predicates ANDed into the WHERE clause of a list query,
+    so any combination of filters yields one valid, index-friendly query.
+    Predicates should compare bare columns (e.g. "b.status = %s") so the
+    planner can use indexes on them; date_range emits a half-open range
+    rather than BETWEEN on dates, which would miss the last day of
+    timestamp columns.
+
+    Apply filters after projecting fields and before paginating or
+    streaming:
+
+        query, params = (
+            Filters()
+            .equals("b.status", status)
+            .date_range("b.generated_date", start_date, end_date)
+            .apply(query)
+        )
+    """
+
+    def __init__(self):
+        self.predicates: List[str] = []
+        self.params: List[Any] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.predicates)
+
+    def where(self, predicate: str, *params: Any) -> "Filters":
+        """Add a predicate with one parameter per %s placeholder"""
+        self.predicates.append(predicate)
+        self.params.extend(params)
+        return self
+
+    def equals(self, column: str, value: Any) -> "Filters":
+        """column = value, unless value is None (the filter was not given)"""
+        if value is not None:
+            self.where(f"{column} = %s", value)
+        return self
+
+    def date_range(
+        self, column: str, start: Optional[date] = None, end: Optional[date] = None
+    ) -> "Filters":
+        """
+        column on or after start and on or before end (inclusive dates),
+        either of which may be omitted, as start <= column < end + 1 day.
+        """
+        if start is not None:
+            self.where(f"{column} >= %s", start)
+        if end is not None:
+            self.where(f"{column} < %s", end + timedelta(days=1))
+        return self
+
+    def apply(self, query: str, params: tuple = ()) -> Tuple[str, tuple]:
+        """
+        Return query with the predicates added to its outermost WHERE
+        clause (creating one before GROUP BY, ORDER BY etc. if it has none)
+        and params followed by the predicates' parameters. Any parameters of
+        query must come before its WHERE clause ends.
+        """
+        params = tuple(params or ())
+        if not self.predicates:
+            return query, params
+
+        body = query.strip()
+        terminator = ";" if body.endswith(";") else ""
+        body = body.rstrip(";").rstrip()
+        clauses = _top_level_clauses(body)
+        if any(keyword in _SET_OPERATIONS for keyword, _, _ in clauses):
+            raise ValueError("Cannot filter a UNION, INTERSECT or EXCEPT query")
+
+        condition = " AND ".join(f"({predicate})" for predicate in self.predicates)
+        where = next((clause for clause in clauses if clause[0] == "WHERE"), None)
+        if where is not None:
+            _, where_start, where_end = where
+            following = [start for keyword, start, _ in clauses if start > where_end]
+            end = following[0] if following else len(body)
+            existing = body[where_end:end].strip()
+            sql = (
+                f"{body[:where_start]}WHERE ({existing}) AND {condition}"
+                f"{' ' + body[end:] if end < len(body) else ''}"
+            )
+        else:
+            end = clauses[0][1] if clauses else len(body)
+            sql = f"{body[:end].rstrip()} WHERE {condition} {body[end:]}".rstrip()
+        return sql + terminator, params + tuple(self.params)
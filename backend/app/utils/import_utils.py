@@ -0,0 +1,353 @@
+"""
+Bulk patient import from CSV or NDJSON.
+
+Rows are read and validated in chunks, COPYed into a temporary staging table
+and merged into patients with one INSERT ... SELECT per chunk. Rejected rows
+are reported individually instead of aborting the import.
+
+    python -m app.utils.import_utils patients.csv [--report errors.ndjson]
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import logging
+import re
+import sys
+import tempfile
+from datetime import date
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+import psycopg2
+from ..config.database import get_db_connection
+from ..config.pool import PoolTimeoutError
+from ..config.settings import settings
+from ..core.errors import DatabaseBusyError, DatabaseError, ValidationError
+from .bulk_utils import copy_rows
+from .json_utils import dumps
+from .validators import validate_blood_group, validate_date_format, validate_phone
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+PATIENT_IMPORT_COLUMNS = (
+    "full_name",
+    "date_of_birth",
+    "contact_number",
+    "emergency_contact",
+    "blood_group",
+    "allergies",
+    "current_medications",
+)
+REQUIRED_IMPORT_COLUMNS = (
+    "full_name",
+    "date_of_birth",
+    "contact_number",
+    "emergency_contact",
+)
+
+STAGING_TABLE = "patient_import_staging"
+
+# An import report is kept in memory up to this size, then spilled to disk
+REPORT_SPOOL_SIZE = 1024 * 1024
+REPORT_CHUNK_SIZE = 64 * 1024
+
+# Separators people type into phone numbers, removed before validation
+_PHONE_SEPARATORS_RE = re.compile(r"[\s().-]")
+
+CREATE_STAGING_TABLE_QUERY = f"""
+    CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} (
+        line INTEGER NOT NULL,
+        full_name VARCHAR(255),
+        date_of_birth DATE,
+        contact_number VARCHAR(20),
+        emergency_contact VARCHAR(20),
+        blood_group VARCHAR(5),
+        allergies TEXT,
+        current_medications TEXT
+    ) ON COMMIT DELETE ROWS;
+"""
+
+MERGE_STAGED_PATIENTS_QUERY = f"""
+    INSERT INTO patients ({", ".join(PATIENT_IMPORT_COLUMNS)})
+    SELECT {", ".join(PATIENT_IMPORT_COLUMNS)}
+    FROM {STAGING_TABLE}
+    ORDER BY line;
+"""
+
+INSERT_IMPORTED_PATIENT_QUERY = f"""
+    INSERT INTO patients ({", ".join(PATIENT_IMPORT_COLUMNS)})
+    VALUES ({", ".join(["%s"] * len(PATIENT_IMPORT_COLUMNS))});
+"""
+
+# (line number, record, parse error)
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def _read_csv(source: BinaryIO) -> Iterator[Record]:
+    reader = csv.DictReader(io.TextIOWrapper(source, encoding="utf-8-sig", newline=""))
+    missing = [
+        column
+        for column in REQUIRED_IMPORT_COLUMNS
+        if column not in (reader.fieldnames or [])
+    ]
+    if missing:
+        raise ValidationError(f"CSV header is missing {', '.join(missing)}")
+
+    def records() -> Iterator[Record]:
+        for record in reader:
+            yield reader.line_num, record, None
+
+    return records()
+
+
+def _read_ndjson(source: BinaryIO) -> Iterator[Record]:
+    for line, text in enumerate(source, 1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError:
+            yield line, None, "Line is not valid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield line, None, "Line is not a JSON object"
+            continue
+        yield line, record, None
+
+
+def read_patient_records(source: BinaryIO, fmt: str) -> Iterator[Record]:
+    """
+    Stream records from a binary CSV or NDJSON file. A CSV header lacking a
+    required column is rejected here, before anything is imported.
+    """
+    if fmt == "csv":
+        return _read_csv(source)
+    if fmt == "ndjson":
+        return _read_ndjson(source)
+    raise ValidationError(f"Unsupported import format {fmt}; expected csv or ndjson")
+
+
+def validate_patient_record(
+    record: Dict[str, Any],
+) -> Tuple[Optional[tuple], List[str]]:
+    """
+    Validate and normalise one imported patient. Returns the row values in
+    PATIENT_IMPORT_COLUMNS order, or None and the list of problems.
+    """
+    values = {}
+    errors = []
+    for column in PATIENT_IMPORT_COLUMNS:
+        value = record.get(column)
+        if value is not None:
+            value = str(value).strip() or None
+        if value is not None and "\x00" in value:
+            errors.append(f"{column} contains a NUL character")
+            value = None
+        values[column] = value
+
+    errors += [
+        f"{column} is required"
+        for column in REQUIRED_IMPORT_COLUMNS
+        if not values[column]
+    ]
+
+    if values["full_name"] and len(values["full_name"]) > 255:
+        errors.append("full_name is longer than 255 characters")
+
+    if values["date_of_birth"]:
+        if not validate_date_format(values["date_of_birth"]):
+            errors.append("date_of_birth must be a YYYY-MM-DD date")
+        elif date.fromisoformat(values["date_of_birth"]) > date.today():
+            errors.append("date_of_birth is in the future")
+
+    for column in ("contact_number", "emergency_contact"):
+        if values[column]:
+            values[column] = _PHONE_SEPARATORS_RE.sub("", values[column])
+            if not validate_phone(values[column]):
+                errors.append(f"Invalid phone number in {column}")
+
+    if values["blood_group"]:
+        values["blood_group"] = values["blood_group"].upper()
+        if not validate_blood_group(values["blood_group"]):
+            errors.append("Invalid blood group")
+
+    if errors:
+        return None, errors
+    return tuple(values[column] for column in PATIENT_IMPORT_COLUMNS), []
+
+
+def _merge_chunk(conn, staged: List[tuple]) -> List[Tuple[int, str]]:
+    """
+    Stage a chunk of (line, *values) rows and merge it into patients. If the
+    set-based merge fails, rows are inserted one by one to find the ones the
+    database rejects. Returns (line, error) for each rejected row.
+    """
+    copy_rows(
+        STAGING_TABLE, ("line",) + PATIENT_IMPORT_COLUMNS, staged, connection=conn
+    )
+    with conn.cursor() as cursor:
+        cursor.execute("SAVEPOINT patient_import_merge")
+        try:
+            cursor.execute(MERGE_STAGED_PATIENTS_QUERY)
+            return []
+        except psycopg2.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT patient_import_merge")
+
+        failures = []
+        for line, *values in staged:
+            cursor.execute("SAVEPOINT patient_import_row")
+            try:
+                cursor.execute(INSERT_IMPORTED_PATIENT_QUERY, values)
+            except psycopg2.Error as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT patient_import_row")
+                failures.append((line, e.diag.message_primary or str(e)))
+            else:
+                cursor.execute("RELEASE SAVEPOINT patient_import_row")
+        return failures
+
+
+def import_patients(
+    records: Iterable[Record], chunk_size: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Import records as produced by read_patient_records, committing each chunk
+    of chunk_size rows. Yields {"line", "errors"} for every rejected row and
+    finally {"summary": {"rows", "imported", "rejected"}}. Memory use is
+    bounded by the chunk size, whatever the size of the input.
+    """
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    summary = {"rows": 0, "imported": 0, "rejected": 0}
+    iterator = iter(records)
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CREATE_STAGING_TABLE_QUERY)
+            while True:
+                chunk = list(itertools.islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                staged = []
+                for line, record, error in chunk:
+                    row, errors = (
+                        validate_patient_record(record)
+                        if error is None
+                        else (None, [error])
+                    )
+                    if errors:
+                        summary["rejected"] += 1
+                        yield {"line": line, "errors": errors}
+                    else:
+                        staged.append((line,) + row)
+                summary["rows"] += len(chunk)
+
+                failures = _merge_chunk(conn, staged) if staged else []
+                conn.commit()
+                for line, error in failures:
+                    yield {"line": line, "errors": [error]}
+                summary["imported"] += len(staged) - len(failures)
+                summary["rejected"] += len(failures)
+    except PoolTimeoutError as e:
+        raise DatabaseBusyError(str(e), internal_error=e)
+    except psycopg2.Error as e:
+        raise DatabaseError(f"Patient import failed: {str(e)}")
+    logger.info(
+        f"Imported {summary['imported']} of {summary['rows']} patients "
+        f"({summary['rejected']} rejected)"
+    )
+    yield {"summary": summary}
+
+
+def spool_import_report(
+    records: Iterable[Record], chunk_size: Optional[int] = None
+) -> BinaryIO:
+    """
+    Run import_patients to completion and return its report as NDJSON in a
+    temporary file positioned at the start. Database errors are raised
+    before any of the report is sent, so they reach the client as a normal
+    error response; chunks committed before the error stay imported.
+    """
+    report = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_SIZE)
+    try:
+        for event in import_patients(records, chunk_size):
+            report.write(dumps(event) + b"\n")
+    except BaseException:
+        report.close()
+        raise
+    report.seek(0)
+    return report
+
+
+def report_chunks(report: BinaryIO) -> Iterator[bytes]:
+    """
+    Yield a spooled report in chunks, closing it when done or when the
+    client goes away.
+    """
+    try:
+        while True:
+            chunk = report.read(REPORT_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        report.close()
+
+
+def guess_import_format(filename: Optional[str]) -> Optional[str]:
+    """
+    Return the import format implied by a file name's extension, if any.
+    """
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension in ("ndjson", "jsonl"):
+        return "ndjson"
+    if extension == "csv":
+        return "csv"
+    return None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import patients from CSV or NDJSON")
+    parser.add_argument("file", help="file to import, - for standard input")
+    parser.add_argument(
+        "--format", choices=IMPORT_FORMATS, help="default: from extension"
+    )
+    parser.add_argument("--chunk-size", type=int, help="rows per committed chunk")
+    parser.add_argument("--report", help="write rejected rows as NDJSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    fmt = args.format or guess_import_format(args.file)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+
+    source = sys.stdin.buffer if args.file == "-" else open(args.file, "rb")
+    report = open(args.report, "wb") if args.report else None
+    try:
+        for event in import_patients(
+            read_patient_records(source, fmt), args.chunk_size
+        ):
+            if "summary" in event:
+                print(json.dumps(event["summary"]))
+            elif report is not None:
+                report.write(dumps(event) + b"\n")
+    finally:
+        source.close()
+        if report is not None:
+            report.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""
+Duplicate-patient detection.
+
+Candidates are patients sharing a blocking key (phonetic name, phone, date of
+birth; see migration v006), scored by score_match. Creating a patient checks
+its candidates inline; the batch scan compares every block pairwise in
+parallel worker processes and records merge suggestions.
+
+    python -m app.utils.match_utils [--workers N]
+"""
+
+import argparse
+import itertools
+import logging
+import multiprocessing
+import re
+import sys
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from ..config.settings import settings
+from ..core.errors import QueryTimeoutError
+from ..sql.queries.patient_queries import (
+    FIND_DUPLICATE_CANDIDATES_QUERY,
+    SCAN_BIRTH_DATE_BLOCKS_QUERY,
+    SCAN_NAME_BLOCKS_QUERY,
+    SCAN_PHONE_BLOCKS_QUERY,
+    UPSERT_MERGE_SUGGESTION_QUERY,
+)
+from .db_utils import execute_batch, execute_query_async, stream_query
+
+logger = logging.getLogger(__name__)
+
+NAME_WEIGHT = 0.45
+BIRTH_DATE_WEIGHT = 0.35
+PHONE_WEIGHT = 0.20
+# Below this name similarity two patients never match, whatever else agrees
+# (e.g. twins sharing a birth date and phone number)
+MIN_NAME_SIMILARITY = 0.8
+
+SCAN_QUERIES = {
+    "name": SCAN_NAME_BLOCKS_QUERY,
+    "phone": SCAN_PHONE_BLOCKS_QUERY,
+    "birth_date": SCAN_BIRTH_DATE_BLOCKS_QUERY,
+}
+
+_NON_LETTERS_RE = re.compile(r"[^a-z ]+")
+
+
+def jaro_winkler(a: str, b: str) -> float:
+    """
+    Jaro-Winkler similarity of two strings, from 0.0 to 1.0.
+    """
+    if a == b:
+        return 1.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+
+    window = max(max(len_a, len_b) // 2 - 1, 0)
+    matched_a = [False] * len_a
+    matched_b = [False] * len_b
+    matches = 0
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(i + window + 1, len_b)):
+            if not matched_b[j] and b[j] == char:
+                matched_a[i] = matched_b[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    transpositions = 0
+    j = 0
+    for i in range(len_a):
+        if matched_a[i]:
+            while not matched_b[j]:
+                j += 1
+            if a[i] != b[j]:
+                transpositions += 1
+            j += 1
+    jaro = (
+        matches / len_a + matches / len_b + (matches - transpositions / 2) / matches
+    ) / 3
+
+    prefix = 0
+    for char_a, char_b in zip(a[:4], b[:4]):
+        if char_a != char_b:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def _normalize_name(name: Optional[str]) -> str:
+    return " ".join(_NON_LETTERS_RE.sub(" ", (name or "").lower()).split())
+
+
+def name_similarity(a: Optional[str], b: Optional[str]) -> float:
+    """
+    Similarity of two names, tolerating typos and swapped name order.
+    """
+    a, b = _normalize_name(a), _normalize_name(b)
+    if not a or not b:
+        return 0.0
+    return max(
+        jaro_winkler(a, b),
+        jaro_winkler(" ".join(sorted(a.split())), " ".join(sorted(b.split()))),
+    )
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def birth_date_similarity(a: Any, b: Any) -> float:
+    """
+    1.0 for the same date, 0.8 for day and month swapped, 0.5 when only one
+    of year, month and day differs.
+    """
+    a, b = _as_date(a), _as_date(b)
+    if a is None or b is None:
+        return 0.0
+    if a == b:
+        return 1.0
+    if (a.year, a.month, a.day) == (b.year, b.day, b.month):
+        return 0.8
+    same = (a.year == b.year) + (a.month == b.month) + (a.day == b.day)
+    return 0.5 if same == 2 else 0.0
+
+
+def phone_similarity(a: Optional[str], b: Optional[str]) -> float:
+    """
+    1.0 when the last ten digits agree, 0.6 when the last seven do.
+    """
+    a, b = re.sub(r"\D", "", a or ""), re.sub(r"\D", "", b or "")
+    if len(a) < 7 or len(b) < 7:
+        return 0.0
+    if a[-10:] == b[-10:]:
+        return 1.0
+    return 0.6 if a[-7:] == b[-7:] else 0.0
+
+
+def score_match(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    """
+    Likelihood (0.0 to 1.0) that two patient records describe one person.
+    """
+    name = name_similarity(a.get("full_name"), b.get("full_name"))
+    if name < MIN_NAME_SIMILARITY:
+        return 0.0
+    score = (
+        NAME_WEIGHT * name
+        + BIRTH_DATE_WEIGHT
+        * birth_date_similarity(a.get("date_of_birth"), b.get("date_of_birth"))
+        + PHONE_WEIGHT
+        * phone_similarity(a.get("contact_number"), b.get("contact_number"))
+    )
+    return round(score, 3)
+
+
+async def find_duplicates(
+    patient: Dict[str, Any],
+    exclude_id: Optional[int] = None,
+    timeout_ms: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Return existing patients likely to be the same person as patient, best
+    match first, each with its score. With timeout_ms the candidate query
+    is cancelled after that long and QueryTimeoutError raised.
+    """
+    limit = settings.DUPLICATE_CANDIDATE_LIMIT
+    candidates = await execute_query_async(
+        FIND_DUPLICATE_CANDIDATES_QUERY,
+        (
+            patient.get("full_name"),
+            limit,
+            patient.get("contact_number"),
+            limit,
+            _as_date(patient.get("date_of_birth")),
+            limit,
+        ),
+        fetch_all=True,
+        timeout_ms=timeout_ms,
+    )
+    matches = []
+    for candidate in candidates:
+        if candidate["id"] == exclude_id:
+            continue
+        score = score_match(patient, candidate)
+        if score >= settings.DUPLICATE_MATCH_THRESHOLD:
+            matches.append({**candidate, "score": score})
+    matches.sort(key=lambda match: (-match["score"], match["id"]))
+    return matches
+
+
+async def check_duplicates(patient: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    find_duplicates with its candidate query bounded by
+    DUPLICATE_CHECK_TIMEOUT_MS. Returns None if the check could not finish
+    in time, so the caller can go ahead without it. The budget is enforced
+    by the server, so a slow query is cancelled rather than left running;
+    time spent waiting for a pooled connection is not counted against it.
+    """
+    try:
+        return await find_duplicates(
+            patient, timeout_ms=settings.DUPLICATE_CHECK_TIMEOUT_MS
+        )
+    except QueryTimeoutError:
+        logger.warning("Duplicate patient check skipped: latency budget exceeded")
+        return None
+
+
+def _block_pairs(rows: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, int, float]]:
+    """
+    Score every pair within each block of rows ordered by (block, id).
+    """
+    threshold = settings.DUPLICATE_MATCH_THRESHOLD
+    for block, group in itertools.groupby(rows, key=lambda row: row["block"]):
+        members = list(group)
+        if len(members) > settings.DUPLICATE_MAX_BLOCK_SIZE:
+            logger.warning(f"Skipping block {block!r} of {len(members)} patients")
+            continue
+        for a, b in itertools.combinations(members, 2):
+            score = score_match(a, b)
+            if score >= threshold:
+                yield a["id"], b["id"], score
+
+
+def scan_shard(task: Tuple[str, int, int]) -> List[Tuple[int, int, float]]:
+    """
+    Return the matching pairs in one shard of one blocking key. Runs in a
+    worker process, on that process's own connection pool.
+    """
+    key, shard, shards = task
+    return list(_block_pairs(stream_query(SCAN_QUERIES[key], (shards, shard))))
+
+
+def scan_duplicates(workers: Optional[int] = None) -> int:
+    """
+    Compare all patients sharing a blocking key, using worker processes, and
+    upsert the matches into patient_merge_suggestions. Suggestions already
+    merged or dismissed keep their status. Returns the number of pairs found.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    # More shards than workers keeps the workers busy when blocks are uneven
+    shards = workers * 4
+    tasks = [(key, shard, shards) for key in SCAN_QUERIES for shard in range(shards)]
+
+    pairs: Dict[Tuple[int, int], float] = {}
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(scan_shard, tasks):
+            for patient_id, duplicate_id, score in result:
+                pairs[patient_id, duplicate_id] = score
+
+    # Pairs sharing several keys are found more than once; each is written once
+    items = sorted(pairs.items())
+    for start in range(0, len(items), settings.BULK_PAGE_SIZE):
+        execute_batch(
+            [
+                (UPSERT_MERGE_SUGGESTION_QUERY, (a, b, score))
+                for (a, b), score in items[start : start + settings.BULK_PAGE_SIZE]
+            ]
+        )
+    logger.info(f"Found {len(pairs)} likely duplicate patient pairs")
+    return len(pairs)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Scan all patients for likely duplicates"
+    )
+    parser.add_argument("--workers", type=int, help="default: one per CPU")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    scan_duplicates(args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+import logging
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Tuple
+from ..config.settings import settings
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+# Upper bounds (seconds) of the query latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class _QueryStats:
+    __slots__ = ("buckets", "count", "sum", "rows")
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.rows = 0
+
+
+class QueryMetrics:
+    """
+    Per-query-name latency histograms, row counts and error counters for this
+    worker process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queries: Dict[str, _QueryStats] = {}
+        self._errors: Dict[Tuple[str, str], int] = {}
+        self._slow_queries = 0
+
+    def record_query(self, name: str, seconds: float, rows: int) -> None:
+        index = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            stats = self._queries.get(name)
+            if stats is None:
+                stats = self._queries[name] = _QueryStats()
+            if index < len(LATENCY_BUCKETS):
+                stats.buckets[index] += 1
+            stats.count += 1
+            stats.sum += seconds
+            if rows > 0:
+                stats.rows += rows
+
+    def record_error(self, name: str, error: Exception) -> None:
+        key = (name, type(error).__name__)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def record_slow_query(self) -> None:
+        with self._lock:
+            self._slow_queries += 1
+
+    def render(self) -> List[str]:
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            queries = {
+                name: (list(s.buckets), s.count, s.sum, s.rows)
+                for name, s in self._queries.items()
+            }
+            errors = dict(self._errors)
+            slow_queries = self._slow_queries
+
+        lines = [
+            "# HELP hms_db_query_duration_seconds Query execution time by query name.",
+            "# TYPE hms_db_query_duration_seconds histogram",
+        ]
+        for name, (buckets, count, total, _) in sorted(queries.items()):
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, buckets):
+                cumulative += n
+                lines.append(
+                    f'hms_db_query_duration_seconds_bucket{{query="{name}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'hms_db_query_duration_seconds_bucket{{query="{name}",le="+Inf"}} {count}'
+            )
+            lines.append(f'hms_db_query_duration_seconds_sum{{query="{name}"}} {total}')
+            lines.append(f'hms_db_query_duration_seconds_count{{query="{name}"}} {count}')
+
+        lines += [
+            "# HELP hms_db_query_rows_total Rows returned or affected by query name.",
+            "# TYPE hms_db_query_rows_total counter",
+        ]
+        for name, (_, _, _, rows) in sorted(queries.items()):
+            lines.append(f'hms_db_query_rows_total{{query="{name}"}} {rows}')
+
+        lines += [
+            "# HELP hms_db_query_errors_total Failed queries by query name and error.",
+            "# TYPE hms_db_query_errors_total counter",
+        ]
+        for (name, error), n in sorted(errors.items()):
+            lines.append(f'hms_db_query_errors_total{{query="{name}",error="{error}"}} {n}')
+
+        lines += [
+            "# HELP hms_db_slow_queries_total Queries slower than SLOW_QUERY_THRESHOLD_MS.",
+            "# TYPE hms_db_slow_queries_total counter",
+            f"hms_db_slow_queries_total {slow_queries}",
+        ]
+        return lines
+
+
+query_metrics = QueryMetrics()
+
+# Functions returning extra metric lines, e.g. cache statistics
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(collector: Callable[[], List[str]]) -> None:
+    """
+    Include the lines returned by collector in every render_metrics payload.
+    """
+    _collectors.append(collector)
+
+
+def param_shapes(params: Any) -> str:
+    """
+    Describe query parameters by type only, so logs never contain patient data.
+    """
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    shapes = []
+    for value in params:
+        if isinstance(value, (list, tuple)):
+            shapes.append(f"{type(value).__name__}[{len(value)}]")
+        elif isinstance(value, (str, bytes)):
+            shapes.append(f"{type(value).__name__}({len(value)})")
+        else:
+            shapes.append(type(value).__name__)
+    return "(" + ", ".join(shapes) + ")"
+
+
+def log_slow_query(cursor, name: str, query: str, params: Any, seconds: float) -> None:
+    """
+    Log a slow query with its parameter shapes and, if enabled, its plan.
+    Runs EXPLAIN (never ANALYZE) on a separate cursor inside a savepoint so
+    the caller's transaction and result are left untouched.
+    """
+    query_metrics.record_slow_query()
+    message = f"Slow query {name}: {seconds * 1000:.1f} ms, params {param_shapes(params)}"
+    if settings.SLOW_QUERY_EXPLAIN:
+        connection = cursor.connection
+        try:
+            with connection.cursor() as explain_cursor:
+                explain_cursor.execute("SAVEPOINT slow_query_explain")
+                try:
+                    explain_cursor.execute(f"EXPLAIN {query}", params)
+                    plan = "\n".join(
+                        next(iter(row.values())) if isinstance(row, dict) else row[0]
+                        for row in explain_cursor.fetchall()
+                    )
+                    message += f"\n{plan}"
+                finally:
+                    explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+        except Exception as e:
+            message += f"\n(EXPLAIN failed: {e})"
+    slow_query_logger.warning(message)
+
+
+def render_pool_metrics(stats: Dict[str, Any]) -> List[str]:
+    """
+    Render connection pool statistics, including checkout wait time.
+    """
+    return [
+        "# HELP hms_db_pool_connections Connections in this worker's pool by state.",
+        "# TYPE hms_db_pool_connections gauge",
+        f'hms_db_pool_connections{{state="idle"}} {stats["idle"]}',
+        f'hms_db_pool_connections{{state="in_use"}} {stats["in_use"]}',
+        f"hms_db_pool_max_size {stats['max_size']}",
+        "# HELP hms_db_pool_waiting Requests waiting for a connection.",
+        "# TYPE hms_db_pool_waiting gauge",
+        f"hms_db_pool_waiting {stats['waiting']}",
+        "# HELP hms_db_pool_wait_seconds Time spent waiting to check out a connection.",
+        "# TYPE hms_db_pool_wait_seconds summary",
+        f"hms_db_pool_wait_seconds_sum {stats['total_wait_seconds']}",
+        f"hms_db_pool_wait_seconds_count {stats['checkouts']}",
+        f"hms_db_pool_max_wait_seconds {stats['max_wait_seconds']}",
+        "# TYPE hms_db_pool_timeouts_total counter",
+        f"hms_db_pool_timeouts_total {stats['timeouts']}",
+        "# TYPE hms_db_pool_connections_opened_total counter",
+        f"hms_db_pool_connections_opened_total {stats['connections_opened']}",
+        "# TYPE hms_db_pool_connections_closed_total counter",
+        f"hms_db_pool_connections_closed_total {stats['connections_closed']}",
+    ]
+
+
+def render_metrics(pool_stats: Dict[str, Any]) -> str:
+    """
+    Render all metrics of this worker as a Prometheus text payload.
+    """
+    lines = query_metrics.render() + render_pool_metrics(pool_stats)
+    for collector in _collectors:
+        lines += collector()
+    return "\n".join(lines) + "\n"
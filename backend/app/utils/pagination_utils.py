@@ -0,0 +1,173 @@
+import base64
+import json
+import re
+from typing import Any, List, Optional, Sequence
+from fastapi import Query, Response
+from ..config.settings import settings
+from ..core.errors import ValidationError
+from .db_utils import ResultSet, execute_query_async, execute_query_rows_async
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_ESTIMATE_HEADER = "X-Total-Estimate"
+
+_ORDER_BY_RE = re.compile(r"\s+ORDER\s+BY\s+[^;]*$", re.IGNORECASE)
+
+
+class PageParams:
+    """
+    Query parameters shared by keyset-paginated list endpoints.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX
+        ),
+        cursor: Optional[str] = None,
+        estimate_total: bool = False,
+    ):
+        self.limit = limit
+        self.cursor = decode_cursor(cursor) if cursor else None
+        self.estimate_total = estimate_total
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort-key values of the last row into an opaque token.
+    """
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> List[Any]:
+    """
+    Decode a token produced by encode_cursor.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid pagination cursor")
+    if not isinstance(values, list) or not values:
+        raise ValidationError("Invalid pagination cursor")
+    return values
+
+
+def strip_order_by(query: str) -> str:
+    """
+    Remove the trailing semicolon and ORDER BY clause from a list query.
+    """
+    return _ORDER_BY_RE.sub("", query.strip().rstrip(";"))
+
+
+def _seek_condition(
+    keys: Sequence[str], descending: bool, nullable: bool, null_first: bool
+) -> str:
+    """
+    Predicate selecting the rows after a cursor; null_first says whether
+    the cursor's leading key is NULL (and so has no parameter).
+    """
+    operator = "<" if descending else ">"
+    first, rest = keys[0], keys[1:]
+    if null_first:
+        # Among the NULL-keyed rows, the remaining keys decide; in descending
+        # order every non-NULL row follows them
+        condition = f"{first} IS NULL"
+        if rest:
+            placeholders = ", ".join(["%s"] * len(rest))
+            condition += f" AND ({', '.join(rest)}) {operator} ({placeholders})"
+        if descending:
+            condition = f"({condition}) OR {first} IS NOT NULL"
+        return condition
+    placeholders = ", ".join(["%s"] * len(keys))
+    condition = f"({', '.join(keys)}) {operator} ({placeholders})"
+    if nullable and not descending:
+        # NULL-keyed rows come after every non-NULL row
+        condition = f"({condition} OR {first} IS NULL)"
+    return condition
+
+
+def keyset_query(
+    query: str,
+    params: tuple,
+    keys: Sequence[str],
+    limit: int,
+    after: Optional[List[Any]] = None,
+    descending: bool = False,
+    nullable: bool = False,
+) -> tuple:
+    """
+    Wrap a list query so it returns at most limit rows that sort after the
+    given key values. keys are output columns of the query and must uniquely
+    order its rows (e.g. ("generated_date", "id")); all keys sort in the same
+    direction so the seek is a single row comparison an index can satisfy.
+
+    Pass nullable=True if the leading key may be NULL. NULLs sort first in
+    descending order and last in ascending order (PostgreSQL's defaults, as
+    in the indexes), and a row comparison against NULL is never true, so the
+    seek then also takes the NULL-keyed rows on the right side of the
+    cursor. It is opt-in because the extra IS NULL branch can stop an
+    ascending seek from being an index condition.
+    """
+    direction = "DESC" if descending else "ASC"
+    sql = f"SELECT * FROM ({strip_order_by(query)}) AS page"
+    params = tuple(params or ())
+
+    if after is not None:
+        null_first = nullable and after[0] is None
+        if len(after) != len(keys) or any(
+            value is None for value in after[int(null_first):]
+        ):
+            raise ValidationError("Invalid pagination cursor")
+        sql += f" WHERE {_seek_condition(keys, descending, nullable, null_first)}"
+        params += tuple(value for value in after if value is not None)
+
+    order = ", ".join(f"{key} {direction}" for key in keys)
+    sql += f" ORDER BY {order} LIMIT %s;"
+    return sql, params + (limit,)
+
+
+async def estimate_count(query: str, params: tuple = None) -> int:
+    """
+    Estimate the number of rows a query returns from planner statistics,
+    without executing it.
+    """
+    result = await execute_query_async(
+        f"EXPLAIN (FORMAT JSON) {strip_order_by(query)}", params, fetch_one=True
+    )
+    plan = result["QUERY PLAN"]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def paginate(
+    response: Response,
+    page: PageParams,
+    query: str,
+    params: tuple,
+    keys: Sequence[str],
+    descending: bool = False,
+    nullable: bool = False,
+) -> ResultSet:
+    """
+    Fetch one page of a list query as a ResultSet. The continuation token for the next page
+    is returned in the X-Next-Cursor header, and the estimated total (when
+    requested) in X-Total-Estimate. nullable is as for keyset_query.
+    """
+    sql, sql_params = keyset_query(
+        query, params, keys, page.limit + 1, page.cursor, descending, nullable
+    )
+    rows = await execute_query_rows_async(sql, sql_params)
+
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [last[key] for key in keys]
+        )
+    if page.estimate_total:
+        response.headers[TOTAL_ESTIMATE_HEADER] = str(
+            await estimate_count(query, params)
+        )
+    return rows
@@ -0,0 +1,165 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+from ..config.settings import settings
+from ..core.errors import ValidationError
+from ..sql.queries.patient_queries import (
+    GET_ALLERGIES_BY_PATIENT_IDS_QUERY,
+    GET_MEDICAL_HISTORY_BY_PATIENT_IDS_QUERY,
+    GET_PATIENT_BY_ID_QUERY,
+    GET_PATIENT_VERSION_QUERY,
+)
+from .cache_utils import TTLCache, broadcast_invalidation_async, register_cache
+from .db_utils import (
+    ResultSet,
+    execute_query_async,
+    execute_query_rows_async,
+    fetch_all_on,
+)
+from .etag_utils import ResourceVersion, resource_version
+
+# include= name -> (output field, query fetching it for a list of patient ids)
+PATIENT_INCLUDES = {
+    "allergies": ("allergy_details", GET_ALLERGIES_BY_PATIENT_IDS_QUERY),
+    "medical_history": (
+        "medical_history_details",
+        GET_MEDICAL_HISTORY_BY_PATIENT_IDS_QUERY,
+    ),
+}
+
+# Patient id -> patient record with every include attached
+patient_cache = register_cache(
+    TTLCache("patient", settings.PATIENT_CACHE_SIZE, settings.PATIENT_CACHE_TTL)
+)
+
+
+def parse_includes(include: Optional[str]) -> List[str]:
+    """
+    Parse a comma-separated include= value. Omitted means every
+    sub-collection; an empty value means none.
+    """
+    if include is None:
+        return list(PATIENT_INCLUDES)
+    names = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = [name for name in names if name not in PATIENT_INCLUDES]
+    if unknown:
+        raise ValidationError(
+            f"Unknown include {', '.join(unknown)}; "
+            f"expected any of {', '.join(PATIENT_INCLUDES)}"
+        )
+    return list(dict.fromkeys(names))
+
+
+def _group_by_patient(rows: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+    groups: Dict[int, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(row["patient_id"], []).append(row)
+    return groups
+
+
+async def attach_includes(patients: ResultSet, includes: List[str]) -> ResultSet:
+    """
+    Add the requested sub-collections to a page of patients. Each collection
+    costs one query for the whole page, run concurrently.
+    """
+    if not includes:
+        return patients
+    ids = patients.column("id")
+    if ids:
+        results = await asyncio.gather(
+            *(
+                execute_query_async(PATIENT_INCLUDES[name][1], (ids,), fetch_all=True)
+                for name in includes
+            )
+        )
+    else:
+        results = [[] for _ in includes]
+    groups = [_group_by_patient(rows) for rows in results]
+
+    id_index = patients.columns.index("id")
+    columns = patients.columns + tuple(PATIENT_INCLUDES[name][0] for name in includes)
+    rows = [
+        row + tuple(group.get(row[id_index], []) for group in groups)
+        for row in patients.rows
+    ]
+    return ResultSet(columns, rows)
+
+
+def attach_includes_to_rows(
+    patients: List[Dict[str, Any]], cursor, includes: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Synchronous counterpart of attach_includes for dict rows, querying on
+    cursor; a stream_query transform for batches of streamed rows.
+    """
+    if not includes or not patients:
+        return patients
+    ids = [patient["id"] for patient in patients]
+    for name in includes:
+        field, query = PATIENT_INCLUDES[name]
+        group = _group_by_patient(fetch_all_on(cursor, query, (ids,)))
+        for patient in patients:
+            patient[field] = group.get(patient["id"], [])
+    return patients
+
+
+async def get_patient_version(patient_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Return a patient's id, row_version and updated_at, or None. The version
+    is bumped by every write to the patient, its allergies or its medical
+    history (see migration v008).
+    """
+    return await execute_query_async(
+        GET_PATIENT_VERSION_QUERY, (patient_id,), fetch_one=True
+    )
+
+
+def patient_resource_version(
+    patient: Dict[str, Any], includes: List[str]
+) -> ResourceVersion:
+    """
+    Validators for a patient record (or its version row) as returned with
+    the given includes.
+    """
+    return resource_version(
+        f"patient{patient['id']}",
+        [patient["row_version"]],
+        patient["updated_at"],
+        ",".join(includes),
+    )
+
+
+async def get_patient_record(
+    patient_id: int, includes: List[str], min_version: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Return a patient with the requested sub-collections, or None. The full
+    record is read through patient_cache; includes only select which
+    sub-collections are returned. A cached record older than min_version
+    (a row_version just read) is reloaded, even before its invalidation
+    reaches this worker.
+    """
+    record = patient_cache.get(patient_id)
+    if record is not None and min_version is not None:
+        if record["row_version"] < min_version:
+            record = None
+    if record is None:
+        generation = patient_cache.generation
+        patient = await execute_query_rows_async(GET_PATIENT_BY_ID_QUERY, (patient_id,))
+        if not patient:
+            return None
+        record = (await attach_includes(patient, list(PATIENT_INCLUDES)))[0]
+        patient_cache.set(patient_id, record, generation)
+
+    excluded = {
+        field for name, (field, _) in PATIENT_INCLUDES.items() if name not in includes
+    }
+    if excluded:
+        record = {key: value for key, value in record.items() if key not in excluded}
+    return record
+
+
+async def invalidate_patient(patient_id: int) -> None:
+    """
+    Drop a patient record from every worker's cache after a committed write.
+    """
+    await broadcast_invalidation_async(patient_cache, patient_id)
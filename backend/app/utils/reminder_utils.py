@@ -0,0 +1,151 @@
+"""
+Appointment reminders.
+
+Due reminders (scheduled appointments in the next REMINDER_LEAD_HOURS) are
+walked in (appointment_date, id) order in chunks of REMINDER_BATCH_SIZE.
+Each chunk is claimed in its own short transaction with FOR UPDATE SKIP
+LOCKED and a lease, sent over the pooled SMTP connections, and marked sent
+with one UPDATE, so any number of dispatchers can run at once and none holds
+a transaction open while sending. Failed sends are released for the next
+run. Run it from cron:
+
+    python -m app.utils.reminder_utils
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+from html import escape
+from string import Template
+from typing import Any, Dict, Optional, Sequence, Tuple
+from ..config.settings import settings
+from ..sql.queries.appointment_queries import (
+    CLAIM_DUE_REMINDERS_QUERY,
+    MARK_REMINDERS_SENT_QUERY,
+    RELEASE_REMINDER_CLAIMS_QUERY,
+)
+from .db_utils import execute_query_async
+from .email_utils import send_email, smtp_pool
+
+logger = logging.getLogger(__name__)
+
+# Frontend page listing a patient's appointments
+APPOINTMENTS_PATH = "/dashboard/patient/appointments"
+
+REMINDER_SUBJECT = Template("Appointment reminder: $date at $time")
+
+REMINDER_TEXT = Template(
+    """Dear $patient_name,
+
+This is a reminder of your appointment with $doctor_name on $date at $time
+($duration minutes).
+Purpose: $purpose
+
+To see or change your appointments, visit $appointments_url
+
+If you cannot attend, please let us know as early as possible.
+"""
+)
+
+REMINDER_HTML = Template(
+    """<html>
+    <body>
+        <h2>Appointment reminder</h2>
+        <p>Dear $patient_name,</p>
+        <p>This is a reminder of your appointment with <strong>$doctor_name</strong>
+        on <strong>$date at $time</strong> ($duration minutes).</p>
+        <p>Purpose: $purpose</p>
+        <p><a href="$appointments_url">View your appointments</a></p>
+        <p>If you cannot attend, please let us know as early as possible.</p>
+    </body>
+</html>
+"""
+)
+
+
+def render_reminder(appointment: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Subject, text body and HTML body of an appointment's reminder"""
+    values = {
+        "patient_name": appointment["patient_name"],
+        "doctor_name": appointment["doctor_name"] or "your doctor",
+        "date": appointment["appointment_date"].strftime("%A %d %B %Y"),
+        "time": appointment["appointment_date"].strftime("%H:%M"),
+        "duration": appointment["duration_minutes"],
+        "purpose": appointment["purpose"] or "Consultation",
+        "appointments_url": settings.FRONTEND_URL + APPOINTMENTS_PATH,
+    }
+    html_values = {name: escape(str(value)) for name, value in values.items()}
+    return (
+        REMINDER_SUBJECT.substitute(values),
+        REMINDER_TEXT.substitute(values),
+        REMINDER_HTML.substitute(html_values),
+    )
+
+
+async def _send_reminder(appointment: Dict[str, Any]) -> bool:
+    subject, body_text, body_html = render_reminder(appointment)
+    return await send_email(appointment["email"], subject, body_text, body_html)
+
+
+async def dispatch_reminders(now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Send the reminders due from now, returning how many were sent and how
+    many failed. Appointments another dispatcher has claimed are left to it.
+    """
+    now = now or datetime.now()
+    window_end = now + timedelta(hours=settings.REMINDER_LEAD_HOURS)
+    after: Tuple[datetime, int] = (now, 0)
+    totals = Counter(sent=0, failed=0)
+    while True:
+        batch = await execute_query_async(
+            CLAIM_DUE_REMINDERS_QUERY,
+            (
+                now,
+                window_end,
+                *after,
+                settings.REMINDER_BATCH_SIZE,
+                settings.REMINDER_CLAIM_SECONDS,
+            ),
+            fetch_all=True,
+        )
+        if not batch:
+            break
+
+        results = await asyncio.gather(
+            *(_send_reminder(appointment) for appointment in batch)
+        )
+        sent = [a["id"] for a, ok in zip(batch, results) if ok]
+        failed = [a["id"] for a, ok in zip(batch, results) if not ok]
+        if sent:
+            await execute_query_async(MARK_REMINDERS_SENT_QUERY, (sent,))
+        if failed:
+            await execute_query_async(RELEASE_REMINDER_CLAIMS_QUERY, (failed,))
+        totals["sent"] += len(sent)
+        totals["failed"] += len(failed)
+        logger.info(f"Reminders: {len(sent)} sent, {len(failed)} failed in chunk")
+
+        # RETURNING rows come in no particular order
+        after = max((a["appointment_date"], a["id"]) for a in batch)
+        if len(batch) < settings.REMINDER_BATCH_SIZE:
+            break
+    return dict(totals)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Send due appointment reminders")
+    parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        totals = asyncio.run(dispatch_reminders())
+    finally:
+        smtp_pool.close()
+    logger.info(f"Sent {totals['sent']} reminders, {totals['failed']} failed")
+    return 1 if totals["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import re
+from datetime import date
+from typing import Optional
+from fastapi import Response
+from ..core.errors import ValidationError
+from ..sql.queries.medical_record_queries import (
+    HIGHLIGHT_MEDICAL_RECORDS_TEMPLATE,
+    SEARCH_MEDICAL_RECORDS_QUERY,
+)
+from ..sql.queries.patient_queries import (
+    SEARCH_PATIENTS_BY_NAME_QUERY,
+    SEARCH_PATIENTS_BY_PHONE_QUERY,
+    TYPEAHEAD_PATIENTS_BY_NAME_PREFIX_QUERY,
+    TYPEAHEAD_PATIENTS_BY_NAME_QUERY,
+    TYPEAHEAD_PATIENTS_BY_PHONE_QUERY,
+)
+from .db_utils import ResultSet, execute_query_rows_async
+from .filter_utils import Filters
+from .pagination_utils import NEXT_CURSOR_HEADER, PageParams, encode_cursor, keyset_query
+
+# Trigram indexes need at least this many digits to narrow a phone search
+MIN_PHONE_DIGITS = 3
+
+_PHONE_QUERY_RE = re.compile(r"^[\d\s()+.\-]+$")
+_LIKE_SPECIAL_RE = re.compile(r"([\\%_])")
+
+# ts_headline options: the diagnosis is short and highlighted whole; the
+# other text fields yield a few fragments around the matches
+DIAGNOSIS_HEADLINE_OPTIONS = "HighlightAll=true, StartSel=<mark>, StopSel=</mark>"
+NOTES_HEADLINE_OPTIONS = (
+    "MaxFragments=3, MaxWords=20, MinWords=8, "
+    "FragmentDelimiter=\" ... \", StartSel=<mark>, StopSel=</mark>"
+)
+
+
+def normalize_phone(value: str) -> str:
+    """
+    Reduce a phone number to its digits, as stored in the phone index.
+    """
+    return re.sub(r"\D", "", value or "")
+
+
+def phone_digits(term: str) -> Optional[str]:
+    """
+    Return the digits of a search term that looks like a phone number.
+    """
+    if _PHONE_QUERY_RE.match(term):
+        digits = normalize_phone(term)
+        if len(digits) >= MIN_PHONE_DIGITS:
+            return digits
+    return None
+
+
+def _like_escape(value: str) -> str:
+    return _LIKE_SPECIAL_RE.sub(r"\\\1", value)
+
+
+def _clean_term(term: str) -> str:
+    term = " ".join((term or "").split()).lower()
+    if not term:
+        raise ValidationError("Search term must not be empty")
+    return term
+
+
+async def search_patients(term: str, limit: int) -> ResultSet:
+    """
+    Ranked patient search by fuzzy name or partial phone number.
+    """
+    term = _clean_term(term)
+    digits = phone_digits(term)
+    if digits:
+        return await execute_query_rows_async(
+            SEARCH_PATIENTS_BY_PHONE_QUERY,
+            (digits, f"%{_like_escape(digits)}%", limit),
+        )
+    return await execute_query_rows_async(
+        SEARCH_PATIENTS_BY_NAME_QUERY, (term, term, limit)
+    )
+
+
+async def typeahead_patients(term: str, limit: int) -> ResultSet:
+    """
+    Typeahead suggestions (id, full_name, date_of_birth). Names are matched
+    by prefix first, an ordered index range scan, and topped up with fuzzy
+    word matches only when the prefix scan finds fewer than limit.
+    """
+    term = _clean_term(term)
+    digits = phone_digits(term)
+    if digits:
+        return await execute_query_rows_async(
+            TYPEAHEAD_PATIENTS_BY_PHONE_QUERY, (f"%{_like_escape(digits)}%", limit)
+        )
+
+    # Every string with this prefix sorts in [term, upper) byte-wise.
+    upper = term[:-1] + chr(ord(term[-1]) + 1)
+    result = await execute_query_rows_async(
+        TYPEAHEAD_PATIENTS_BY_NAME_PREFIX_QUERY, (term, upper, limit)
+    )
+    if len(result) < limit:
+        fuzzy = await execute_query_rows_async(
+            TYPEAHEAD_PATIENTS_BY_NAME_QUERY, (term, term, limit)
+        )
+        seen = {row[0] for row in result.rows}
+        result.rows.extend(row for row in fuzzy.rows if row[0] not in seen)
+        del result.rows[limit:]
+    return result
+
+
+async def search_medical_records(
+    response: Response,
+    page: PageParams,
+    term: str,
+    patient_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> ResultSet:
+    """
+    One page of medical records matching a web-search style query ("quoted
+    phrases", or, -excluded), best match first, with the matches marked up
+    in the diagnosis and a headline of the other text fields. Matching uses
+    the GIN index; only the returned page is highlighted.
+    """
+    term = _clean_term(term)
+    query, params = (
+        Filters()
+        .equals("m.patient_id", patient_id)
+        .date_range("m.record_date", start_date, end_date)
+        .apply(SEARCH_MEDICAL_RECORDS_QUERY, (term,))
+    )
+
+    sql, sql_params = keyset_query(
+        query, params, ("rank", "id"), page.limit + 1, page.cursor, True
+    )
+    rows = await execute_query_rows_async(
+        HIGHLIGHT_MEDICAL_RECORDS_TEMPLATE.format(page=sql.rstrip(";")),
+        (DIAGNOSIS_HEADLINE_OPTIONS, NOTES_HEADLINE_OPTIONS)
+        + sql_params
+        + (term,),
+    )
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [last["rank"], last["id"]]
+        )
+    return rows
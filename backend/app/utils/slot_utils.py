@@ -0,0 +1,303 @@
+"""
+Free appointment slots.
+
+Each doctor's calendar combines their weekly shifts (staff_schedules) with
+busy intervals (approved leaves and booked appointments) kept merged and
+sorted, so testing a slot or skipping a booked stretch is a binary search.
+Calendars are loaded in bulk for the next SLOT_HORIZON_DAYS, cached per
+worker, and invalidated when an appointment is booked or changes status.
+Slots are generated lazily and merged across doctors, so asking for the next
+N slots only examines as much of the calendars as it needs.
+"""
+
+import asyncio
+import heapq
+import itertools
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from ..config.settings import settings
+from ..core.errors import ValidationError
+from ..sql.queries.appointment_queries import (
+    GET_DOCTOR_APPROVED_LEAVES_QUERY,
+    GET_DOCTOR_BOOKINGS_QUERY,
+    GET_DOCTOR_SHIFTS_QUERY,
+    GET_SLOT_DOCTORS_QUERY,
+)
+from .cache_utils import TTLCache, broadcast_invalidation_async, register_cache
+from .db_utils import execute_query_async
+from .filter_utils import Filters
+
+_WEEKDAYS = {
+    name: index
+    for index, name in enumerate(["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"])
+}
+
+# Doctor user id -> DoctorCalendar
+calendar_cache = register_cache(
+    TTLCache("doctor_calendar", settings.SLOT_CACHE_SIZE, settings.SLOT_CACHE_TTL)
+)
+
+
+def parse_work_days(work_days: Optional[Iterable[str]]) -> Set[int]:
+    """
+    Weekday numbers (Monday = 0) of a work_days array. Accepts day names or
+    abbreviations in any case ("MONDAY", "Mon") and ISO numbers ("1" is
+    Monday); anything else is ignored. No work days means no shifts.
+    """
+    days = set()
+    for value in work_days or []:
+        value = str(value).strip().upper()
+        if value.isdigit() and 1 <= int(value) <= 7:
+            days.add(int(value) - 1)
+        elif value[:3] in _WEEKDAYS:
+            days.add(_WEEKDAYS[value[:3]])
+    return days
+
+
+class IntervalSet:
+    """
+    Disjoint half-open [start, end) intervals, kept sorted with overlapping
+    and touching intervals merged. Lookups are binary searches.
+    """
+
+    def __init__(self):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def add(self, start: datetime, end: datetime) -> None:
+        if end <= start:
+            return
+        # Intervals [i, j) overlap or touch the new one
+        i = bisect_left(self._ends, start)
+        j = bisect_right(self._starts, end)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+    def overlap_end(self, start: datetime, end: datetime) -> Optional[datetime]:
+        """
+        Return the end of the first interval overlapping [start, end), or
+        None if the range is free.
+        """
+        i = bisect_right(self._ends, start)
+        if i < len(self._starts) and self._starts[i] < end:
+            return self._ends[i]
+        return None
+
+
+def _align(value: datetime, anchor: datetime, step: timedelta) -> datetime:
+    """The first anchor + k * step at or after value"""
+    if value <= anchor:
+        return anchor
+    return anchor + -((anchor - value) // step) * step
+
+
+class DoctorCalendar:
+    """
+    One doctor's shifts and busy intervals between loaded_from and
+    loaded_to. Immutable once built; a change replaces the cached calendar.
+    """
+
+    def __init__(
+        self,
+        doctor: Dict[str, Any],
+        loaded_from: datetime,
+        loaded_to: datetime,
+    ):
+        self.doctor = doctor
+        self.loaded_from = loaded_from
+        self.loaded_to = loaded_to
+        # Weekday -> [(shift start, shift length)], sorted
+        self.shifts: Dict[int, List[Tuple[time, timedelta]]] = {}
+        self.busy = IntervalSet()
+
+    def add_shift(self, start: time, end: time, work_days: Iterable[str]) -> None:
+        length = datetime.combine(date.min, end) - datetime.combine(date.min, start)
+        if length <= timedelta(0):
+            # Overnight shift, ending the next day
+            length += timedelta(days=1)
+        for weekday in parse_work_days(work_days):
+            self.shifts.setdefault(weekday, []).append((start, length))
+            self.shifts[weekday].sort()
+
+    def windows(
+        self, start: datetime, end: datetime
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        Shift windows overlapping [start, end), in order of their start.
+        """
+        # Start a day early for overnight shifts running into the range
+        day = start.date() - timedelta(days=1)
+        while day <= end.date():
+            for shift_start, length in self.shifts.get(day.weekday(), []):
+                window_start = datetime.combine(day, shift_start)
+                window_end = window_start + length
+                if window_end > start and window_start < end:
+                    yield window_start, window_end
+            day += timedelta(days=1)
+
+    def free_slots(
+        self, start: datetime, end: datetime, slot: timedelta
+    ) -> Iterator[datetime]:
+        """
+        Start times of free slots beginning in [start, end), in order. Slots
+        are aligned to the start of their shift and must end within it.
+        """
+        start = max(start, self.loaded_from)
+        end = min(end, self.loaded_to)
+        last = None
+        for window_start, window_end in self.windows(start, end):
+            earliest = start if last is None else max(start, last + slot)
+            t = _align(earliest, window_start, slot)
+            while t < end and t + slot <= window_end:
+                busy_until = self.busy.overlap_end(t, t + slot)
+                if busy_until is None:
+                    yield t
+                    last = t
+                    t += slot
+                else:
+                    t = _align(busy_until, window_start, slot)
+
+
+async def get_slot_doctors(
+    doctor_id: Optional[int] = None, specialization: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Doctors (doctor_id, staff_id, doctor_name, specialization) to search for
+    slots: one doctor, or every doctor with a specialization.
+    """
+    filters = Filters().equals("s.user_id", doctor_id)
+    if specialization:
+        filters.where("lower(s.specialization) = lower(%s)", specialization.strip())
+    query, params = filters.apply(GET_SLOT_DOCTORS_QUERY)
+    return await execute_query_async(query, params, fetch_all=True)
+
+
+def _slot_length() -> timedelta:
+    return timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+
+
+def _horizon(today: date) -> Tuple[datetime, datetime]:
+    loaded_from = datetime.combine(today, time.min)
+    return loaded_from, loaded_from + timedelta(days=settings.SLOT_HORIZON_DAYS + 1)
+
+
+async def load_calendars(doctors: List[Dict[str, Any]]) -> List[DoctorCalendar]:
+    """
+    Calendars of the given doctors for the slot horizon, from the cache
+    where possible. Missing ones are loaded together with three queries.
+    """
+    loaded_from, loaded_to = _horizon(date.today())
+    calendars: Dict[int, DoctorCalendar] = {}
+    for doctor in doctors:
+        calendar = calendar_cache.get(doctor["doctor_id"])
+        # A calendar loaded on an earlier day does not reach the horizon
+        if calendar is not None and calendar.loaded_from == loaded_from:
+            calendars[doctor["doctor_id"]] = calendar
+
+    missing = [doctor for doctor in doctors if doctor["doctor_id"] not in calendars]
+    if missing:
+        generation = calendar_cache.generation
+        ids = [doctor["doctor_id"] for doctor in missing]
+        shifts, leaves, bookings = await asyncio.gather(
+            execute_query_async(GET_DOCTOR_SHIFTS_QUERY, (ids,), fetch_all=True),
+            execute_query_async(
+                GET_DOCTOR_APPROVED_LEAVES_QUERY,
+                (ids, loaded_from.date(), loaded_to.date()),
+                fetch_all=True,
+            ),
+            execute_query_async(
+                GET_DOCTOR_BOOKINGS_QUERY,
+                # Appointments started the day before may run into today
+                (ids, loaded_from - timedelta(days=1), loaded_to),
+                fetch_all=True,
+            ),
+        )
+        new = {
+            doctor["doctor_id"]: DoctorCalendar(doctor, loaded_from, loaded_to)
+            for doctor in missing
+        }
+        for row in shifts:
+            new[row["doctor_id"]].add_shift(
+                row["shift_start"], row["shift_end"], row["work_days"]
+            )
+        for row in leaves:
+            new[row["doctor_id"]].busy.add(
+                datetime.combine(row["start_date"], time.min),
+                datetime.combine(row["end_date"] + timedelta(days=1), time.min),
+            )
+        for row in bookings:
+            new[row["doctor_id"]].busy.add(
+                row["appointment_date"],
+                row["appointment_date"]
+                + timedelta(minutes=row["duration_minutes"]),
+            )
+        for doctor_id, calendar in new.items():
+            calendar_cache.set(doctor_id, calendar, generation)
+        calendars.update(new)
+
+    return [calendars[doctor["doctor_id"]] for doctor in doctors]
+
+
+def _tagged_slots(
+    calendar: DoctorCalendar, start: datetime, end: datetime, slot: timedelta
+) -> Iterator[Tuple[datetime, int, DoctorCalendar]]:
+    # Ties between doctors go to the lower doctor id
+    doctor_id = calendar.doctor["doctor_id"]
+    for t in calendar.free_slots(start, end, slot):
+        yield t, doctor_id, calendar
+
+
+async def find_free_slots(
+    doctor_id: Optional[int] = None,
+    specialization: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """
+    The next limit free slots from start_date (default today) to end_date
+    inclusive (default the end of the horizon) with one doctor or any doctor
+    with a specialization, earliest first. Slots in the past are skipped.
+    """
+    if doctor_id is None and not specialization:
+        raise ValidationError("Give a doctor_id or a specialization")
+    today = date.today()
+    start_date = max(start_date or today, today)
+    horizon_end = today + timedelta(days=settings.SLOT_HORIZON_DAYS)
+    end_date = end_date or horizon_end
+    if end_date > horizon_end:
+        raise ValidationError(
+            f"Slots are offered up to {settings.SLOT_HORIZON_DAYS} days ahead"
+        )
+    if end_date < start_date:
+        return []
+
+    doctors = await get_slot_doctors(doctor_id, specialization)
+    calendars = await load_calendars(doctors)
+    slot = _slot_length()
+    start = max(datetime.combine(start_date, time.min), datetime.now())
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    streams = [_tagged_slots(calendar, start, end, slot) for calendar in calendars]
+    return [
+        {**calendar.doctor, "start": t, "end": t + slot}
+        for t, _, calendar in itertools.islice(
+            heapq.merge(*streams, key=lambda item: item[:2]), limit
+        )
+    ]
+
+
+async def invalidate_doctor_calendar(doctor_id: Optional[int]) -> None:
+    """
+    Drop a doctor's calendar from every worker's cache after a committed
+    change to their appointments.
+    """
+    if doctor_id is not None:
+        await broadcast_invalidation_async(calendar_cache, doctor_id)
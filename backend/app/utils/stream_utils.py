@@ -0,0 +1,77 @@
+import itertools
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from fastapi.responses import StreamingResponse
+from .db_utils import stream_query, run_in_db_executor
+from .json_utils import dumps
+
+# Flush a chunk to the client once roughly this many bytes are buffered
+CHUNK_SIZE = 64 * 1024
+
+STREAM_FORMATS = ("json", "ndjson")
+
+
+def encode_row(row: Dict[str, Any]) -> bytes:
+    """
+    Encode a single row as compact JSON.
+    """
+    return dumps(row)
+
+
+def json_array_chunks(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Encode rows as a JSON array, yielding it in chunks of about CHUNK_SIZE.
+    """
+    buffer = bytearray(b"[")
+    separator = b""
+    for row in rows:
+        buffer += separator
+        buffer += encode_row(row)
+        separator = b","
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+def ndjson_chunks(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Encode rows as newline-delimited JSON, yielding chunks of about CHUNK_SIZE.
+    """
+    buffer = bytearray()
+    for row in rows:
+        buffer += encode_row(row)
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _first_row(rows: Iterator) -> list:
+    return list(itertools.islice(rows, 1))
+
+
+async def stream_query_response(
+    query: str,
+    params: tuple = None,
+    fmt: str = "json",
+    itersize: int = None,
+    transform: Optional[Callable[[List[dict], Any], List[dict]]] = None,
+) -> StreamingResponse:
+    """
+    Build a StreamingResponse that sends the query result as it is read from a
+    server-side cursor. The first row is fetched before the response starts so
+    query errors still produce a normal error response. If given, transform is
+    applied to each batch of itersize rows before encoding (see stream_query).
+    """
+    rows = stream_query(query, params, itersize, transform)
+    head = await run_in_db_executor(_first_row, rows)
+    rows = itertools.chain(head, rows)
+
+    if fmt == "ndjson":
+        return StreamingResponse(
+            ndjson_chunks(rows), media_type="application/x-ndjson"
+        )
+    return StreamingResponse(json_array_chunks(rows), media_type="application/json")
@@ -0,0 +1,94 @@
+import asyncio
+import heapq
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+from ..core.errors import ValidationError
+from ..sql.queries.patient_queries import (
+    GET_TIMELINE_ADMISSIONS_QUERY,
+    GET_TIMELINE_APPOINTMENTS_QUERY,
+    GET_TIMELINE_BILLS_QUERY,
+    GET_TIMELINE_INSURANCE_CLAIMS_QUERY,
+    GET_TIMELINE_MEDICAL_RECORDS_QUERY,
+)
+from .db_utils import execute_query_async
+
+# Event type -> source query, in the order events sharing a timestamp are listed
+TIMELINE_SOURCES = {
+    "appointment": GET_TIMELINE_APPOINTMENTS_QUERY,
+    "admission": GET_TIMELINE_ADMISSIONS_QUERY,
+    "medical_record": GET_TIMELINE_MEDICAL_RECORDS_QUERY,
+    "bill": GET_TIMELINE_BILLS_QUERY,
+    "insurance_claim": GET_TIMELINE_INSURANCE_CLAIMS_QUERY,
+}
+
+_RANKS = {name: rank for rank, name in enumerate(TIMELINE_SOURCES)}
+
+# Bounds for SERIAL ids: (t, 0) excludes every row at t, (t, _MAX_ID) keeps them
+_MAX_ID = 2**31 - 1
+
+
+def _parse_cursor(values: List[Any]) -> Tuple[datetime, str, int]:
+    try:
+        occurred_at, event_type, event_id = values
+        if event_type not in _RANKS or not isinstance(event_id, int):
+            raise ValueError
+        return datetime.fromisoformat(occurred_at), event_type, event_id
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid timeline cursor")
+
+
+def _source_bound(
+    name: str, cursor: Optional[Tuple[datetime, str, int]]
+) -> Tuple[datetime, int]:
+    """
+    Translate the timeline cursor into the (timestamp, id) a source's rows
+    must sort below.
+    """
+    if cursor is None:
+        return datetime.max, _MAX_ID
+    occurred_at, event_type, event_id = cursor
+    if _RANKS[name] < _RANKS[event_type]:
+        return occurred_at, 0
+    if _RANKS[name] == _RANKS[event_type]:
+        return occurred_at, event_id
+    return occurred_at, _MAX_ID
+
+
+def _sort_key(event: Dict[str, Any]) -> tuple:
+    return event["occurred_at"], -_RANKS[event["type"]], -event["id"]
+
+
+async def load_timeline(
+    patient_id: int, limit: int, cursor: Optional[List[Any]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[List[Any]]]:
+    """
+    Return one page of a patient's events, newest first, and the cursor of
+    the next page (None on the last page).
+
+    Each source reads at most limit + 1 rows from its index past the
+    cursor, concurrently, and the sorted streams are k-way merged lazily
+    until the page is full, so the cost of a page does not grow with the
+    length of the patient's history. Events without a timestamp are not
+    listed.
+    """
+    bound = _parse_cursor(cursor) if cursor is not None else None
+    results = await asyncio.gather(
+        *(
+            execute_query_async(
+                query,
+                (patient_id, *_source_bound(name, bound), limit + 1),
+                fetch_all=True,
+            )
+            for name, query in TIMELINE_SOURCES.items()
+        )
+    )
+    merged = heapq.merge(*results, key=_sort_key, reverse=True)
+    events = list(islice(merged, limit + 1))
+
+    next_cursor = None
+    if len(events) > limit:
+        del events[limit:]
+        last = events[-1]
+        next_cursor = [last["occurred_at"].isoformat(), last["type"], last["id"]]
+    return events, next_cursor
@@ -9,6 +9,7 @@ import {
   ReactNode,
   JSX,
 } from "react";
+import { clearConditionalCache } from "@/app/lib/api";
 
 interface User {
   email: string;
@@ -60,6 +61,7 @@ export const UserProvider = ({
   const clearUser = () => {
     setUser(null);
     localStorage.removeItem("token");
+    clearConditionalCache();
   };
 
   return (
@@ -30,4 +30,49 @@ export async function apiFetch(
     return data;
 }
 
-export const swrFetcher = (url: string): Promise<any> => apiFetch(url);
+// Last body and ETag per GET endpoint, for conditional polling
+const etagCache: Map<string, { etag: string; data: any }> = new Map();
+
+export async function conditionalFetch(endpoint: string): Promise<any> {
+    const cached = etagCache.get(endpoint);
+    const headers: Record<string, string> = cached
+        ? { "If-None-Match": cached.etag }
+        : {};
+
+    const token: string | null =
+        typeof window !== "undefined" ? localStorage.getItem("token") : null;
+    if (token) {
+        headers["Authorization"] = `Bearer ${token}`;
+    }
+
+    // Revalidation is done here, so the browser cache is bypassed
+    const response: Response = await fetch(`${API_BASE_URL}${endpoint}`, {
+        headers,
+        cache: "no-store",
+    });
+
+    if (response.status === 304 && cached) {
+        // Same object as before, so SWR sees no change and skips re-rendering
+        return cached.data;
+    }
+
+    if (!response.ok) {
+        const errorData: any = await response.json();
+        throw new Error(errorData.detail || "API Error");
+    }
+
+    const data: any = await response.json();
+    const etag: string | null = response.headers.get("ETag");
+    if (etag) {
+        etagCache.set(endpoint, { etag, data });
+    } else {
+        etagCache.delete(endpoint);
+    }
+    return data;
+}
+
+export function clearConditionalCache(): void {
+    etagCache.clear();
+}
+
+export const swrFetcher = (url: string): Promise<any> => conditionalFetch(url);